@@ -338,9 +338,11 @@ messages::MeshData GeometryToMeshData(const t::geometry::LineSet& ls) {
 
 std::tuple<std::string, double, std::shared_ptr<t::geometry::Geometry>>
 DataBufferToMetaGeometry(std::string& data) {
-    const char* buffer = data.data();
-    size_t buffer_size = data.size();
+    return DataBufferToMetaGeometry(data.data(), data.size());
+}
 
+std::tuple<std::string, double, std::shared_ptr<t::geometry::Geometry>>
+DataBufferToMetaGeometry(const char* buffer, size_t buffer_size) {
     auto limits = msgpack::unpack_limit(0xffffffff,  // array
                                         0xffffffff,  // map
                                         65536,       // str
@@ -91,6 +91,11 @@ messages::MeshData GeometryToMeshData(const t::geometry::LineSet& ls);
 std::tuple<std::string, double, std::shared_ptr<t::geometry::Geometry>>
 DataBufferToMetaGeometry(std::string& data);
 
+/// Same as above, but reads the message from the memory range
+/// [\p buffer, \p buffer + \p buffer_size) without copying it first.
+std::tuple<std::string, double, std::shared_ptr<t::geometry::Geometry>>
+DataBufferToMetaGeometry(const char* buffer, size_t buffer_size);
+
 }  // namespace rpc
 }  // namespace io
 }  // namespace open3d
@@ -231,12 +231,25 @@ Returns:
                      "the connection."},
             });
 
-    m_rpc.def("data_buffer_to_meta_geometry", &rpc::DataBufferToMetaGeometry,
-              "data"_a, R"doc(
+    m_rpc.def(
+            "data_buffer_to_meta_geometry",
+            [](const py::buffer& data) {
+                py::buffer_info info = data.request();
+                if (info.ndim > 1 ||
+                    (info.ndim == 1 && info.strides[0] != info.itemsize)) {
+                    throw py::value_error("data must be a contiguous buffer.");
+                }
+                const char* buffer = static_cast<const char*>(info.ptr);
+                const size_t buffer_size = info.size * info.itemsize;
+                py::gil_scoped_release release;
+                return rpc::DataBufferToMetaGeometry(buffer, buffer_size);
+            },
+            "data"_a, R"doc(
 This function returns the geometry, the path and the time stored in a
 SetMeshData message. data must contain the Request header message followed
-by the SetMeshData message. The function returns None for the geometry if not
-successful.
+by the SetMeshData message. data may be any contiguous buffer (e.g. bytes or a
+memoryview of a memory mapped file) and is not copied. The function returns None
+for the geometry if not successful.
 )doc");
 }
 
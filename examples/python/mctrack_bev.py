@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+MCTrack鸟瞰图 (BEV) 栅格化
+点云按网格做高度/强度最大池化，跟踪框绘制为俯视轮廓，全部使用NumPy散点操作。
+本模块不依赖GUI，可在进程池的工作进程中使用
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from mctrack_data import read_lidar_points
+from mctrack_geometry import draw_box_edges
+
+# 高度/强度着色的颜色梯度 (深蓝 -> 青 -> 黄 -> 白)
+_RAMP_VALUES = np.array([0.0, 0.35, 0.7, 1.0])
+_RAMP_COLORS = np.array([[20, 20, 60], [0, 170, 200], [240, 220, 40],
+                         [255, 255, 255]], dtype=np.float64)
+_BACKGROUND = np.array([15, 15, 15], dtype=np.uint8)
+
+
+def rasterize_points(points: np.ndarray, extent: float, image_size: int,
+                     mode: str = 'height',
+                     height_range: Tuple[float, float] = (-3.0, 3.0)):
+    """将点云栅格化为最大池化网格
+
+    Args:
+        points: (N, >=3) 点云 [x, y, z, intensity, ...]
+        extent: 覆盖范围 [-extent, extent] (米)
+        image_size: 输出图像边长 (像素)
+        mode: 'height' 或 'intensity'
+        height_range: 高度归一化范围
+
+    Returns:
+        grid: (image_size, image_size) float，每个网格内的最大值，归一化到
+            [0, 1]；空网格为 -1
+    """
+    grid = np.full(image_size * image_size, -1.0)
+    if len(points) == 0:
+        return grid.reshape(image_size, image_size)
+    if mode == 'intensity' and points.shape[1] > 3:
+        values = points[:, 3].astype(np.float64)
+        values = values / max(float(values.max()), 1e-6)
+    else:
+        low, high = height_range
+        values = np.clip((points[:, 2] - low) / (high - low), 0.0, 1.0)
+
+    scale = image_size / (2.0 * extent)
+    # 图像上方为 +x (车辆前方)，左侧为 +y
+    rows = np.floor((extent - points[:, 0]) * scale).astype(np.int64)
+    cols = np.floor((extent - points[:, 1]) * scale).astype(np.int64)
+    inside = (rows >= 0) & (rows < image_size) & (cols >= 0) & (cols < image_size)
+    cells = rows[inside] * image_size + cols[inside]
+    values = values[inside]
+    # 重复索引的赋值顺序不确定，用 maximum.at 逐个取最大值
+    np.maximum.at(grid, cells, values)
+    return grid.reshape(image_size, image_size)
+
+
+def colorize_grid(grid: np.ndarray) -> np.ndarray:
+    """将最大池化网格映射为RGB图像 (uint8)"""
+    image = np.empty(grid.shape + (3,), dtype=np.uint8)
+    occupied = grid >= 0
+    values = grid[occupied]
+    for c in range(3):
+        image[..., c][occupied] = np.interp(values, _RAMP_VALUES,
+                                            _RAMP_COLORS[:, c])
+    image[~occupied] = _BACKGROUND
+    return image
+
+
+def boxes_to_pixels(corners: np.ndarray, extent: float,
+                    image_size: int) -> np.ndarray:
+    """将框顶点 (N, 8, 3) 转换为BEV图像像素坐标 (N, 8, 2) [列, 行]"""
+    scale = image_size / (2.0 * extent)
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 8, 3)
+    pixels = np.empty(corners.shape[:2] + (2,))
+    pixels[..., 0] = (extent - corners[..., 1]) * scale
+    pixels[..., 1] = (extent - corners[..., 0]) * scale
+    return pixels
+
+
+def render_bev(points: np.ndarray, corners: np.ndarray, colors: np.ndarray,
+               extent: float = 50.0, image_size: int = 512,
+               mode: str = 'height') -> np.ndarray:
+    """渲染一帧BEV图像: 点云最大池化 + 跟踪框轮廓
+
+    Args:
+        points: (N, >=3) 点云 (与框在同一坐标系)
+        corners: (M, 8, 3) 框顶点
+        colors: (M, 3) 框颜色 [0, 1]
+
+    Returns:
+        (image_size, image_size, 3) uint8 图像
+    """
+    image = colorize_grid(rasterize_points(points, extent, image_size, mode))
+    if len(corners) > 0:
+        colors_u8 = (np.asarray(colors, dtype=np.float64).reshape(-1, 3) *
+                     255).astype(np.uint8)
+        draw_box_edges(image, boxes_to_pixels(corners, extent, image_size),
+                       colors_u8, samples_per_edge=max(8, image_size // 16))
+    return image
+
+
+def render_bev_thumbnail(frame_idx: int, pc_path: str, corners: np.ndarray,
+                         colors: np.ndarray, extent: float = 50.0,
+                         image_size: int = 64):
+    """工作进程入口: 读取点云并渲染缩略图
+
+    Returns:
+        (frame_idx, image)，点云不存在时 image 只包含跟踪框
+    """
+    try:
+        points = read_lidar_points(pc_path)
+    except (OSError, ValueError):
+        points = np.zeros((0, 5), dtype=np.float32)
+    return frame_idx, render_bev(points, corners, colors, extent, image_size)
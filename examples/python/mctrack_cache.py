@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+MCTrack缓存工具 - 线程安全的有界LRU缓存
+不依赖GUI，可被相机面板、帧组装等模块共用
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """有界LRU缓存，线程安全
+
+    缓存满时淘汰最久未使用的条目。hits / misses 用于统计命中率。
+    """
+
+    def __init__(self, max_items: int = 256):
+        self.max_items = max_items
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """读取缓存，未命中时返回 None"""
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+
+    def __str__(self):
+        return (f"Items: {len(self._cache)}/{self.max_items}, "
+                f"Hits: {self.hits}, Misses: {self.misses}")
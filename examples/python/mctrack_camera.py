@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+MCTrack相机面板 - nuScenes环视相机缩略图与跟踪框投影
+JPEG解码和缩放在线程池中异步执行，不阻塞3D视图的帧更新
+"""
+
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import open3d as o3d
+import open3d.visualization.gui as gui
+
+from mctrack_cache import LRUCache
+from mctrack_geometry import (box_corners, draw_box_edges, project_boxes,
+                              transform_matrix)
+
+# 环视相机通道 (按显示顺序: 前左、前、前右、后左、后、后右)
+CAMERA_CHANNELS = ('CAM_FRONT_LEFT', 'CAM_FRONT', 'CAM_FRONT_RIGHT',
+                   'CAM_BACK_LEFT', 'CAM_BACK', 'CAM_BACK_RIGHT')
+
+CameraCalibration = namedtuple(
+    'CameraCalibration',
+    ['path', 'world_to_camera', 'intrinsic', 'image_size'])
+
+
+def downscale_image(image: np.ndarray, target_width: int) -> np.ndarray:
+    """按整数倍块平均缩小图像 (纯NumPy，无需图像库)"""
+    factor = max(1, image.shape[1] // max(1, target_width))
+    if factor == 1:
+        return np.ascontiguousarray(image)
+    height = (image.shape[0] // factor) * factor
+    width = (image.shape[1] // factor) * factor
+    blocks = image[:height, :width].reshape(height // factor, factor,
+                                            width // factor, factor, -1)
+    return blocks.mean(axis=(1, 3)).astype(np.uint8)
+
+
+class CameraPanel:
+    """环视相机面板
+
+    每帧提交6个相机的渲染任务到线程池；工作线程负责解码、缩放和投影，
+    主线程只负责替换图像。过期帧的未开始任务会被取消，已完成的过期结果被丢弃。
+    """
+
+    def __init__(self, window, thumbnail_width: int = 320,
+                 max_workers: int = 4, cache_size: int = 256):
+        self.window = window
+        self.thumbnail_width = thumbnail_width
+        self.thumbnail_cache = LRUCache(cache_size)
+        self._calibrations: Dict[str, CameraCalibration] = {}
+        self._calibrations_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="MCTrackCamera")
+        self._generation = 0
+        self._pending = []
+
+        em = window.theme.font_size
+        self.widget = gui.Horiz(0.25 * em)
+        self.image_widgets: List[gui.ImageWidget] = []
+        for _ in CAMERA_CHANNELS:
+            image_widget = gui.ImageWidget()
+            self.image_widgets.append(image_widget)
+            self.widget.add_child(image_widget)
+
+    def preferred_height(self, width: float) -> float:
+        """给定面板宽度时的高度 (16:9 缩略图)"""
+        return width / len(CAMERA_CHANNELS) * 9.0 / 16.0
+
+    def clear_calibrations(self):
+        """切换数据集时清除标定缓存"""
+        with self._calibrations_lock:
+            self._calibrations.clear()
+        self.thumbnail_cache.clear()
+
+    def update(self, nusc, sample, translation, size, rotation, colors):
+        """异步更新所有相机图像
+
+        Args:
+            nusc: NuScenes 对象
+            sample: 当前帧的 sample 记录
+            translation, size, rotation: (N, 3), (N, 3), (N, 4) 全局坐标系下的跟踪框
+            colors: (N, 3) 框颜色 [0, 1]
+        """
+        self._generation += 1
+        generation = self._generation
+        for future in self._pending:
+            future.cancel()  # 尚未开始的过期任务直接取消
+        self._pending = []
+
+        corners = box_corners(translation, size, rotation)
+        colors_u8 = (np.asarray(colors, dtype=np.float64).reshape(-1, 3) *
+                     255).astype(np.uint8)
+        for idx, channel in enumerate(CAMERA_CHANNELS):
+            sd_token = sample['data'].get(channel)
+            if sd_token is None:
+                continue
+            future = self._executor.submit(self._render_camera, nusc, sd_token,
+                                           corners, colors_u8)
+            future.add_done_callback(
+                partial(self._on_rendered, idx, generation))
+            self._pending.append(future)
+
+    def shutdown(self):
+        """停止线程池"""
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _get_calibration(self, nusc, sd_token: str) -> CameraCalibration:
+        """获取 (并缓存) 相机标定: 全局->相机变换、内参和图像尺寸"""
+        with self._calibrations_lock:
+            calib = self._calibrations.get(sd_token)
+        if calib is not None:
+            return calib
+
+        sd_record = nusc.get('sample_data', sd_token)
+        cs_record = nusc.get('calibrated_sensor',
+                             sd_record['calibrated_sensor_token'])
+        pose_record = nusc.get('ego_pose', sd_record['ego_pose_token'])
+        # 全局 -> 自车 -> 相机
+        world_to_camera = (
+            transform_matrix(cs_record['translation'], cs_record['rotation'],
+                             inverse=True) @
+            transform_matrix(pose_record['translation'],
+                             pose_record['rotation'], inverse=True))
+        calib = CameraCalibration(
+            path=os.path.join(nusc.dataroot, sd_record['filename']),
+            world_to_camera=world_to_camera,
+            intrinsic=np.asarray(cs_record['camera_intrinsic']),
+            image_size=(sd_record['width'], sd_record['height']))
+        with self._calibrations_lock:
+            self._calibrations[sd_token] = calib
+        return calib
+
+    def _get_thumbnail(self, path: str) -> Tuple[np.ndarray, float]:
+        """获取 (并缓存) 缩略图及其相对原图的缩放比例"""
+        key = (path, self.thumbnail_width)
+        cached = self.thumbnail_cache.get(key)
+        if cached is not None:
+            return cached
+        image = np.asarray(o3d.io.read_image(path))
+        if image.ndim == 2:
+            image = np.repeat(image[:, :, None], 3, axis=2)
+        thumbnail = downscale_image(image[:, :, :3], self.thumbnail_width)
+        cached = (thumbnail, thumbnail.shape[1] / image.shape[1])
+        self.thumbnail_cache.put(key, cached)
+        return cached
+
+    def _render_camera(self, nusc, sd_token: str, corners: np.ndarray,
+                       colors: np.ndarray) -> Optional[np.ndarray]:
+        """工作线程: 解码缩略图并绘制投影后的跟踪框"""
+        calib = self._get_calibration(nusc, sd_token)
+        if not os.path.exists(calib.path):
+            return None
+        thumbnail, scale = self._get_thumbnail(calib.path)
+        image = thumbnail.copy()  # 缓存中的缩略图保持不变
+        if len(corners) > 0:
+            pixels, visible = project_boxes(corners, calib.world_to_camera,
+                                            calib.intrinsic, calib.image_size)
+            draw_box_edges(image, pixels[visible] * scale, colors[visible])
+        return image
+
+    def _on_rendered(self, idx: int, generation: int, future):
+        """工作线程回调: 将结果交给主线程显示"""
+        if future.cancelled() or generation != self._generation:
+            return
+        try:
+            image = future.result()
+        except Exception as e:
+            print(f"Error rendering camera {CAMERA_CHANNELS[idx]}: {str(e)}")
+            return
+        if image is None:
+            return
+
+        def show():
+            if generation == self._generation:  # 主线程上再检查一次是否过期
+                self.image_widgets[idx].update_image(o3d.geometry.Image(image))
+                self.window.post_redraw()
+
+        gui.Application.instance.post_to_main_thread(self.window, show)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+MCTrack跟踪结果的列式存储
+将JSON中按帧组织的字典列表转换为NumPy列数组，并建立按帧和按轨迹的索引，
+使按帧取框、按轨迹取历史/未来位置都只需切片和花式索引，无需逐帧遍历
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from mctrack_intervals import IntervalIndex
+
+# nuScenes关键帧间隔 (2Hz)，在没有时间戳时使用
+DEFAULT_FRAME_INTERVAL = 0.5
+
+# nuScenes点云格式为.pcd.bin (32-bit float, x,y,z,intensity,ring)
+LIDAR_POINT_DIMS = 5
+
+
+def read_lidar_points(path: str) -> np.ndarray:
+    """读取nuScenes点云文件，返回 (N, 5) float32 [x, y, z, intensity, ring]"""
+    return np.fromfile(path, dtype=np.float32).reshape(-1, LIDAR_POINT_DIMS)
+
+
+class TrackingResults:
+    """列式跟踪结果
+
+    所有框按帧顺序拼接成一组列数组 (frame, track, translation, size, rotation,
+    velocity, score, name)。跟踪ID被映射为连续整数 (track)，原始ID保存在
+    track_ids 中，可以是整数或字符串。
+
+    索引:
+        frame_offsets: 第 f 帧的框为 [frame_offsets[f], frame_offsets[f + 1])
+        track_order / track_offsets: 第 t 条轨迹的框 (按帧排序) 为
+            track_order[track_offsets[t]:track_offsets[t + 1]]
+        track_rank: 每个框在其轨迹中的序号
+        track_first_frame / track_last_frame: 每条轨迹的起止帧
+        lifespans: 轨迹起止帧的区间索引 (首次访问时构建)
+    """
+
+    def __init__(self, sample_tokens: Sequence[str], frame: np.ndarray,
+                 track: np.ndarray, track_ids: List[Hashable],
+                 translation: np.ndarray, size: np.ndarray,
+                 rotation: np.ndarray, velocity: np.ndarray,
+                 score: np.ndarray, name: np.ndarray,
+                 class_names: List[str],
+                 timestamps: Optional[np.ndarray] = None):
+        self.sample_tokens = list(sample_tokens)
+        self.token_to_frame = {
+            token: idx for idx, token in enumerate(self.sample_tokens)
+        }
+        self.frame = frame
+        self.track = track
+        self.track_ids = track_ids
+        self.translation = translation
+        self.size = size
+        self.rotation = rotation
+        self.velocity = velocity
+        self.score = score
+        self.name = name
+        self.class_names = class_names
+        if timestamps is None:
+            timestamps = np.arange(len(self.sample_tokens)) * DEFAULT_FRAME_INTERVAL
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self._build_index()
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.sample_tokens)
+
+    @property
+    def num_tracks(self) -> int:
+        return len(self.track_ids)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _build_index(self):
+        """建立按帧和按轨迹的索引"""
+        counts = np.bincount(self.frame, minlength=self.num_frames)
+        self.frame_offsets = np.zeros(self.num_frames + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.frame_offsets[1:])
+
+        # 框已按帧排序，稳定排序后每条轨迹内部仍按帧排序
+        self.track_order = np.argsort(self.track, kind='stable')
+        counts = np.bincount(self.track, minlength=self.num_tracks)
+        self.track_offsets = np.zeros(self.num_tracks + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.track_offsets[1:])
+        self.track_rank = np.empty(len(self), dtype=np.int64)
+        self.track_rank[self.track_order] = (
+            np.arange(len(self)) - np.repeat(self.track_offsets[:-1], counts))
+        self.track_first_frame = self.frame[self.track_order[self.track_offsets[:-1]]]
+        self.track_last_frame = self.frame[self.track_order[self.track_offsets[1:] - 1]]
+        self._lifespans = None
+
+    @property
+    def lifespans(self) -> IntervalIndex:
+        """轨迹存活区间 [首帧, 末帧] 的区间索引，区间序号即轨迹序号"""
+        if self._lifespans is None:
+            self._lifespans = IntervalIndex(self.track_first_frame,
+                                            self.track_last_frame)
+        return self._lifespans
+
+    def alive_tracks(self, frame_idx: int, end_frame: Optional[int] = None) -> np.ndarray:
+        """在 frame_idx (或 [frame_idx, end_frame]) 存活的轨迹序号"""
+        if end_frame is None:
+            return self.lifespans.stab(frame_idx)
+        return self.lifespans.overlapping(frame_idx, end_frame)
+
+    @classmethod
+    def from_dict(cls, results: Dict[str, List[dict]],
+                  sample_tokens: Optional[Sequence[str]] = None,
+                  timestamps: Optional[np.ndarray] = None) -> 'TrackingResults':
+        """由MCTrack/nuScenes格式的结果字典构建
+
+        Args:
+            results: {sample_token: [box_dict, ...]}
+            sample_tokens: 帧顺序 (例如场景中的sample顺序)，默认使用字典顺序。
+                不在其中的sample会被忽略
+            timestamps: 每帧的时间戳 (秒)
+        """
+        if sample_tokens is None:
+            sample_tokens = list(results.keys())
+        track_to_int = {}
+        class_to_int = {}
+        frame, track, name, score = [], [], [], []
+        translation, size, rotation, velocity = [], [], [], []
+        for frame_idx, token in enumerate(sample_tokens):
+            for i, box in enumerate(results.get(token, ())):
+                track_id = box.get('tracking_id', i)
+                frame.append(frame_idx)
+                track.append(track_to_int.setdefault(track_id,
+                                                     len(track_to_int)))
+                class_name = box.get('tracking_name', '')
+                name.append(class_to_int.setdefault(class_name,
+                                                    len(class_to_int)))
+                score.append(box.get('tracking_score', 1.0))
+                translation.append(box['translation'])
+                size.append(box['size'])
+                rotation.append(box['rotation'])
+                velocity.append(box.get('velocity', (np.nan, np.nan))[:2])
+
+        return cls(sample_tokens,
+                   frame=np.asarray(frame, dtype=np.int32),
+                   track=np.asarray(track, dtype=np.int32),
+                   track_ids=list(track_to_int.keys()),
+                   translation=np.asarray(translation, dtype=np.float64).reshape(-1, 3),
+                   size=np.asarray(size, dtype=np.float64).reshape(-1, 3),
+                   rotation=np.asarray(rotation, dtype=np.float64).reshape(-1, 4),
+                   velocity=np.asarray(velocity, dtype=np.float64).reshape(-1, 2),
+                   score=np.asarray(score, dtype=np.float32),
+                   name=np.asarray(name, dtype=np.int16),
+                   class_names=list(class_to_int.keys()),
+                   timestamps=timestamps)
+
+    def frame_slice(self, frame_idx: int) -> slice:
+        """第 frame_idx 帧所有框的切片"""
+        return slice(int(self.frame_offsets[frame_idx]),
+                     int(self.frame_offsets[frame_idx + 1]))
+
+    def track_rows(self, track: int) -> np.ndarray:
+        """第 track 条轨迹的所有框 (按帧排序)"""
+        return self.track_order[self.track_offsets[track]:
+                                self.track_offsets[track + 1]]
+
+    def neighbor_rows(self, rows: np.ndarray, offset: int) -> np.ndarray:
+        """同一轨迹中相隔 offset 个观测的框，不存在时为 -1 (向量化)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        track = self.track[rows]
+        pos = self.track_offsets[track] + self.track_rank[rows] + offset
+        valid = (pos >= self.track_offsets[track]) & (
+            pos < self.track_offsets[track + 1])
+        neighbors = np.full(len(rows), -1, dtype=np.int64)
+        neighbors[valid] = self.track_order[pos[valid]]
+        return neighbors
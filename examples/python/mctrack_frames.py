@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+MCTrack帧组装 - 与GUI无关的数据层
+给定帧序号和显示设置，返回可直接上传的数组: 点云及属性、跟踪框线段、轨迹和
+运动线段、标签位置。点云解码结果和组装好的帧都有LRU缓存，并在后台线程中预取
+相邻帧。所有几何数据统一在激光雷达坐标系下，与点云对齐。
+GUI、notebook和性能测试都通过本模块取数据
+"""
+
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from mctrack_cache import LRUCache
+from mctrack_data import LIDAR_POINT_DIMS, TrackingResults, read_lidar_points
+from mctrack_geometry import (BOX_EDGES, box_corners, count_points_in_boxes,
+                              quaternion_to_matrix, transform_matrix,
+                              transform_points)
+from mctrack_lidarseg import (label_colors, lidarseg_color_table,
+                              nuscenes_lidarseg_path, read_lidarseg_labels)
+from mctrack_motion import build_motion_lineset, build_trajectory_lineset
+from mctrack_palette import make_palette, track_colors
+from mctrack_preprocess import preprocess_mask
+
+# 点云文件路径、全局->雷达坐标系的变换和lidarseg标签文件路径 (可选)
+SweepInfo = namedtuple('SweepInfo', ['path', 'world_to_lidar', 'labels_path'],
+                       defaults=(None,))
+
+# 解码后的点云: data (N, >=3) float32 [x, y, z, intensity, ...]，colors (N, 3)，
+# labels (N,) uint8 lidarseg标签 (内存映射，预处理后为普通数组) 或 None
+Sweep = namedtuple('Sweep', ['data', 'colors', 'labels'], defaults=(None,))
+
+# 点云预处理 (ROI裁剪、地面去除) 的设置项
+PREPROCESS_SETTING_KEYS = ('roi_range', 'roi_bounds', 'remove_ground',
+                           'ground_method', 'ground_cell_size',
+                           'ground_height_threshold')
+
+# 影响RANSAC地面平面拟合的设置项，作为地面平面缓存键的一部分
+GROUND_PLANE_SETTING_KEYS = ('roi_range', 'roi_bounds', 'ground_height_threshold')
+
+# 影响组装结果的设置项，作为帧缓存键的一部分
+FRAME_SETTING_KEYS = ('show_point_cloud', 'show_tracking_boxes',
+                      'show_trajectories', 'show_motion', 'trajectory_length',
+                      'prediction_horizon', 'prediction_step',
+                      'velocity_arrow_scale', 'point_cloud_color',
+                      'color_by_semantics',
+                      'count_box_points',
+                      'full_box_points') + PREPROCESS_SETTING_KEYS
+
+_EMPTY_LINES = (np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int32),
+                np.zeros((0, 3)))
+
+
+class FrameSettings:
+    """帧组装设置 (默认值与可视化工具一致)，也可直接传入 MCTrackSettings"""
+
+    def __init__(self):
+        self.show_point_cloud = True
+        self.show_tracking_boxes = True
+        self.show_trajectories = True
+        self.show_motion = True
+        self.trajectory_length = 20
+        self.prediction_horizon = 3.0
+        self.prediction_step = 0.5
+        self.velocity_arrow_scale = 1.0
+        self.point_cloud_color = [0.5, 0.5, 0.5]
+        self.color_by_semantics = False  # 按lidarseg标签着色 (有标注时)
+        # 框内点数: 统计原始点云，点数少的框颜色变暗
+        self.count_box_points = True
+        self.full_box_points = 20  # 达到该点数的框显示原色
+        # 点云预处理
+        self.roi_range = 0.0  # 水平距离上限 (米)，0表示不裁剪
+        self.roi_bounds = None  # [x_min, y_min, z_min, x_max, y_max, z_max]
+        self.remove_ground = False
+        self.ground_method = 'grid'  # 'grid' (网格最低高度) 或 'ransac'
+        self.ground_cell_size = 1.0
+        self.ground_height_threshold = 0.25
+
+
+def settings_key(settings, keys: Sequence[str] = FRAME_SETTING_KEYS) -> tuple:
+    """设置的可哈希快照"""
+    key = []
+    for name in keys:
+        value = getattr(settings, name)
+        key.append(tuple(value) if isinstance(value, (list, np.ndarray))
+                   else value)
+    return tuple(key)
+
+
+def snapshot_settings(settings) -> FrameSettings:
+    """复制组装相关的设置，供后台线程使用"""
+    snapshot = FrameSettings()
+    for name, value in zip(FRAME_SETTING_KEYS, settings_key(settings)):
+        setattr(snapshot, name, value)
+    return snapshot
+
+
+def preprocessing_enabled(settings) -> bool:
+    """是否需要对点云做ROI裁剪或地面去除"""
+    return (settings.roi_range > 0 or settings.roi_bounds is not None or
+            settings.remove_ground)
+
+
+def read_sweep(path: Optional[str]) -> np.ndarray:
+    """读取点云文件，文件不存在时返回空数组
+
+    Returns:
+        (N, 5) float32 (.pcd.bin) 或 (N, 3) float32 (其他Open3D支持的格式)
+    """
+    if path is None or not os.path.exists(path):
+        return np.zeros((0, LIDAR_POINT_DIMS), dtype=np.float32)
+    if path.endswith('.pcd.bin'):
+        return read_lidar_points(path)
+    import open3d as o3d  # 仅其他格式需要Open3D读取
+    return np.asarray(o3d.io.read_point_cloud(path).points, dtype=np.float32)
+
+
+def intensity_colors(data: np.ndarray, default_color) -> np.ndarray:
+    """按强度着色 (强度归一化后映射为暖色)，没有强度时使用默认颜色"""
+    if data.shape[1] < 4 or len(data) == 0:
+        return np.tile(np.asarray(default_color, dtype=np.float32),
+                       (len(data), 1))
+    intensity = data[:, 3]
+    low = intensity.min()
+    norm = (intensity - low) / (intensity.max() - low + 1e-8)
+    return norm[:, None] * np.array([1.0, 0.5, 0.3], dtype=np.float32)
+
+
+def point_count_shading(counts: np.ndarray, full_points: int = 20,
+                        min_shade: float = 0.25) -> np.ndarray:
+    """框内点数 -> 颜色亮度系数 (对数刻度: 0点为 min_shade，达到 full_points 为1)
+
+    在深色背景上相当于按点数设置透明度
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if full_points <= 0:
+        return np.ones(len(counts))
+    level = np.clip(np.log1p(counts) / np.log1p(full_points), 0.0, 1.0)
+    return min_shade + (1.0 - min_shade) * level
+
+
+def nuscenes_sweep_lookup(nusc) -> Callable[[str], SweepInfo]:
+    """返回由sample token查询激光雷达点云路径和全局->雷达变换的函数"""
+
+    def lookup(sample_token: str) -> SweepInfo:
+        sample = nusc.get('sample', sample_token)
+        sd_record = nusc.get('sample_data', sample['data']['LIDAR_TOP'])
+        cs_record = nusc.get('calibrated_sensor',
+                             sd_record['calibrated_sensor_token'])
+        pose_record = nusc.get('ego_pose', sd_record['ego_pose_token'])
+        world_to_lidar = (
+            transform_matrix(cs_record['translation'], cs_record['rotation'],
+                             inverse=True) @
+            transform_matrix(pose_record['translation'],
+                             pose_record['rotation'], inverse=True))
+        return SweepInfo(os.path.join(nusc.dataroot, sd_record['filename']),
+                         world_to_lidar,
+                         nuscenes_lidarseg_path(nusc, sd_record['token']))
+
+    return lookup
+
+
+class FrameData:
+    """一帧组装好的数据 (激光雷达坐标系)
+
+    Attributes:
+        frame_idx, sample_token: 帧序号和sample token
+        world_to_lidar: (4, 4) 全局->雷达坐标系的变换
+        points: (N, 3) 点坐标; attributes: (N, K) 其余通道 (强度、线束号)
+        sweep: (N, 3 + K) 原始点云数组 (points/attributes 为其视图)
+        point_colors: (N, 3) 点颜色
+        point_labels: (N,) uint8 lidarseg标签，没有标注时为 None
+        track_ids: 各框的原始跟踪ID; box_tracks: (M,) 各框的轨迹序号
+        box_translation / box_size / box_rotation: 全局坐标系下的框参数
+        box_colors: (M, 3) 框颜色; box_corners: (M, 8, 3) 框顶点
+        box_point_counts: (M,) 框内 (原始点云) 点数，未统计时为 None
+        box_lines: (points, lines, colors) 所有框合并的线段
+        label_positions: (M, 3) 标签位置 (框顶上方)
+        trajectories / motion: (points, lines, colors) 历史轨迹和运动线段
+    """
+
+    def __init__(self, frame_idx: int, sample_token: str,
+                 world_to_lidar: np.ndarray):
+        self.frame_idx = frame_idx
+        self.sample_token = sample_token
+        self.world_to_lidar = world_to_lidar
+        self.sweep = np.zeros((0, LIDAR_POINT_DIMS), dtype=np.float32)
+        self.point_colors = np.zeros((0, 3), dtype=np.float32)
+        self.point_labels: Optional[np.ndarray] = None
+        self.track_ids: List = []
+        self.box_tracks = np.zeros(0, dtype=np.int64)
+        self.box_translation = np.zeros((0, 3))
+        self.box_size = np.zeros((0, 3))
+        self.box_rotation = np.zeros((0, 4))
+        self.box_colors = np.zeros((0, 3))
+        self.box_corners = np.zeros((0, 8, 3))
+        self.box_point_counts: Optional[np.ndarray] = None
+        self.box_lines = _EMPTY_LINES
+        self.label_positions = np.zeros((0, 3))
+        self.trajectories = _EMPTY_LINES
+        self.motion = _EMPTY_LINES
+
+    @property
+    def points(self) -> np.ndarray:
+        return self.sweep[:, :3]
+
+    @property
+    def attributes(self) -> np.ndarray:
+        return self.sweep[:, 3:]
+
+    @property
+    def num_boxes(self) -> int:
+        return len(self.box_corners)
+
+
+class FrameAssembler:
+    """帧组装器
+
+    点云解码结果、预处理结果 (Sweep) 和组装好的帧 (FrameData) 分别缓存；
+    帧缓存键包含影响结果的设置项。组装一帧后在后台线程中预取之后 prefetch 帧
+    和前一帧的点云并完成预处理。本类不依赖GUI，可在任意线程中调用。
+    """
+
+    def __init__(self, sample_tokens: Sequence[str],
+                 sweep_lookup: Optional[Callable[[str], SweepInfo]] = None,
+                 tracks: Optional[TrackingResults] = None,
+                 palette: Optional[Sequence[Sequence[float]]] = None,
+                 cache_size: int = 32, sweep_cache_size: int = 16,
+                 prefetch: int = 2, max_workers: int = 2,
+                 label_table: Optional[np.ndarray] = None):
+        """
+        Args:
+            sample_tokens: 帧顺序
+            sweep_lookup: sample token -> SweepInfo，为 None 时没有点云且
+                全局坐标系即雷达坐标系
+            tracks: 列式跟踪结果，可之后用 set_tracks 设置
+            palette: (K, 3) 跟踪ID颜色表，按跟踪ID的哈希索引，默认为 make_palette()
+            prefetch: 预取之后的帧数，0表示不预取
+            label_table: (256, 3) lidarseg标签颜色查找表，默认在首次使用时由
+                LabelLUT 调色板构建
+        """
+        self.sample_tokens = list(sample_tokens)
+        self.sweep_lookup = sweep_lookup
+        self.palette = np.asarray(palette if palette is not None
+                                  else make_palette(), dtype=np.float64)
+        self.prefetch_frames = prefetch
+        self.label_table = label_table
+        self.frames = LRUCache(cache_size)
+        self.sweeps = LRUCache(sweep_cache_size)
+        self.processed = LRUCache(sweep_cache_size)  # 预处理后的点云
+        self.ground_planes = LRUCache(1024)  # (帧, ROI和阈值设置) -> RANSAC地面平面
+        self.point_counts = LRUCache(4096)  # (结果文件, sample token) -> 框内点数
+        self._sweep_infos: Dict[int, SweepInfo] = {}
+        self._loading = {}  # frame_idx -> Future
+        self._lock = threading.Lock()
+        self._executor = (ThreadPoolExecutor(max_workers=max_workers,
+                                             thread_name_prefix="MCTrackFrames")
+                          if prefetch > 0 else None)
+        self.tracks = None
+        self.results_key = None
+        self._count_source = (None, None)
+        self.track_colors = np.zeros((0, 3))
+        self.set_tracks(tracks)
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.sample_tokens)
+
+    def set_tracks(self, tracks: Optional[TrackingResults],
+                   results_key: Optional[Hashable] = None):
+        """更换跟踪结果 (点云缓存保留，帧缓存清空)
+
+        Args:
+            results_key: 结果文件的标识 (例如路径)，框内点数按
+                (results_key, sample token) 缓存；为 None 时不与其他结果共享
+        """
+        self.tracks = tracks
+        self.results_key = results_key if results_key is not None else object()
+        self._count_source = (tracks, self.results_key)  # 供后台线程原子读取
+        if tracks is not None:
+            # 按跟踪ID的稳定哈希取色，每帧的框和轨迹颜色按轨迹序号索引
+            self.track_colors = track_colors(tracks.track_ids, self.palette)
+        else:
+            self.track_colors = np.zeros((0, 3))
+        self.frames.clear()
+
+    def sweep_info(self, frame_idx: int) -> SweepInfo:
+        """点云路径和全局->雷达变换 (缓存)"""
+        info = self._sweep_infos.get(frame_idx)
+        if info is None:
+            if self.sweep_lookup is None:
+                info = SweepInfo(None, np.eye(4))
+            else:
+                info = self.sweep_lookup(self.sample_tokens[frame_idx])
+            self._sweep_infos[frame_idx] = info
+        return info
+
+    def load_sweep(self, frame_idx: int, default_color=(0.5, 0.5, 0.5)) -> Sweep:
+        """读取一帧点云 (优先使用缓存或正在进行的预取)"""
+        sweep = self.sweeps.get(frame_idx)
+        if sweep is not None:
+            return sweep
+        with self._lock:
+            future = self._loading.get(frame_idx)
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        return self._read_sweep(frame_idx, default_color)
+
+    def _read_sweep(self, frame_idx: int, default_color) -> Sweep:
+        info = self.sweep_info(frame_idx)
+        data = read_sweep(info.path)
+        labels = read_lidarseg_labels(info.labels_path)
+        if labels is not None and len(labels) != len(data):
+            print(f"Warning: lidarseg labels do not match sweep: {info.labels_path}")
+            labels = None
+        sweep = Sweep(data, intensity_colors(data, default_color), labels)
+        self.sweeps.put(frame_idx, sweep)
+        return sweep
+
+    def processed_sweep(self, frame_idx: int, settings) -> Sweep:
+        """读取并预处理一帧点云 (ROI裁剪、地面去除)，结果缓存"""
+        if not preprocessing_enabled(settings):
+            return self.load_sweep(frame_idx, settings.point_cloud_color)
+        key = (frame_idx, settings_key(settings, PREPROCESS_SETTING_KEYS))
+        sweep = self.processed.get(key)
+        if sweep is None:
+            raw = self.load_sweep(frame_idx, settings.point_cloud_color)
+            sweep = self.processed.get(key)  # 预取任务可能已经完成预处理
+            if sweep is None:
+                sweep = self._preprocess(frame_idx, raw, settings, key)
+        return sweep
+
+    def _preprocess(self, frame_idx: int, raw: Sweep, settings, key) -> Sweep:
+        use_plane = settings.remove_ground and settings.ground_method == 'ransac'
+        plane_key = (frame_idx, settings_key(settings, GROUND_PLANE_SETTING_KEYS))
+        plane = self.ground_planes.get(plane_key) if use_plane else None
+        keep, plane = preprocess_mask(raw.data, settings, plane)
+        if use_plane and plane is not None:
+            self.ground_planes.put(plane_key, plane)
+        sweep = Sweep(raw.data[keep], raw.colors[keep],
+                      raw.labels[keep] if raw.labels is not None else None)
+        self.processed.put(key, sweep)
+        return sweep
+
+    def box_point_counts(self, frame_idx: int,
+                         sweep: Optional[Sweep] = None) -> np.ndarray:
+        """一帧中每个框内的原始点云点数 (按 (结果文件, sample) 缓存)
+
+        Args:
+            sweep: 已解码的点云，为 None 时读取 (或使用缓存)
+        """
+        tracks, results_key = self._count_source
+        if tracks is None:
+            return np.zeros(0, dtype=np.int64)
+        key = (results_key, self.sample_tokens[frame_idx])
+        counts = self.point_counts.get(key)
+        if counts is None:
+            if sweep is None:
+                sweep = self.load_sweep(frame_idx)
+            rows = tracks.frame_slice(frame_idx)
+            world_to_lidar = self.sweep_info(frame_idx).world_to_lidar
+            counts = count_points_in_boxes(
+                sweep.data, transform_points(tracks.translation[rows],
+                                             world_to_lidar),
+                tracks.size[rows],
+                world_to_lidar[:3, :3] @ quaternion_to_matrix(
+                    tracks.rotation[rows]))
+            self.point_counts.put(key, counts)
+        return counts
+
+    def _prefetch_frame(self, frame_idx: int, settings) -> Sweep:
+        """后台任务: 读取点云并按需预处理和统计框内点数，返回解码结果"""
+        raw = self.sweeps.get(frame_idx)  # 设置改变时原始点云可能已缓存
+        if raw is None:
+            raw = self._read_sweep(frame_idx, settings.point_cloud_color)
+        if preprocessing_enabled(settings):
+            key = (frame_idx, settings_key(settings, PREPROCESS_SETTING_KEYS))
+            if key not in self.processed:
+                self._preprocess(frame_idx, raw, settings, key)
+        if settings.count_box_points and settings.show_tracking_boxes:
+            self.box_point_counts(frame_idx, raw)
+        return raw
+
+    def prefetch(self, frame_idx: int, settings=None):
+        """在后台预取 frame_idx 之后 prefetch 帧和之前一帧的点云"""
+        settings = snapshot_settings(settings or FrameSettings())
+        candidates = list(range(frame_idx + 1,
+                                frame_idx + 1 + self.prefetch_frames))
+        candidates.append(frame_idx - 1)
+        submitted = []
+        with self._lock:
+            if self._executor is None:
+                return
+            for idx in candidates:
+                if (not 0 <= idx < self.num_frames or idx in self._loading or
+                        self._is_prefetched(idx, settings)):
+                    continue
+                future = self._executor.submit(self._prefetch_frame, idx,
+                                               settings)
+                self._loading[idx] = future
+                submitted.append((idx, future))
+        # 在锁外注册回调: 已完成的任务会立即在当前线程中调用回调
+        for idx, future in submitted:
+            future.add_done_callback(lambda f, idx=idx: self._on_prefetched(idx))
+
+    def _is_prefetched(self, frame_idx: int, settings) -> bool:
+        """预取结果已缓存: 开启预处理时检查该设置下的预处理结果，否则检查原始点云"""
+        if preprocessing_enabled(settings):
+            return ((frame_idx, settings_key(settings, PREPROCESS_SETTING_KEYS))
+                    in self.processed)
+        return frame_idx in self.sweeps
+
+    def _on_prefetched(self, frame_idx: int):
+        with self._lock:
+            self._loading.pop(frame_idx, None)
+
+    def assemble(self, frame_idx: int, settings=None,
+                 prefetch: bool = True) -> FrameData:
+        """组装一帧 (缓存)
+
+        Args:
+            frame_idx: 帧序号
+            settings: 显示设置 (包含 FRAME_SETTING_KEYS 中的属性)，默认为
+                FrameSettings()
+            prefetch: 是否在后台预取相邻帧的点云
+        """
+        settings = snapshot_settings(settings or FrameSettings())
+        key = (frame_idx, settings_key(settings))
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self._assemble(frame_idx, settings)
+            self.frames.put(key, frame)
+        if prefetch and settings.show_point_cloud:
+            self.prefetch(frame_idx, settings)
+        return frame
+
+    def assemble_boxes(self, frame_idx: int) -> FrameData:
+        """仅组装跟踪框 (不读取点云，不计算轨迹)，用于拖动预览和缩略图"""
+        frame = FrameData(frame_idx, self.sample_tokens[frame_idx],
+                          self.sweep_info(frame_idx).world_to_lidar)
+        self._fill_boxes(frame)
+        return frame
+
+    def _assemble(self, frame_idx: int, settings) -> FrameData:
+        frame = FrameData(frame_idx, self.sample_tokens[frame_idx],
+                          self.sweep_info(frame_idx).world_to_lidar)
+        if settings.show_point_cloud:
+            sweep = self.processed_sweep(frame_idx, settings)
+            frame.sweep, frame.point_colors = sweep.data, sweep.colors
+            frame.point_labels = sweep.labels
+            if settings.color_by_semantics and sweep.labels is not None:
+                if self.label_table is None:
+                    self.label_table = lidarseg_color_table()
+                frame.point_colors = label_colors(sweep.labels, self.label_table)
+        if self.tracks is None:
+            return frame
+        if settings.show_tracking_boxes:
+            self._fill_boxes(frame)
+            if settings.count_box_points and self.sweep_lookup is not None:
+                frame.box_point_counts = self.box_point_counts(frame_idx)
+                self._shade_boxes(frame, point_count_shading(
+                    frame.box_point_counts, settings.full_box_points))
+        if settings.show_trajectories:
+            points, lines, colors = build_trajectory_lineset(
+                self.tracks, frame_idx, settings.trajectory_length,
+                self.track_colors)
+            frame.trajectories = (transform_points(points, frame.world_to_lidar),
+                                  lines, colors)
+        if settings.show_motion:
+            rows = self.tracks.frame_slice(frame_idx)
+            points, lines, colors = build_motion_lineset(
+                self.tracks, frame_idx,
+                self.track_colors[self.tracks.track[rows]],
+                arrow_scale=settings.velocity_arrow_scale,
+                horizon=settings.prediction_horizon,
+                step=settings.prediction_step)
+            frame.motion = (transform_points(points, frame.world_to_lidar),
+                            lines, colors)
+        return frame
+
+    def _fill_boxes(self, frame: FrameData):
+        """计算框顶点、合并线段和标签位置"""
+        if self.tracks is None:
+            return
+        tracks = self.tracks
+        rows = tracks.frame_slice(frame.frame_idx)
+        frame.box_tracks = tracks.track[rows]
+        frame.track_ids = [tracks.track_ids[t] for t in frame.box_tracks]
+        frame.box_translation = tracks.translation[rows]
+        frame.box_size = tracks.size[rows]
+        frame.box_rotation = tracks.rotation[rows]
+        frame.box_colors = self.track_colors[frame.box_tracks]
+        frame.box_corners = transform_points(
+            box_corners(frame.box_translation, frame.box_size,
+                        frame.box_rotation), frame.world_to_lidar)
+
+        num_boxes = len(frame.box_corners)
+        lines = (BOX_EDGES[None, :, :] +
+                 8 * np.arange(num_boxes, dtype=np.int32)[:, None, None])
+        frame.box_lines = (frame.box_corners.reshape(-1, 3),
+                           lines.reshape(-1, 2),
+                           np.repeat(frame.box_colors, len(BOX_EDGES), axis=0))
+
+        tops = frame.box_translation.copy()
+        tops[:, 2] += 0.5 * frame.box_size[:, 2] + 0.3  # 框顶上方
+        frame.label_positions = transform_points(tops, frame.world_to_lidar)
+
+    @staticmethod
+    def _shade_boxes(frame: FrameData, shade: np.ndarray):
+        """按系数调暗框颜色 (包括合并线段的颜色)"""
+        frame.box_colors = frame.box_colors * shade[:, None]
+        points, lines, _ = frame.box_lines
+        frame.box_lines = (points, lines,
+                           np.repeat(frame.box_colors, len(BOX_EDGES), axis=0))
+
+    def shutdown(self):
+        """停止预取线程"""
+        with self._lock:
+            pending = list(self._loading.values())
+            self._loading.clear()
+            executor, self._executor = self._executor, None
+        # 取消会同步调用完成回调，因此在锁外进行
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+MCTrack几何工具 - 跟踪框与相机投影的向量化计算
+仅依赖NumPy，不涉及GUI，可在无显示环境下使用
+"""
+
+import numpy as np
+
+# 3D框的12条边 (底面、顶面、垂直边)，顶点顺序见 box_corners
+BOX_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],
+    [4, 5], [5, 6], [6, 7], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7]
+], dtype=np.int32)
+
+# 单位框顶点 (x: 长度方向, y: 宽度方向, z: 高度方向)
+_UNIT_CORNERS = 0.5 * np.array([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
+], dtype=np.float64)
+
+
+def quaternion_to_matrix(quaternions) -> np.ndarray:
+    """四元数 [w, x, y, z] (nuScenes格式) 批量转换为旋转矩阵 (..., 3, 3)"""
+    q = np.asarray(quaternions, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    matrix = np.empty(q.shape[:-1] + (3, 3))
+    matrix[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    matrix[..., 0, 1] = 2 * (x * y - z * w)
+    matrix[..., 0, 2] = 2 * (x * z + y * w)
+    matrix[..., 1, 0] = 2 * (x * y + z * w)
+    matrix[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    matrix[..., 1, 2] = 2 * (y * z - x * w)
+    matrix[..., 2, 0] = 2 * (x * z - y * w)
+    matrix[..., 2, 1] = 2 * (y * z + x * w)
+    matrix[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return matrix
+
+
+def quaternion_yaw(quaternions) -> np.ndarray:
+    """四元数 [w, x, y, z] 批量计算偏航角"""
+    q = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+
+def transform_matrix(translation, rotation, inverse: bool = False) -> np.ndarray:
+    """由平移和四元数 [w, x, y, z] 构造4x4齐次变换矩阵"""
+    rot = quaternion_to_matrix(rotation)
+    trans = np.asarray(translation, dtype=np.float64)
+    tm = np.eye(4)
+    if inverse:
+        tm[:3, :3] = rot.T
+        tm[:3, 3] = -rot.T @ trans
+    else:
+        tm[:3, :3] = rot
+        tm[:3, 3] = trans
+    return tm
+
+
+def transform_points(points, matrix) -> np.ndarray:
+    """用4x4齐次变换矩阵批量变换点 (..., 3)"""
+    points = np.asarray(points, dtype=np.float64)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def box_corners(translation, size, rotation) -> np.ndarray:
+    """批量计算3D框的8个顶点
+
+    Args:
+        translation: (N, 3) 框中心
+        size: (N, 3) nuScenes格式尺寸 [宽, 长, 高]
+        rotation: (N, 4) 四元数 [w, x, y, z]
+
+    Returns:
+        (N, 8, 3) 顶点坐标，顶点顺序与 BOX_EDGES 对应
+    """
+    translation = np.asarray(translation, dtype=np.float64).reshape(-1, 3)
+    size = np.asarray(size, dtype=np.float64).reshape(-1, 3)
+    if len(translation) == 0:
+        return np.zeros((0, 8, 3))
+    # [w, l, h] -> 沿 [x, y, z] 的半轴长度 [l, w, h]
+    lwh = size[:, [1, 0, 2]]
+    local = _UNIT_CORNERS[None, :, :] * lwh[:, None, :]
+    rot = quaternion_to_matrix(np.asarray(rotation).reshape(-1, 4))
+    return np.einsum('nij,nkj->nki', rot, local) + translation[:, None, :]
+
+
+def project_points(points, world_to_camera, intrinsic):
+    """将全局坐标系下的点批量投影到相机图像
+
+    Args:
+        points: (..., 3) 全局坐标
+        world_to_camera: (4, 4) 全局到相机坐标系的变换
+        intrinsic: (3, 3) 相机内参
+
+    Returns:
+        pixels: (..., 2) 像素坐标
+        depth: (...,) 相机坐标系下的深度
+    """
+    points = np.asarray(points, dtype=np.float64)
+    cam = points @ world_to_camera[:3, :3].T + world_to_camera[:3, 3]
+    depth = cam[..., 2]
+    uvw = cam @ np.asarray(intrinsic, dtype=np.float64).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pixels = uvw[..., :2] / uvw[..., 2:3]
+    return pixels, depth
+
+
+def project_boxes(corners, world_to_camera, intrinsic, image_size,
+                  min_depth: float = 0.5):
+    """将所有跟踪框一次性投影到相机图像
+
+    Args:
+        corners: (N, 8, 3) 全局坐标系下的框顶点
+        world_to_camera: (4, 4) 全局到相机坐标系的变换
+        intrinsic: (3, 3) 相机内参
+        image_size: (宽, 高) 像素
+        min_depth: 顶点的最小深度，位于相机后方的框不绘制
+
+    Returns:
+        pixels: (N, 8, 2) 顶点像素坐标
+        visible: (N,) 框是否完全位于相机前方且与图像相交
+    """
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 8, 3)
+    pixels, depth = project_points(corners, world_to_camera, intrinsic)
+    width, height = image_size
+    in_front = np.all(depth > min_depth, axis=1)
+    in_image = ((pixels[..., 0] >= 0) & (pixels[..., 0] < width) &
+                (pixels[..., 1] >= 0) & (pixels[..., 1] < height))
+    visible = in_front & np.any(in_image, axis=1)
+    return pixels, visible
+
+
+def draw_box_edges(image: np.ndarray, pixels, colors, samples_per_edge: int = 64):
+    """在RGB图像上绘制投影后的框边 (原地修改)
+
+    所有框的所有边一次性采样并写入像素，不逐框循环。
+
+    Args:
+        image: (H, W, 3) uint8 图像
+        pixels: (N, 8, 2) 顶点像素坐标 (已按缩略图比例缩放)
+        colors: (N, 3) uint8 颜色
+        samples_per_edge: 每条边的采样点数
+    """
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 8, 2)
+    if len(pixels) == 0:
+        return image
+    height, width = image.shape[:2]
+    start = pixels[:, BOX_EDGES[:, 0]]  # (N, 12, 2)
+    end = pixels[:, BOX_EDGES[:, 1]]
+    t = np.linspace(0.0, 1.0, samples_per_edge)[None, None, :, None]
+    samples = start[:, :, None, :] + (end - start)[:, :, None, :] * t
+    u = np.rint(samples[..., 0]).astype(np.int64).reshape(len(pixels), -1)
+    v = np.rint(samples[..., 1]).astype(np.int64).reshape(len(pixels), -1)
+    box_idx = np.broadcast_to(np.arange(len(pixels))[:, None], u.shape)
+    inside = (u >= 0) & (u < width) & (v >= 0) & (v < height)
+    image[v[inside], u[inside]] = np.asarray(colors, dtype=np.uint8)[
+        box_idx[inside]]
+    return image
+
+
+def count_points_in_boxes(points, translation, size, rotation,
+                          cell_size: float = 1.0) -> np.ndarray:
+    """一次性统计每个3D框内的点数
+
+    点按水平网格排序分桶，每个框只取其外接球覆盖的网格中的候选点，
+    将所有 (框, 候选点) 对一起变换到框坐标系判断，不逐框循环。
+
+    Args:
+        points: (N, >=3) 点云
+        translation: (M, 3) 框中心 (与点云同一坐标系)
+        size: (M, 3) nuScenes格式尺寸 [宽, 长, 高]
+        rotation: (M, 3, 3) 框坐标系到点云坐标系的旋转矩阵
+        cell_size: 网格边长 (米)
+
+    Returns:
+        (M,) int64 每个框内的点数
+    """
+    translation = np.asarray(translation, dtype=np.float64).reshape(-1, 3)
+    counts = np.zeros(len(translation), dtype=np.int64)
+    if len(translation) == 0 or len(points) == 0:
+        return counts
+    half = 0.5 * np.asarray(size, dtype=np.float64).reshape(-1, 3)[:, [1, 0, 2]]
+    radius = np.linalg.norm(half, axis=1)  # 任意旋转下都覆盖整个框
+
+    x, y = points[:, 0], points[:, 1]
+    origin = np.array([x.min(), y.min()], dtype=np.float64)
+    cell_x = ((x - origin[0]) // cell_size).astype(np.int64)
+    cell_y = ((y - origin[1]) // cell_size).astype(np.int64)
+    shape = np.array([cell_x.max() + 1, cell_y.max() + 1])
+    cell_id = cell_x * shape[1] + cell_y
+    order = np.argsort(cell_id)
+    sorted_ids = cell_id[order]
+
+    # 每个框覆盖的网格范围 [lo, hi]，框外接正方形与点云范围求交
+    lo = np.floor((translation[:, :2] - radius[:, None] - origin) /
+                  cell_size).astype(np.int64)
+    hi = np.floor((translation[:, :2] + radius[:, None] - origin) /
+                  cell_size).astype(np.int64)
+    lo = np.maximum(lo, 0)
+    hi = np.minimum(hi, shape - 1)
+    extent = np.maximum(hi - lo + 1, 0)
+    num_cells = extent[:, 0] * extent[:, 1]
+    if num_cells.sum() == 0:
+        return counts
+
+    # 展开 (框, 网格) 对
+    cell_box = np.repeat(np.arange(len(translation)), num_cells)
+    k = np.arange(len(cell_box)) - np.repeat(np.cumsum(num_cells) - num_cells,
+                                             num_cells)
+    ny = extent[cell_box, 1]
+    query = ((lo[cell_box, 0] + k // ny) * shape[1] +
+             lo[cell_box, 1] + k % ny)
+    start = np.searchsorted(sorted_ids, query, side='left')
+    lengths = np.searchsorted(sorted_ids, query, side='right') - start
+
+    # 展开 (框, 候选点) 对并变换到框坐标系: R^T (p - c)
+    pair_box = np.repeat(cell_box, lengths)
+    pair_point = order[np.arange(len(pair_box)) -
+                       np.repeat(np.cumsum(lengths) - lengths - start, lengths)]
+    rot = np.asarray(rotation, dtype=np.float64).reshape(-1, 3, 3)
+    local = np.einsum('nji,nj->ni', rot[pair_box],
+                      points[pair_point, :3] - translation[pair_box])
+    inside = np.all(np.abs(local) <= half[pair_box], axis=1)
+    return np.bincount(pair_box[inside], minlength=len(translation))
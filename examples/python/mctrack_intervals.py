@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+MCTrack区间索引 - 查询某一帧或某一帧范围内存活的轨迹
+静态的中心区间树，一次构建后以扁平数组存储；点查询 (stabbing) 和范围查询均为
+O(log n + k)，存活数量查询为 O(log n)
+"""
+
+import numpy as np
+
+
+class IntervalIndex:
+    """闭区间 [start, end] 的静态中心区间树
+
+    每个节点保存跨越其中心点的区间，分别按起点升序和终点降序排列；
+    左子树的区间全部在中心点左侧，右子树的区间全部在中心点右侧。
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        # 全局按起点/终点排序，用于范围查询和计数
+        self._start_order = np.argsort(self.starts, kind='stable')
+        self._sorted_starts = self.starts[self._start_order]
+        self._sorted_ends = np.sort(self.ends)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self):
+        """迭代构建区间树，节点数据拼接为扁平数组"""
+        centers, left, right, offsets = [], [], [], [0]
+        by_start, by_end = [], []
+        stack = [(np.arange(len(self.starts)), -1, 0)] if len(self.starts) else []
+        while stack:
+            ids, parent, side = stack.pop()
+            node = len(centers)
+            if parent >= 0:
+                (left if side < 0 else right)[parent] = node
+            starts, ends = self.starts[ids], self.ends[ids]
+            # 中心取区间中点的中位数 (某个区间的中点，保证该区间跨越中心)
+            mids = starts + ends  # 中点的2倍，避免浮点
+            center2 = np.partition(mids, len(mids) // 2)[len(mids) // 2]
+            here = (2 * starts <= center2) & (2 * ends >= center2)
+            node_ids = ids[here]
+            by_start.append(node_ids[np.argsort(starts[here], kind='stable')])
+            by_end.append(node_ids[np.argsort(-ends[here], kind='stable')])
+            offsets.append(offsets[-1] + len(node_ids))
+            centers.append(center2)
+            left.append(-1)
+            right.append(-1)
+            lower = 2 * ends < center2
+            upper = 2 * starts > center2
+            if np.any(lower):
+                stack.append((ids[lower], node, -1))
+            if np.any(upper):
+                stack.append((ids[upper], node, 1))
+        self._centers2 = np.asarray(centers, dtype=np.int64)
+        self._left = np.asarray(left, dtype=np.int64)
+        self._right = np.asarray(right, dtype=np.int64)
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        empty = np.zeros(0, dtype=np.int64)
+        self._by_start = np.concatenate(by_start) if by_start else empty
+        self._by_end = np.concatenate(by_end) if by_end else empty
+        self._by_start_keys = self.starts[self._by_start]
+        self._by_end_keys = -self.ends[self._by_end]  # 降序存为升序的相反数
+
+    def stab(self, x: int) -> np.ndarray:
+        """包含 x 的所有区间 (升序的区间序号)"""
+        found = []
+        node = 0 if len(self._centers2) > 0 else -1
+        x2 = 2 * x
+        while node >= 0:
+            a, b = self._offsets[node], self._offsets[node + 1]
+            center2 = self._centers2[node]
+            if x2 < center2:
+                k = np.searchsorted(self._by_start_keys[a:b], x, side='right')
+                found.append(self._by_start[a:a + k])
+                node = self._left[node]
+            elif x2 > center2:
+                k = np.searchsorted(self._by_end_keys[a:b], -x, side='right')
+                found.append(self._by_end[a:a + k])
+                node = self._right[node]
+            else:
+                found.append(self._by_start[a:b])
+                break
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+    def overlapping(self, low: int, high: int) -> np.ndarray:
+        """与 [low, high] 相交的所有区间 (升序的区间序号)
+
+        即包含 low 的区间，加上起点在 (low, high] 内的区间 (两者不相交)
+        """
+        a = np.searchsorted(self._sorted_starts, low, side='right')
+        b = np.searchsorted(self._sorted_starts, high, side='right')
+        return np.sort(np.concatenate([self.stab(low),
+                                       self._start_order[a:b]]))
+
+    def count(self, x: int) -> int:
+        """包含 x 的区间数量: 起点 <= x 的数量减去终点 < x 的数量"""
+        return int(np.searchsorted(self._sorted_starts, x, side='right') -
+                   np.searchsorted(self._sorted_ends, x, side='left'))
+
+    def coverage(self, length: int) -> np.ndarray:
+        """每个整数位置 [0, length) 被多少个区间覆盖 (差分 + 累加)"""
+        diff = np.zeros(length + 1, dtype=np.int64)
+        np.add.at(diff, np.clip(self.starts, 0, length), 1)
+        np.add.at(diff, np.clip(self.ends + 1, 0, length), -1)
+        return np.cumsum(diff[:-1])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+MCTrack跟踪ID标签池 - 在3D视图中显示跟踪ID
+标签只在首次需要时创建 (不超过上限)，之后每帧仅移动位置和修改文本，
+避免逐帧添加/删除标签带来的开销
+"""
+
+from typing import List
+
+import numpy as np
+
+
+def select_visible_labels(positions, view_matrix, projection_matrix,
+                          viewport_size, max_distance: float,
+                          cell_size: float, max_labels: int) -> np.ndarray:
+    """按距离和屏幕密度筛选需要显示的标签 (向量化)
+
+    Args:
+        positions: (N, 3) 标签位置
+        view_matrix: (4, 4) 相机视图矩阵
+        projection_matrix: (4, 4) 相机投影矩阵
+        viewport_size: (宽, 高) 像素
+        max_distance: 超过该距离的标签不显示
+        cell_size: 屏幕网格大小 (像素)，每个网格最多显示一个 (最近的) 标签
+        max_labels: 最多显示的标签数
+
+    Returns:
+        选中标签的索引，按距离由近到远排序
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if len(positions) == 0:
+        return np.zeros(0, dtype=np.int64)
+    homogeneous = np.hstack([positions, np.ones((len(positions), 1))])
+    eye = homogeneous @ np.asarray(view_matrix, dtype=np.float64).T
+    distance = np.linalg.norm(eye[:, :3], axis=1)
+    clip = eye @ np.asarray(projection_matrix, dtype=np.float64).T
+    w = clip[:, 3]
+    candidates = np.flatnonzero((distance <= max_distance) & (w > 1e-6))
+    if len(candidates) == 0:
+        return candidates
+    ndc = clip[candidates, :2] / w[candidates, None]
+    on_screen = np.all(np.abs(ndc) <= 1.0, axis=1)
+    candidates, ndc = candidates[on_screen], ndc[on_screen]
+
+    # 由近到远排序，每个屏幕网格只保留第一个 (最近的) 标签
+    order = np.argsort(distance[candidates], kind='stable')
+    candidates, ndc = candidates[order], ndc[order]
+    width, height = viewport_size
+    cols = max(1, int(np.ceil(width / cell_size)))
+    cell_x = np.clip(((ndc[:, 0] + 1) * 0.5 * width) // cell_size, 0, cols - 1)
+    cell_y = np.clip(((1 - ndc[:, 1]) * 0.5 * height) // cell_size, 0, None)
+    cells = cell_y.astype(np.int64) * cols + cell_x.astype(np.int64)
+    _, first = np.unique(cells, return_index=True)
+    return candidates[np.sort(first)][:max_labels]
+
+
+class TrackLabelPool:
+    """复用的3D文本标签池
+
+    标签在需要时创建并一直保留；未使用的标签仅清空文本，不从场景中删除。
+    """
+
+    def __init__(self, scene_widget, max_labels: int = 128,
+                 max_distance: float = 60.0, cell_size: float = 40.0):
+        self.scene_widget = scene_widget
+        self.max_labels = max_labels
+        self.max_distance = max_distance
+        self.cell_size = cell_size
+        self._labels: List = []
+        self._num_active = 0
+
+    def update(self, positions, texts, colors):
+        """更新当前帧的标签
+
+        Args:
+            positions: (N, 3) 所有跟踪框的标签位置
+            texts: 长度为N的标签文本
+            colors: (N, 3) 标签颜色 [0, 1]
+        """
+        camera = self.scene_widget.scene.camera
+        frame = self.scene_widget.frame
+        selected = select_visible_labels(positions,
+                                         camera.get_view_matrix(),
+                                         camera.get_projection_matrix(),
+                                         (frame.width, frame.height),
+                                         self.max_distance, self.cell_size,
+                                         self.max_labels)
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+
+        # 只有池中标签不足时才创建新标签
+        while len(self._labels) < len(selected):
+            self._labels.append(
+                self.scene_widget.add_3d_label(np.zeros(3, np.float32), ""))
+
+        import open3d.visualization.gui as gui  # 筛选函数不依赖GUI模块
+        for label, idx in zip(self._labels, selected):
+            label.position = positions[idx]
+            label.text = texts[idx]
+            label.color = gui.Color(*colors[idx])
+        # 隐藏上一帧使用但本帧未使用的标签
+        for label in self._labels[len(selected):self._num_active]:
+            label.text = ""
+        self._num_active = len(selected)
+
+    def hide_all(self):
+        """隐藏所有标签 (保留在池中)"""
+        for label in self._labels[:self._num_active]:
+            label.text = ""
+        self._num_active = 0
+
+    def release(self):
+        """从场景中移除所有标签"""
+        for label in self._labels:
+            self.scene_widget.remove_3d_label(label)
+        self._labels = []
+        self._num_active = 0
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+MCTrack语义着色 - nuScenes-lidarseg逐点标签
+标签文件以内存映射方式读取 (uint8，每点一个类别)，通过 (256, 3) 颜色查找表
+一次性索引得到点颜色，不转换为Python列表
+"""
+
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# nuScenes-lidarseg 类别 (标签值 -> 名称)
+NUSCENES_LIDARSEG_CLASSES = {
+    0: 'noise', 1: 'animal', 2: 'human.pedestrian.adult',
+    3: 'human.pedestrian.child', 4: 'human.pedestrian.construction_worker',
+    5: 'human.pedestrian.personal_mobility', 6: 'human.pedestrian.police_officer',
+    7: 'human.pedestrian.stroller', 8: 'human.pedestrian.wheelchair',
+    9: 'movable_object.barrier', 10: 'movable_object.debris',
+    11: 'movable_object.pushable_pullable', 12: 'movable_object.trafficcone',
+    13: 'static_object.bicycle_rack', 14: 'vehicle.bicycle',
+    15: 'vehicle.bus.bendy', 16: 'vehicle.bus.rigid', 17: 'vehicle.car',
+    18: 'vehicle.construction', 19: 'vehicle.emergency.ambulance',
+    20: 'vehicle.emergency.police', 21: 'vehicle.motorcycle',
+    22: 'vehicle.trailer', 23: 'vehicle.truck', 24: 'flat.driveable_surface',
+    25: 'flat.other', 26: 'flat.sidewalk', 27: 'flat.terrain',
+    28: 'static.manmade', 29: 'static.other', 30: 'static.vegetation',
+    31: 'vehicle.ego',
+}
+
+# 查找表中未定义标签的颜色
+UNKNOWN_LABEL_COLOR = (0.5, 0.5, 0.5)
+
+
+def read_lidarseg_labels(path: Optional[str]) -> Optional[np.ndarray]:
+    """内存映射读取lidarseg标签文件，文件不存在时返回 None
+
+    Returns:
+        (N,) uint8 只读 memmap
+    """
+    if path is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+
+def color_table(label_colors: Dict[int, Sequence[float]]) -> np.ndarray:
+    """由 {标签值: RGB} 构建 (256, 3) float32 查找表 (颜色裁剪到 [0, 1])"""
+    table = np.tile(np.asarray(UNKNOWN_LABEL_COLOR, dtype=np.float32), (256, 1))
+    for value, color in label_colors.items():
+        table[int(value)] = np.clip(color, 0.0, 1.0)
+    return table
+
+
+def lidarseg_color_table(label_to_names: Optional[Dict[int, str]] = None
+                         ) -> np.ndarray:
+    """使用TensorBoard插件的 LabelLUT 调色板构建lidarseg颜色查找表
+
+    Args:
+        label_to_names: 标签值 -> 类别名，默认为nuScenes-lidarseg类别
+    """
+    from open3d.visualization.tensorboard_plugin.labellut import LabelLUT
+    lut = LabelLUT(label_to_names or NUSCENES_LIDARSEG_CLASSES)
+    return color_table({value: label.color
+                        for value, label in lut.labels.items()})
+
+
+def label_colors(labels: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """逐点标签 -> (N, 3) 颜色 (向量化查表)"""
+    return table[np.asarray(labels, dtype=np.uint8)]
+
+
+def nuscenes_lidarseg_path(nusc, lidar_token: str) -> Optional[str]:
+    """激光雷达 sample_data 对应的lidarseg标签文件路径，没有标注时返回 None"""
+    if not hasattr(nusc, 'lidarseg'):
+        return None
+    try:
+        record = nusc.get('lidarseg', lidar_token)
+    except KeyError:
+        return None
+    return os.path.join(nusc.dataroot, record['filename'])
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+MCTrack高精地图图块 - nuScenes maps/ 栅格的多分辨率分块缓存
+大尺寸地图PNG只解码一次，按多个分辨率切分为固定大小的图块，每一层保存为一个
+图块连续存储的 .npy 文件 (ny, nx, T, T)；之后以内存映射打开，只读取用到的图块。
+不依赖GUI
+"""
+
+import json
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# nuScenes地图栅格分辨率 (米/像素)，原点在图像左下角
+MAP_RESOLUTION = 0.1
+
+MAP_TILES_FORMAT_VERSION = 1
+
+# 地图图块颜色: 背景和可行驶区域 (按像素值线性插值)
+MAP_BACKGROUND_COLOR = (25, 25, 28)
+MAP_FOREGROUND_COLOR = (70, 80, 105)
+
+
+def _downsample(image: np.ndarray) -> np.ndarray:
+    """2x2平均下采样 (奇数尺寸时边缘补零，四舍六入五成双)
+
+    在 uint16 上求和，不生成整幅图像的浮点副本
+    """
+    h, w = image.shape
+    h2, w2 = h // 2, w // 2
+    sums = np.zeros((-(-h // 2), -(-w // 2)), dtype=np.uint16)
+    sums[:h2, :w2] = image[:2 * h2, :2 * w2].reshape(h2, 2, w2, 2).sum(
+        axis=(1, 3), dtype=np.uint16)
+    if h % 2:
+        sums[-1, :w2] = image[-1, :2 * w2].reshape(w2, 2).sum(axis=1,
+                                                              dtype=np.uint16)
+    if w % 2:
+        sums[:h2, -1] = image[:2 * h2, -1].reshape(h2, 2).sum(axis=1,
+                                                              dtype=np.uint16)
+    if h % 2 and w % 2:
+        sums[-1, -1] = image[-1, -1]
+    # sums / 4 舍入到最近的偶数 (与 round() 一致)
+    sums += 1 + ((sums >> 2) & 1)
+    return (sums >> 2).astype(np.uint8)
+
+
+def _save_tiles(path: str, image: np.ndarray, tile_size: int) -> Tuple[int, int]:
+    """按图块行写入 (ny, nx, T, T) 的 .npy 文件，只需一行图块大小的缓冲区
+
+    Returns:
+        (ny, nx) 图块网格大小
+    """
+    h, w = image.shape
+    ny, nx = -(-h // tile_size), -(-w // tile_size)
+    tiles = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                      shape=(ny, nx, tile_size, tile_size))
+    strip = np.zeros((tile_size, nx * tile_size), dtype=np.uint8)
+    for iy in range(ny):
+        rows = image[iy * tile_size:(iy + 1) * tile_size]
+        strip[:len(rows), :w] = rows
+        strip[len(rows):] = 0  # 最后一行图块补零
+        tiles[iy] = strip.reshape(tile_size, nx, tile_size).transpose(1, 0, 2)
+    tiles.flush()
+    del tiles
+    return ny, nx
+
+
+def build_map_tiles_from_array(image: np.ndarray, cache_dir: str,
+                               resolution: float = MAP_RESOLUTION,
+                               tile_size: int = 256, levels: int = 5,
+                               source_mtime: Optional[float] = None):
+    """将地图栅格切分为多分辨率图块并写入 cache_dir
+
+    第 k 层的分辨率为 resolution * 2**k。meta.json 最后写入，作为完成标记。
+
+    Args:
+        image: (H, W) uint8 地图栅格
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    level_image = np.asarray(image, dtype=np.uint8)
+    level_meta = []
+    for level in range(levels):
+        h, w = level_image.shape
+        ny, nx = _save_tiles(os.path.join(cache_dir, f'level{level}.npy'),
+                             level_image, tile_size)
+        level_meta.append({'shape': [h, w], 'grid': [ny, nx]})
+        if level + 1 < levels:
+            level_image = _downsample(level_image)
+    meta = {'version': MAP_TILES_FORMAT_VERSION, 'resolution': resolution,
+            'tile_size': tile_size, 'height': int(image.shape[0]),
+            'width': int(image.shape[1]), 'levels': level_meta,
+            'source_mtime': source_mtime}
+    with open(os.path.join(cache_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def build_map_tiles(png_path: str, cache_dir: str, tile_size: int = 256,
+                    levels: int = 5) -> bool:
+    """由地图PNG生成图块缓存 (已是最新时跳过)，返回是否重新生成"""
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    source_mtime = os.path.getmtime(png_path)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if (meta.get('version') == MAP_TILES_FORMAT_VERSION and
+                meta.get('source_mtime') == source_mtime):
+            return False
+    import open3d as o3d  # 仅生成图块时需要解码PNG
+    image = np.asarray(o3d.io.read_image(png_path))
+    if image.ndim == 3:
+        image = image[..., :3].mean(axis=2).astype(np.uint8)
+    build_map_tiles_from_array(image, cache_dir, tile_size=tile_size,
+                               levels=levels, source_mtime=source_mtime)
+    return True
+
+
+def nuscenes_map_path(nusc, scene_token: str) -> Optional[str]:
+    """场景所在地图的栅格文件路径，没有地图时返回 None"""
+    scene = nusc.get('scene', scene_token)
+    log = nusc.get('log', scene['log_token'])
+    if 'map_token' not in log:
+        return None
+    path = os.path.join(nusc.dataroot, nusc.get('map', log['map_token'])['filename'])
+    return path if os.path.exists(path) else None
+
+
+def default_tiles_dir(png_path: str) -> str:
+    """图块缓存目录: 地图文件旁的 tiles/<地图名>/"""
+    name = os.path.splitext(os.path.basename(png_path))[0]
+    return os.path.join(os.path.dirname(png_path), 'tiles', name)
+
+
+def tile_rgb(tile: np.ndarray) -> np.ndarray:
+    """图块像素值 -> (T, T, 3) uint8 颜色"""
+    weight = tile.astype(np.float32)[..., None] / 255.0
+    background = np.asarray(MAP_BACKGROUND_COLOR, dtype=np.float32)
+    foreground = np.asarray(MAP_FOREGROUND_COLOR, dtype=np.float32)
+    return (background + weight * (foreground - background)).astype(np.uint8)
+
+
+class MapTiles:
+    """内存映射的多分辨率地图图块
+
+    图块键为 (level, ix, iy)，ix 向东增大，iy 从地图上边缘 (北) 向南增大。
+    坐标均为全局坐标 (米)。
+    """
+
+    def __init__(self, cache_dir: str):
+        with open(os.path.join(cache_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        self.resolution = meta['resolution']
+        self.tile_size = meta['tile_size']
+        self.height_m = meta['height'] * self.resolution
+        self.width_m = meta['width'] * self.resolution
+        self.grids = [tuple(level['grid']) for level in meta['levels']]
+        self._levels = [np.load(os.path.join(cache_dir, f'level{level}.npy'),
+                                mmap_mode='r')
+                        for level in range(len(self.grids))]
+
+    @property
+    def num_levels(self) -> int:
+        return len(self._levels)
+
+    def tile_extent(self, level: int) -> float:
+        """第 level 层一个图块的边长 (米)"""
+        return self.tile_size * self.resolution * 2 ** level
+
+    def level_for_radius(self, radius: float, max_tiles_across: int = 4) -> int:
+        """显示半径 radius 范围时使用的层: 横跨的图块数不超过 max_tiles_across"""
+        for level in range(self.num_levels):
+            if 2 * radius <= max_tiles_across * self.tile_extent(level):
+                return level
+        return self.num_levels - 1
+
+    def tiles_around(self, x: float, y: float, radius: float,
+                     level: int) -> List[Tuple[int, int, int]]:
+        """覆盖以 (x, y) 为中心、边长 2 * radius 的正方形的图块键"""
+        extent = self.tile_extent(level)
+        ny, nx = self.grids[level]
+        ix0 = max(int(np.floor((x - radius) / extent)), 0)
+        ix1 = min(int(np.floor((x + radius) / extent)), nx - 1)
+        iy0 = max(int(np.floor((self.height_m - y - radius) / extent)), 0)
+        iy1 = min(int(np.floor((self.height_m - y + radius) / extent)), ny - 1)
+        return [(level, ix, iy) for iy in range(iy0, iy1 + 1)
+                for ix in range(ix0, ix1 + 1)]
+
+    def tile(self, level: int, ix: int, iy: int) -> np.ndarray:
+        """读取一个图块 (T, T) uint8 (第0行为北侧)"""
+        return np.array(self._levels[level][iy, ix])
+
+    def tile_bounds(self, level: int, ix: int,
+                    iy: int) -> Tuple[float, float, float, float]:
+        """图块覆盖的全局范围 (x_min, y_min, x_max, y_max)"""
+        extent = self.tile_extent(level)
+        y_max = self.height_m - iy * extent
+        return (ix * extent, y_max - extent, (ix + 1) * extent, y_max)
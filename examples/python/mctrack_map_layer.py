@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+MCTrack高精地图背景层
+只加载当前自车位置附近、当前显示范围对应分辨率的图块，在后台线程中读取并构建
+贴图四边形，在主线程中上传；已上传的图块按LRU保留，沿场景移动时只读取新的图块
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import open3d as o3d
+import open3d.visualization.gui as gui
+import open3d.visualization.rendering as rendering
+
+from mctrack_map import MapTiles, build_map_tiles, default_tiles_dir, tile_rgb
+
+# 贴图四边形的两个三角形和对应的纹理坐标 (图块第0行为北侧，即 y_max)
+_QUAD_TRIANGLES = np.array([[0, 2, 1], [0, 3, 2]], dtype=np.int32)
+_QUAD_UVS = np.array([[0, 0], [1, 1], [1, 0], [0, 0], [0, 1], [1, 1]],
+                     dtype=np.float64)
+
+
+def _tile_mesh(bounds, height: float) -> o3d.geometry.TriangleMesh:
+    """全局坐标系下覆盖 bounds 的水平四边形"""
+    x_min, y_min, x_max, y_max = bounds
+    vertices = np.array([[x_min, y_max, height], [x_max, y_max, height],
+                         [x_max, y_min, height], [x_min, y_min, height]])
+    mesh = o3d.geometry.TriangleMesh(o3d.utility.Vector3dVector(vertices),
+                                     o3d.utility.Vector3iVector(_QUAD_TRIANGLES))
+    mesh.triangle_uvs = o3d.utility.Vector2dVector(_QUAD_UVS)
+    return mesh
+
+
+class MapLayer:
+    """地图背景层
+
+    图块几何体以全局坐标上传一次，每帧只更新其变换 (全局 -> 雷达坐标系)。
+    除 update/set_map/clear 外的回调都通过 post_to_main_thread 在主线程执行。
+    """
+
+    def __init__(self, window, scene: rendering.Open3DScene,
+                 max_tiles: int = 64, height: float = -0.05):
+        """
+        Args:
+            max_tiles: 保留的已上传图块数上限 (LRU)
+            height: 地图平面在全局坐标系下的高度 (米)
+        """
+        self.window = window
+        self.scene = scene
+        self.max_tiles = max_tiles
+        self.height = height
+        self.enabled = True
+        self.tiles: Optional[MapTiles] = None
+        self._uploaded = OrderedDict()  # (level, ix, iy) -> 几何体名称
+        self._visible = set()
+        self._wanted = set()
+        self._pending = set()
+        self._generation = 0
+        self._world_to_lidar = np.eye(4)
+        self._request = None  # (x, y, radius)
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="MCTrackMap")
+
+    def set_map(self, png_path: Optional[str], cache_dir: Optional[str] = None):
+        """切换地图；首次使用时在后台生成图块缓存"""
+        self.clear()
+        if png_path is None:
+            return
+        generation = self._generation
+        future = self._executor.submit(self._open_map, png_path, cache_dir)
+        future.add_done_callback(
+            lambda f: gui.Application.instance.post_to_main_thread(
+                self.window, lambda: self._on_map_ready(generation, f)))
+
+    @staticmethod
+    def _open_map(png_path: str, cache_dir: Optional[str]) -> MapTiles:
+        cache_dir = cache_dir or default_tiles_dir(png_path)
+        if build_map_tiles(png_path, cache_dir):
+            print(f"Map tiles written to {cache_dir}")
+        return MapTiles(cache_dir)
+
+    def _on_map_ready(self, generation: int, future):
+        if generation != self._generation:
+            return
+        try:
+            self.tiles = future.result()
+        except Exception as e:
+            print(f"Error loading map tiles: {str(e)}")
+            return
+        self._refresh()
+
+    def update(self, world_to_lidar: np.ndarray, radius: float):
+        """切换到新的一帧 (主线程)
+
+        Args:
+            world_to_lidar: 当前帧全局 -> 雷达坐标系的变换
+            radius: 显示范围 (米)，决定使用的分辨率层
+        """
+        self._world_to_lidar = world_to_lidar
+        ego = np.linalg.inv(world_to_lidar)[:2, 3]
+        self._request = (ego[0], ego[1], radius)
+        for name in self._uploaded.values():
+            self.scene.set_geometry_transform(name, world_to_lidar)
+        self._refresh()
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        if enabled:
+            self._refresh()
+        else:
+            self._set_visible(set())
+
+    def _refresh(self):
+        """按当前位置和范围确定需要的图块，显示已上传的，后台读取缺少的"""
+        if self.tiles is None or self._request is None or not self.enabled:
+            return
+        x, y, radius = self._request
+        level = self.tiles.level_for_radius(radius)
+        self._wanted = set(self.tiles.tiles_around(x, y, radius, level))
+        self._set_visible(self._wanted)
+        generation = self._generation
+        for key in self._wanted:
+            if key in self._uploaded:
+                self._uploaded.move_to_end(key)
+            elif key not in self._pending:
+                self._pending.add(key)
+                future = self._executor.submit(self._load_tile, self.tiles, key)
+                future.add_done_callback(
+                    lambda f, key=key: gui.Application.instance.post_to_main_thread(
+                        self.window,
+                        lambda: self._on_tile_loaded(generation, key, f)))
+
+    def _set_visible(self, keys):
+        for key, name in self._uploaded.items():
+            show = key in keys
+            if show != (key in self._visible):
+                self.scene.show_geometry(name, show)
+        self._visible = set(keys) & set(self._uploaded)
+
+    def _load_tile(self, tiles: MapTiles, key):
+        """后台线程: 读取图块并构建贴图四边形"""
+        image = o3d.geometry.Image(np.ascontiguousarray(tile_rgb(tiles.tile(*key))))
+        return _tile_mesh(tiles.tile_bounds(*key), self.height), image
+
+    def _on_tile_loaded(self, generation: int, key, future):
+        if generation != self._generation:
+            return
+        self._pending.discard(key)
+        try:
+            mesh, image = future.result()
+        except Exception as e:
+            print(f"Error loading map tile {key}: {str(e)}")
+            return
+        name = "map_tile_{}_{}_{}".format(*key)
+        material = rendering.MaterialRecord()
+        material.shader = "defaultUnlit"
+        material.albedo_img = image
+        self.scene.add_geometry(name, mesh, material)
+        self.scene.set_geometry_transform(name, self._world_to_lidar)
+        self._uploaded[key] = name
+        self._visible.add(key)
+        if key not in self._wanted or not self.enabled:
+            self.scene.show_geometry(name, False)
+            self._visible.discard(key)
+        self._evict()
+
+    def _evict(self):
+        """超过上限时移除最久未使用且当前不需要的图块"""
+        for key in list(self._uploaded):
+            if len(self._uploaded) <= self.max_tiles:
+                break
+            if key in self._wanted:
+                continue
+            self.scene.remove_geometry(self._uploaded.pop(key))
+            self._visible.discard(key)
+
+    def clear(self):
+        """移除所有图块 (尚未完成的读取结果将被丢弃)"""
+        self._generation += 1
+        for name in self._uploaded.values():
+            if self.scene.has_geometry(name):
+                self.scene.remove_geometry(name)
+        self._uploaded.clear()
+        self._visible.clear()
+        self._wanted = set()
+        self._pending.clear()
+        self.tiles = None
+
+    def shutdown(self):
+        self._generation += 1
+        self._executor.shutdown(wait=False)
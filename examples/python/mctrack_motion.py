@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+MCTrack运动可视化 - 速度箭头和短时运动预测
+对一帧内所有框同时计算 (NumPy)，结果合并为一个LineSet的点、线和颜色数组
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from mctrack_data import TrackingResults
+from mctrack_geometry import quaternion_yaw
+
+
+def estimate_motion(results: TrackingResults,
+                    rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """估计框的速度和偏航角速度
+
+    速度优先使用结果中的 velocity 字段，缺失时与同轨迹上一个观测做差分；
+    偏航角速度由同轨迹上一个观测差分得到，没有历史时为0。
+
+    Returns:
+        velocity: (N, 2) [vx, vy] (m/s)
+        yaw_rate: (N,) (rad/s)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    velocity = results.velocity[rows].copy()
+    yaw_rate = np.zeros(len(rows))
+    prev = results.neighbor_rows(rows, -1)
+    has_prev = prev >= 0
+    if np.any(has_prev):
+        cur, prv = rows[has_prev], prev[has_prev]
+        dt = (results.timestamps[results.frame[cur]] -
+              results.timestamps[results.frame[prv]])
+        dt = np.where(dt > 1e-6, dt, np.nan)
+        diff_velocity = (results.translation[cur, :2] -
+                         results.translation[prv, :2]) / dt[:, None]
+        missing = np.isnan(velocity[has_prev]).any(axis=1)
+        filled = velocity[has_prev]
+        filled[missing] = diff_velocity[missing]
+        velocity[has_prev] = filled
+        yaw_diff = (quaternion_yaw(results.rotation[cur]) -
+                    quaternion_yaw(results.rotation[prv]))
+        yaw_diff = (yaw_diff + np.pi) % (2 * np.pi) - np.pi
+        yaw_rate[has_prev] = yaw_diff / dt
+    return np.nan_to_num(velocity), np.nan_to_num(yaw_rate)
+
+
+def predict_ctrv(position, velocity, yaw_rate, horizons,
+                 min_yaw_rate: float = 1e-3) -> np.ndarray:
+    """恒定转弯率和速度 (CTRV) 模型预测，yaw_rate 为0时退化为恒速模型
+
+    Args:
+        position: (N, 3) 当前位置
+        velocity: (N, 2) 当前速度
+        yaw_rate: (N,) 偏航角速度
+        horizons: (K,) 预测时刻 (秒)
+
+    Returns:
+        (N, K, 3) 预测位置 (高度保持不变)
+    """
+    position = np.asarray(position, dtype=np.float64).reshape(-1, 3)
+    velocity = np.asarray(velocity, dtype=np.float64).reshape(-1, 2)
+    omega = np.asarray(yaw_rate, dtype=np.float64).reshape(-1)[:, None]
+    t = np.asarray(horizons, dtype=np.float64)[None, :]
+    speed = np.linalg.norm(velocity, axis=1)[:, None]
+    heading = np.arctan2(velocity[:, 1], velocity[:, 0])[:, None]
+
+    turning = np.abs(omega) > min_yaw_rate
+    safe_omega = np.where(turning, omega, 1.0)
+    dx_turn = speed / safe_omega * (np.sin(heading + omega * t) -
+                                    np.sin(heading))
+    dy_turn = speed / safe_omega * (np.cos(heading) -
+                                    np.cos(heading + omega * t))
+    dx = np.where(turning, dx_turn, speed * np.cos(heading) * t)
+    dy = np.where(turning, dy_turn, speed * np.sin(heading) * t)
+
+    predicted = np.repeat(position[:, None, :], t.shape[1], axis=1)
+    predicted[:, :, 0] += dx
+    predicted[:, :, 1] += dy
+    return predicted
+
+
+def future_positions(results: TrackingResults, rows: np.ndarray,
+                     horizon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """从按轨迹索引中取出每个框在未来 horizon 秒内的实际位置
+
+    Returns:
+        positions: (N, K, 3) 之后的K个观测位置 (K由帧间隔估计)
+        valid: (N, K) 该观测是否存在且在 horizon 内
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    frame_interval = (np.median(np.diff(results.timestamps))
+                      if results.num_frames > 1 else 0.5)
+    num_steps = max(1, int(np.ceil(horizon / max(frame_interval, 1e-6))))
+    track = results.track[rows]
+    base = results.track_offsets[track] + results.track_rank[rows]
+    pos = base[:, None] + np.arange(1, num_steps + 1)[None, :]
+    valid = pos < results.track_offsets[track + 1][:, None]
+    future_rows = np.where(valid, results.track_order[np.where(valid, pos, 0)],
+                           0)
+    dt = (results.timestamps[results.frame[future_rows]] -
+          results.timestamps[results.frame[rows]][:, None])
+    valid &= dt <= horizon + 1e-6
+    return results.translation[future_rows], valid
+
+
+def _polyline_segments(points: np.ndarray, valid: np.ndarray,
+                       start_points: np.ndarray):
+    """将 (N, K, 3) 折线转为线段端点，起点为 start_points (N, 3)"""
+    full = np.concatenate([start_points[:, None, :], points], axis=1)
+    seg_valid = valid  # 第k段连接第k-1和第k个点
+    if valid.shape[1] > 1:
+        seg_valid = valid & np.cumprod(valid, axis=1).astype(bool)
+    starts = full[:, :-1][seg_valid]
+    ends = full[:, 1:][seg_valid]
+    owner = np.broadcast_to(np.arange(len(points))[:, None],
+                            seg_valid.shape)[seg_valid]
+    return starts, ends, owner
+
+
+def build_motion_lineset(results: TrackingResults, frame_idx: int,
+                         box_colors: np.ndarray, arrow_scale: float = 1.0,
+                         horizon: float = 3.0, step: float = 0.5,
+                         show_velocity: bool = True,
+                         show_prediction: bool = True,
+                         show_actual: bool = True):
+    """构建一帧的运动可视化线段 (速度箭头、预测轨迹、实际未来轨迹)
+
+    Args:
+        results: 列式跟踪结果
+        frame_idx: 帧序号
+        box_colors: (N, 3) 该帧每个框的颜色 [0, 1]
+        arrow_scale: 箭头长度 = 速度 * arrow_scale (秒)
+        horizon: 预测时长 (秒)
+        step: 预测采样间隔 (秒)
+
+    Returns:
+        points: (2M, 3), lines: (M, 2), colors: (M, 3)，可直接用于一个LineSet
+    """
+    rows = np.arange(results.frame_offsets[frame_idx],
+                     results.frame_offsets[frame_idx + 1])
+    box_colors = np.asarray(box_colors, dtype=np.float64).reshape(-1, 3)
+    empty = (np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int32),
+             np.zeros((0, 3)))
+    if len(rows) == 0:
+        return empty
+    centers = results.translation[rows]
+    velocity, yaw_rate = estimate_motion(results, rows)
+
+    starts, ends, colors = [], [], []
+    if show_velocity:
+        moving = np.linalg.norm(velocity, axis=1) > 0.2
+        tail = centers[moving]
+        vec = np.zeros((int(moving.sum()), 3))
+        vec[:, :2] = velocity[moving] * arrow_scale
+        head = tail + vec
+        # 箭头两翼: 箭头方向旋转±150度，长度为箭头的25%
+        back = -0.25 * vec[:, :2]
+        cos_a, sin_a = np.cos(np.pi / 6), np.sin(np.pi / 6)
+        wing_l = np.stack([back[:, 0] * cos_a - back[:, 1] * sin_a,
+                           back[:, 0] * sin_a + back[:, 1] * cos_a], axis=1)
+        wing_r = np.stack([back[:, 0] * cos_a + back[:, 1] * sin_a,
+                           -back[:, 0] * sin_a + back[:, 1] * cos_a], axis=1)
+        for wing in (None, wing_l, wing_r):
+            if wing is None:
+                starts.append(tail)
+                ends.append(head)
+            else:
+                end = head.copy()
+                end[:, :2] += wing
+                starts.append(head)
+                ends.append(end)
+            colors.append(box_colors[moving])
+
+    if show_prediction:
+        horizons = np.arange(step, horizon + 1e-6, step)
+        predicted = predict_ctrv(centers, velocity, yaw_rate, horizons)
+        s, e, owner = _polyline_segments(
+            predicted, np.ones(predicted.shape[:2], dtype=bool), centers)
+        starts.append(s)
+        ends.append(e)
+        colors.append(0.5 * box_colors[owner] + 0.5)  # 预测: 颜色变浅
+
+    if show_actual:
+        actual, valid = future_positions(results, rows, horizon)
+        s, e, owner = _polyline_segments(actual, valid, centers)
+        starts.append(s)
+        ends.append(e)
+        colors.append(np.full((len(owner), 3), 0.85))  # 实际: 浅灰色
+
+    if len(starts) == 0:
+        return empty
+    starts = np.concatenate(starts)
+    ends = np.concatenate(ends)
+    num_lines = len(starts)
+    points = np.empty((2 * num_lines, 3))
+    points[0::2] = starts
+    points[1::2] = ends
+    lines = np.arange(2 * num_lines, dtype=np.int32).reshape(-1, 2)
+    return points, lines, np.concatenate(colors)
+
+
+def build_trajectory_lineset(results: TrackingResults, frame_idx: int,
+                             length: int, track_colors: np.ndarray):
+    """构建历史轨迹线段: 最近 length 帧内每个框与同轨迹上一个观测相连
+
+    Args:
+        results: 列式跟踪结果
+        frame_idx: 当前帧序号
+        length: 轨迹长度 (帧)
+        track_colors: (num_tracks, 3) 每条轨迹的颜色 [0, 1]，越旧的线段越暗
+
+    Returns:
+        points: (2M, 3), lines: (M, 2), colors: (M, 3)，可直接用于一个LineSet
+    """
+    start_frame = max(0, frame_idx - length)
+    rows = np.arange(results.frame_offsets[start_frame + 1],
+                     results.frame_offsets[frame_idx + 1])
+    prev = results.neighbor_rows(rows, -1)
+    keep = prev >= 0
+    keep[keep] = results.frame[prev[keep]] >= start_frame
+    rows, prev = rows[keep], prev[keep]
+
+    num_lines = len(rows)
+    points = np.empty((2 * num_lines, 3))
+    points[0::2] = results.translation[prev]
+    points[1::2] = results.translation[rows]
+    lines = np.arange(2 * num_lines, dtype=np.int32).reshape(-1, 2)
+    alpha = ((results.frame[rows] - start_frame) /
+             max(frame_idx - start_frame, 1))[:, None]
+    colors = np.asarray(track_colors, dtype=np.float64)[results.track[rows]] * alpha
+    return points, lines, colors
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+MCTrack轨迹配色 - 由跟踪ID的稳定哈希索引固定的颜色表
+颜色只取决于跟踪ID本身 (与Python的字符串哈希随机化、结果中的出现顺序无关)，
+因此不同会话、对比的不同结果文件中同一ID的颜色相同。每条轨迹的颜色在加载结果时
+计算一次，之后一帧所有框和轨迹线的颜色都由一次数组索引得到
+"""
+
+import hashlib
+from typing import Sequence
+
+import numpy as np
+
+# 默认颜色表大小
+PALETTE_SIZE = 256
+
+# 黄金分割色相步长，使相邻序号的颜色差异最大
+_GOLDEN_RATIO = 0.618033988749895
+
+_MASK64 = (1 << 64) - 1
+
+
+def make_palette(num_colors: int = PALETTE_SIZE) -> np.ndarray:
+    """生成 (num_colors, 3) 颜色表 [0, 1]
+
+    色相按黄金分割步长分布，饱和度和亮度在几个档位间交替，避免颜色数较多时
+    相近色相难以区分。
+    """
+    i = np.arange(num_colors)
+    hue = (i * _GOLDEN_RATIO) % 1.0
+    saturation = np.array([0.85, 0.6, 0.75, 0.5])[i % 4]
+    value = np.array([0.95, 0.95, 0.8, 0.85])[(i // 4) % 4]
+    # 向量化的 HSV -> RGB
+    h6 = hue * 6.0
+    sector = np.floor(h6).astype(np.int64) % 6
+    f = h6 - np.floor(h6)
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - saturation * f)
+    t = value * (1.0 - saturation * (1.0 - f))
+    table = np.stack([np.stack([value, t, p], axis=1),
+                      np.stack([q, value, p], axis=1),
+                      np.stack([p, value, t], axis=1),
+                      np.stack([p, q, value], axis=1),
+                      np.stack([t, p, value], axis=1),
+                      np.stack([value, p, q], axis=1)])
+    return table[sector, i]
+
+
+def _id_key(track_id) -> int:
+    """跟踪ID -> 64位整数键 (整数ID及其十进制字符串形式得到相同的键)"""
+    if isinstance(track_id, (int, np.integer)):
+        return int(track_id) & _MASK64
+    text = str(track_id)
+    digits = text[1:] if text.startswith('-') else text
+    if text.isascii() and digits.isdecimal():  # 不含 '²' 等非ASCII数字
+        return int(text) & _MASK64
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def mix64(keys: np.ndarray) -> np.ndarray:
+    """splitmix64 终结函数: 使连续整数键的哈希均匀分布"""
+    x = np.asarray(keys, dtype=np.uint64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+
+def track_id_hashes(track_ids: Sequence) -> np.ndarray:
+    """(N,) uint64 跟踪ID的稳定哈希"""
+    keys = np.fromiter((_id_key(track_id) for track_id in track_ids),
+                       dtype=np.uint64, count=len(track_ids))
+    return mix64(keys)
+
+
+def track_colors(track_ids: Sequence, palette: np.ndarray) -> np.ndarray:
+    """每个跟踪ID的颜色 (N, 3)，按序号与 track_ids 对应
+
+    Args:
+        track_ids: 原始跟踪ID (例如 TrackingResults.track_ids，下标即轨迹序号)
+        palette: (K, 3) 颜色表
+    """
+    palette = np.asarray(palette, dtype=np.float64).reshape(-1, 3)
+    index = track_id_hashes(track_ids) % np.uint64(len(palette))
+    return palette[index.astype(np.int64)]
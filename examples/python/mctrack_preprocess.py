@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+MCTrack点云预处理 - 感兴趣区域 (ROI) 裁剪和快速地面分割
+在解码之后、上传之前对点云做筛选，减少上传点数并让跟踪框更清晰。
+全部为NumPy向量化操作，不依赖GUI
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def crop_roi_mask(points: np.ndarray, max_range: float = 0.0,
+                  bounds: Optional[Sequence[float]] = None) -> np.ndarray:
+    """ROI裁剪
+
+    Args:
+        points: (N, >=3) 点云
+        max_range: 水平距离上限 (米)，0表示不限制
+        bounds: 轴对齐范围 [x_min, y_min, z_min, x_max, y_max, z_max]
+
+    Returns:
+        (N,) bool，True为保留的点
+    """
+    keep = np.ones(len(points), dtype=bool)
+    if max_range > 0:
+        keep &= (points[:, 0] ** 2 + points[:, 1] ** 2) <= max_range ** 2
+    if bounds is not None:
+        low = np.asarray(bounds[:3], dtype=points.dtype)
+        high = np.asarray(bounds[3:], dtype=points.dtype)
+        keep &= np.all((points[:, :3] >= low) & (points[:, :3] <= high), axis=1)
+    return keep
+
+
+def grid_ground_mask(points: np.ndarray, cell_size: float = 1.0,
+                     height_threshold: float = 0.25,
+                     max_ground_height: Optional[float] = None) -> np.ndarray:
+    """基于网格最低高度的地面分割
+
+    每个水平网格取其3x3邻域内最低点的高度，高出最低点不超过
+    height_threshold 的点视为地面。最低点过高的网格 (例如只扫到车顶)
+    不参与判断。
+
+    Args:
+        max_ground_height: 地面网格最低点的高度上限，默认取各网格最低点
+            的10%分位数 + 1米
+
+    Returns:
+        (N,) bool，True为地面点
+    """
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    cells_xy = np.floor(points[:, :2] / cell_size).astype(np.int64)
+    cells_xy -= cells_xy.min(axis=0)
+    shape = tuple(int(n) + 1 for n in cells_xy.max(axis=0))
+    z = points[:, 2]
+    dense = shape[0] * shape[1] <= 4 * len(points)
+    cell = cells_xy[:, 0] * shape[1] + cells_xy[:, 1]
+    num_cells = shape[0] * shape[1]
+    if not dense:  # 远处离群点使网格过于稀疏时压缩编号 (不做邻域最小值)
+        _, cell = np.unique(cell, return_inverse=True)
+        cell = cell.reshape(-1)
+        num_cells = int(cell.max()) + 1
+    # 重复索引的赋值顺序不确定，用 minimum.at 逐个取最小值
+    cell_min = np.full(num_cells, np.inf, dtype=z.dtype)
+    np.minimum.at(cell_min, cell, z)
+    if dense:
+        # 3x3邻域最小值: 物体所在网格没有地面点时使用周围网格的地面高度
+        grid = np.full((shape[0] + 2, shape[1] + 2), np.inf, dtype=z.dtype)
+        grid[1:-1, 1:-1] = cell_min.reshape(shape)
+        neighborhood = grid[1:-1, 1:-1].copy()
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                np.minimum(neighborhood, grid[dx:dx + shape[0], dy:dy + shape[1]],
+                           out=neighborhood)
+        cell_min = neighborhood.reshape(-1)
+    if max_ground_height is None:
+        occupied = cell_min[np.isfinite(cell_min)]
+        max_ground_height = float(np.percentile(occupied, 10)) + 1.0
+    point_min = cell_min[cell]
+    return (z - point_min <= height_threshold) & (point_min <= max_ground_height)
+
+
+def fit_ground_plane(points: np.ndarray, iterations: int = 64,
+                     threshold: float = 0.2, max_points: int = 4096,
+                     min_normal_z: float = 0.9,
+                     rng: Optional[np.random.Generator] = None
+                     ) -> Optional[np.ndarray]:
+    """RANSAC拟合地面平面 (所有假设一次性向量化评估)
+
+    Args:
+        iterations: 假设数
+        threshold: 内点距离阈值 (米)
+        max_points: 参与拟合的最大点数 (随机下采样)
+        min_normal_z: 法向量z分量下限，排除非水平平面
+
+    Returns:
+        平面 [a, b, c, d] (法向量朝上且归一化，a*x + b*y + c*z + d = 0)，
+        拟合失败时返回 None
+    """
+    if rng is None:
+        rng = np.random.default_rng(0)
+    xyz = np.asarray(points[:, :3], dtype=np.float64)
+    if len(xyz) > max_points:
+        xyz = xyz[rng.choice(len(xyz), max_points, replace=False)]
+    if len(xyz) < 3:
+        return None
+    # 地面在点云下部: 只从最低的30%点中采样假设
+    low = xyz[xyz[:, 2] <= np.percentile(xyz[:, 2], 30)]
+    if len(low) < 3:
+        low = xyz
+    samples = low[rng.integers(0, len(low), (iterations, 3))]
+    normals = np.cross(samples[:, 1] - samples[:, 0],
+                       samples[:, 2] - samples[:, 0])
+    norms = np.linalg.norm(normals, axis=1)
+    valid = norms > 1e-9
+    normals[valid] /= norms[valid, None]
+    normals *= np.sign(normals[:, 2:3] + 1e-12)  # 法向量朝上
+    valid &= normals[:, 2] >= min_normal_z
+    if not np.any(valid):
+        return None
+    normals = normals[valid]
+    offsets = -np.einsum('ij,ij->i', normals, samples[valid, 0])
+    distances = np.abs(xyz @ normals.T + offsets)
+    best = int(np.argmax((distances < threshold).sum(axis=0)))
+
+    # 用最优假设的内点做最小二乘精化: z = p0 * x + p1 * y + p2
+    inliers = xyz[distances[:, best] < threshold]
+    if len(inliers) >= 3:
+        design = np.column_stack([inliers[:, 0], inliers[:, 1],
+                                  np.ones(len(inliers))])
+        p, *_ = np.linalg.lstsq(design, inliers[:, 2], rcond=None)
+        plane = np.array([-p[0], -p[1], 1.0, -p[2]])
+        return plane / np.linalg.norm(plane[:3])
+    return np.append(normals[best], offsets[best])
+
+
+def plane_ground_mask(points: np.ndarray, plane: np.ndarray,
+                      threshold: float = 0.2) -> np.ndarray:
+    """到平面 (或平面以下) 距离不超过 threshold 的点视为地面"""
+    height = points[:, :3] @ plane[:3].astype(points.dtype) + plane[3]
+    return height <= threshold
+
+
+def preprocess_mask(points: np.ndarray, settings,
+                    plane: Optional[np.ndarray] = None
+                    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """按设置计算保留的点
+
+    Args:
+        points: (N, >=3) 点云
+        settings: 包含 roi_range, roi_bounds, remove_ground, ground_method
+            ('grid' 或 'ransac'), ground_cell_size, ground_height_threshold
+        plane: 已缓存的地面平面 (ransac)，为 None 时重新拟合
+
+    Returns:
+        (keep, plane): keep 为 (N,) bool；plane 为使用的地面平面 (仅ransac)
+    """
+    keep = crop_roi_mask(points, settings.roi_range, settings.roi_bounds)
+    if settings.remove_ground:
+        if settings.ground_method == 'ransac':
+            if plane is None:
+                plane = fit_ground_plane(
+                    points[keep], threshold=settings.ground_height_threshold)
+            if plane is not None:
+                keep &= ~plane_ground_mask(points, plane,
+                                           settings.ground_height_threshold)
+        else:
+            roi = np.flatnonzero(keep)
+            ground = grid_ground_mask(points[roi], settings.ground_cell_size,
+                                      settings.ground_height_threshold)
+            keep[roi[ground]] = False
+    return keep, plane
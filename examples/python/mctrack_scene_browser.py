@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+MCTrack场景浏览器 - 控制面板中的场景列表
+读取 --index-stats 生成的统计文件，按轨迹数、框数、最大同时存活轨迹数等排序，
+按类别、轨迹数和名称筛选；没有统计文件时只列出场景名称
+"""
+
+from typing import Callable, List, Optional
+
+import open3d.visualization.gui as gui
+
+from mctrack_stats import SCENE_SORT_KEYS, select_scenes
+
+_ALL_CLASSES = "All classes"
+
+
+class SceneBrowser:
+    """场景列表控件，选中场景后调用 on_select(scene_token)"""
+
+    def __init__(self, em: float, on_select: Callable[[str], None]):
+        self.on_select = on_select
+        self.scenes: List[dict] = []
+        self.sort_key = 'name'
+        self.descending = False
+        self.class_name: Optional[str] = None
+        self.min_tracks = 0
+        self._note = ""
+        self._rows: List[int] = []
+        self._classes: List[Optional[str]] = [None]
+
+        self.widget = gui.CollapsableVert("Scenes", 0.25 * em,
+                                          gui.Margins(em, 0, 0, 0))
+        self.widget.set_is_open(False)
+
+        self.summary = gui.Label("No scenes")
+        self.widget.add_child(self.summary)
+
+        sort_h = gui.Horiz(0.25 * em)
+        sort_h.add_child(gui.Label("Sort:"))
+        self.sort_combo = gui.Combobox()
+        for key in SCENE_SORT_KEYS:
+            self.sort_combo.add_item(key)
+        self.sort_combo.set_on_selection_changed(self._on_sort_changed)
+        sort_h.add_child(self.sort_combo)
+        self.descending_checkbox = gui.Checkbox("Desc")
+        self.descending_checkbox.set_on_checked(self._on_descending_changed)
+        sort_h.add_child(self.descending_checkbox)
+        self.widget.add_child(sort_h)
+
+        self.class_combo = gui.Combobox()
+        self.class_combo.add_item(_ALL_CLASSES)
+        self.class_combo.set_on_selection_changed(self._on_class_changed)
+        self.widget.add_child(self.class_combo)
+
+        tracks_h = gui.Horiz(0.25 * em)
+        tracks_h.add_child(gui.Label("Min Tracks:"))
+        self.min_tracks_slider = gui.Slider(gui.Slider.INT)
+        self.min_tracks_slider.set_limits(0, 100)
+        self.min_tracks_slider.set_on_value_changed(self._on_min_tracks_changed)
+        tracks_h.add_child(self.min_tracks_slider)
+        self.widget.add_child(tracks_h)
+
+        self.filter_text = gui.TextEdit()
+        self.filter_text.placeholder_text = "Filter name/description"
+        self.filter_text.set_on_value_changed(lambda text: self.refresh())
+        self.widget.add_child(self.filter_text)
+
+        self.list_view = gui.ListView()
+        self.list_view.set_max_visible_items(10)
+        self.list_view.set_on_selection_changed(self._on_selection_changed)
+        self.widget.add_child(self.list_view)
+
+        load_button = gui.Button("Load Scene")
+        load_button.set_on_clicked(self._load_selected)
+        self.widget.add_child(load_button)
+
+    def set_scenes(self, scenes: List[dict], note: str = ""):
+        """设置场景列表 (统计文件中的场景，或只有 token/name 的场景索引)
+
+        Args:
+            note: 附加在摘要后的说明，例如统计文件已过期
+        """
+        self.scenes = scenes
+        self._note = note
+        classes = sorted({name for scene in scenes
+                          for name in scene.get('class_boxes', {})})
+        self._classes = [None] + classes
+        self.class_combo.clear_items()
+        self.class_combo.add_item(_ALL_CLASSES)
+        for name in classes:
+            self.class_combo.add_item(name)
+        self.class_name = None
+        max_tracks = max((scene.get('num_tracks', 0) for scene in scenes),
+                         default=0)
+        self.min_tracks_slider.set_limits(0, max(max_tracks, 1))
+        self.min_tracks = min(self.min_tracks, max_tracks)
+        self.min_tracks_slider.int_value = self.min_tracks
+        self.refresh()
+
+    def refresh(self):
+        """重新排序筛选并显示"""
+        self._rows = select_scenes(self.scenes, self.sort_key, self.descending,
+                                   self.class_name, self.min_tracks,
+                                   self.filter_text.text_value)
+        self.list_view.set_items([self._format(self.scenes[i])
+                                  for i in self._rows])
+        self.summary.text = (f"{len(self._rows)} / {len(self.scenes)} scenes"
+                             + (f" ({self._note})" if self._note else ""))
+
+    @staticmethod
+    def _format(scene: dict) -> str:
+        if 'num_tracks' not in scene:
+            return scene['name']
+        return (f"{scene['name']}  trk {scene['num_tracks']}  "
+                f"box {scene['num_boxes']}  max {scene['max_concurrent']}")
+
+    def _on_sort_changed(self, text, index):
+        self.sort_key = text
+        self.refresh()
+
+    def _on_descending_changed(self, checked):
+        self.descending = checked
+        self.refresh()
+
+    def _on_class_changed(self, text, index):
+        self.class_name = self._classes[index]
+        self.refresh()
+
+    def _on_min_tracks_changed(self, value):
+        self.min_tracks = int(value)
+        self.refresh()
+
+    def _on_selection_changed(self, value, is_double_click):
+        if is_double_click:
+            self._load_selected()
+
+    def _load_selected(self):
+        index = self.list_view.selected_index
+        if 0 <= index < len(self._rows):
+            self.on_select(self.scenes[self._rows[index]]['token'])
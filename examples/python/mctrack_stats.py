@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+MCTrack场景统计 - 全数据集的按场景统计预计算
+对每个场景统计轨迹数、框数、类别分布和最大同时存活轨迹数，用进程池并行计算，
+结果写入一个紧凑的JSON文件，供场景浏览器排序和筛选，无需逐个打开场景
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from mctrack_data import TrackingResults
+
+STATS_FORMAT_VERSION = 1
+
+# 场景浏览器的排序键 -> 统计字段
+SCENE_SORT_KEYS = {
+    'name': 'name',
+    'tracks': 'num_tracks',
+    'boxes': 'num_boxes',
+    'concurrency': 'max_concurrent',
+    'frames': 'num_frames',
+}
+
+
+def default_stats_path(results_path: str) -> str:
+    """统计文件的默认路径: 与跟踪结果文件在同一目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(results_path)),
+                        'scene_stats.json')
+
+
+def _ordered_samples(first_token: str, samples: Dict[str, dict]) -> List[str]:
+    tokens = []
+    token = first_token
+    while token:
+        tokens.append(token)
+        token = samples[token]['next']
+    return tokens
+
+
+def scene_index_from_tables(dataroot: str, version: str) -> List[dict]:
+    """直接读取nuScenes元数据表 (scene.json, sample.json) 构建场景索引
+
+    比加载完整的 NuScenes 对象快得多，也不需要 nuscenes-devkit。
+
+    Returns:
+        [{'token', 'name', 'description', 'sample_tokens'}, ...]
+    """
+    table_dir = os.path.join(dataroot, version)
+    with open(os.path.join(table_dir, 'scene.json'), 'r') as f:
+        scenes = json.load(f)
+    with open(os.path.join(table_dir, 'sample.json'), 'r') as f:
+        samples = {sample['token']: sample for sample in json.load(f)}
+    return [{'token': scene['token'], 'name': scene['name'],
+             'description': scene.get('description', ''),
+             'sample_tokens': _ordered_samples(scene['first_sample_token'],
+                                               samples)}
+            for scene in scenes]
+
+
+def scene_index_from_nusc(nusc) -> List[dict]:
+    """由已加载的 NuScenes 对象构建场景索引 (格式同 scene_index_from_tables)"""
+    samples = {sample['token']: sample for sample in nusc.sample}
+    return [{'token': scene['token'], 'name': scene['name'],
+             'description': scene.get('description', ''),
+             'sample_tokens': _ordered_samples(scene['first_sample_token'],
+                                               samples)}
+            for scene in nusc.scene]
+
+
+def scene_stats(tracks: TrackingResults) -> dict:
+    """一个场景的统计 (列式结果上的向量化计算)"""
+    num_frames = tracks.num_frames
+    boxes_per_frame = np.diff(tracks.frame_offsets)
+    if tracks.num_tracks > 0:
+        alive = tracks.lifespans.coverage(num_frames)
+        track_names = tracks.name[tracks.track_order[tracks.track_offsets[:-1]]]
+    else:
+        alive = np.zeros(max(num_frames, 1), dtype=np.int64)
+        track_names = np.zeros(0, dtype=np.int64)
+    class_boxes = np.bincount(tracks.name, minlength=len(tracks.class_names))
+    class_tracks = np.bincount(track_names, minlength=len(tracks.class_names))
+    return {
+        'num_frames': num_frames,
+        'num_tracks': tracks.num_tracks,
+        'num_boxes': len(tracks),
+        'max_concurrent': int(alive.max()),
+        'mean_concurrent': round(float(alive.mean()), 2),
+        'max_boxes_per_frame': int(boxes_per_frame.max()) if num_frames else 0,
+        'mean_track_length': (round(len(tracks) / tracks.num_tracks, 2)
+                              if tracks.num_tracks else 0.0),
+        'class_boxes': {name: int(n) for name, n in
+                        zip(tracks.class_names, class_boxes) if n > 0},
+        'class_tracks': {name: int(n) for name, n in
+                         zip(tracks.class_names, class_tracks) if n > 0},
+    }
+
+
+def _scene_stats_task(scene: dict) -> dict:
+    """工作进程: 构建一个场景的列式结果并统计 (任务中只包含该场景的跟踪结果)"""
+    tracks = TrackingResults.from_dict(scene['results'], scene['sample_tokens'])
+    stats = {'token': scene['token'], 'name': scene['name'],
+             'description': scene.get('description', '')}
+    stats.update(scene_stats(tracks))
+    return stats
+
+
+def compute_dataset_stats(results: Dict[str, List[dict]], scenes: Sequence[dict],
+                          workers: Optional[int] = None,
+                          chunksize: int = 4) -> List[dict]:
+    """并行计算所有场景的统计
+
+    Args:
+        results: {sample_token: [box_dict, ...]} 跟踪结果
+        scenes: 场景索引 (见 scene_index_from_tables)
+        workers: 进程数，默认为CPU核数；1表示在当前进程中计算
+        chunksize: 每个任务包含的场景数
+
+    Returns:
+        与 scenes 顺序一致的统计列表
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(scenes))
+    tasks = [dict(scene, results={token: results.get(token, [])
+                                  for token in scene['sample_tokens']})
+             for scene in scenes]
+    if workers <= 1:
+        return [_scene_stats_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_scene_stats_task, tasks, chunksize=chunksize))
+
+
+def write_scene_stats(path: str, stats: List[dict],
+                      results_path: Optional[str] = None):
+    """写入统计文件 (紧凑JSON)，记录跟踪结果文件以便检查是否过期"""
+    data = {'version': STATS_FORMAT_VERSION, 'created': time.time(),
+            'results': None, 'results_mtime': None, 'scenes': stats}
+    if results_path is not None:
+        data['results'] = os.path.abspath(results_path)
+        data['results_mtime'] = os.path.getmtime(results_path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_scene_stats(path: str) -> dict:
+    """读取统计文件，格式版本不符时抛出 ValueError"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get('version') != STATS_FORMAT_VERSION:
+        raise ValueError(f"不支持的统计文件版本: {data.get('version')}")
+    return data
+
+
+def stats_outdated(data: dict, results_path: str) -> bool:
+    """统计文件是否不是由该跟踪结果文件 (当前版本) 生成的"""
+    return (data.get('results') != os.path.abspath(results_path) or
+            not os.path.exists(results_path) or
+            data.get('results_mtime') != os.path.getmtime(results_path))
+
+
+def select_scenes(scenes: Sequence[dict], sort_key: str = 'name',
+                  descending: bool = False, class_name: Optional[str] = None,
+                  min_tracks: int = 0, text: str = '') -> List[int]:
+    """排序和筛选场景
+
+    Args:
+        sort_key: SCENE_SORT_KEYS 中的键
+        class_name: 只保留包含该类别的场景
+        min_tracks: 轨迹数下限
+        text: 名称或描述中包含的文字 (不区分大小写)
+
+    Returns:
+        排序后保留的场景序号
+    """
+    text = text.strip().lower()
+    field = SCENE_SORT_KEYS[sort_key]
+    selected = [
+        i for i, scene in enumerate(scenes)
+        if scene.get('num_tracks', 0) >= min_tracks and
+        (class_name is None or scene.get('class_boxes', {}).get(class_name)) and
+        (not text or text in scene['name'].lower() or
+         text in scene.get('description', '').lower())]
+    return sorted(selected, key=lambda i: scenes[i].get(field, 0),
+                  reverse=descending)
+
+
+def index_stats(results_path: str, dataroot: str, version: Optional[str] = None,
+                output: Optional[str] = None, workers: Optional[int] = None,
+                nusc=None) -> str:
+    """--index-stats 命令: 计算所有场景的统计并写入文件，返回文件路径
+
+    Args:
+        version: nuScenes版本，为 None 时依次尝试 v1.0-trainval 和 v1.0-mini
+        nusc: 已加载的 NuScenes 对象 (可选，用于获取场景索引)
+    """
+    start = time.time()
+    if nusc is not None:
+        scenes = scene_index_from_nusc(nusc)
+    else:
+        versions = [version] if version else ['v1.0-trainval', 'v1.0-mini']
+        versions = [v for v in versions
+                    if os.path.exists(os.path.join(dataroot, v, 'scene.json'))]
+        if not versions:
+            raise FileNotFoundError(f"找不到nuScenes元数据表: {dataroot}")
+        scenes = scene_index_from_tables(dataroot, versions[0])
+    with open(results_path, 'r') as f:
+        data = json.load(f)
+    results = data['results'] if 'results' in data else data
+
+    stats = compute_dataset_stats(results, scenes, workers)
+    output = output or default_stats_path(results_path)
+    write_scene_stats(output, stats, results_path)
+    print(f"已统计 {len(stats)} 个场景 ({time.time() - start:.1f}s): {output}")
+    return output
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+MCTrack合成数据生成器
+生成大规模合成场景 (数千帧、上千条同时存在的轨迹、字符串跟踪ID) 以及对应的
+伪.pcd.bin点云，用于性能测试。合成场景中自车静止在原点，点云与框在同一坐标系
+
+用法:
+    python mctrack_synthetic.py --output synthetic --frames 2000 --tracks 1000
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mctrack_data import DEFAULT_FRAME_INTERVAL, LIDAR_POINT_DIMS
+from mctrack_geometry import box_corners
+
+SYNTHETIC_CLASSES = ('car', 'pedestrian', 'bicycle', 'truck', 'bus')
+# 各类别的尺寸 [宽, 长, 高] 和最大速度 (m/s)
+_CLASS_SIZES = np.array([[1.9, 4.6, 1.7], [0.7, 0.7, 1.8], [0.6, 1.8, 1.4],
+                         [2.5, 7.0, 3.0], [2.9, 11.0, 3.5]])
+_CLASS_SPEEDS = np.array([15.0, 1.5, 6.0, 12.0, 10.0])
+_CLASS_WEIGHTS = np.array([0.5, 0.25, 0.1, 0.1, 0.05])
+
+
+def _hex_tokens(rng: np.random.Generator, count: int, digits: int) -> List[str]:
+    """生成 count 个互不相同的十六进制字符串"""
+    values = rng.choice(np.iinfo(np.int64).max, size=count, replace=False)
+    return [format(int(v), f'0{digits}x') for v in values]
+
+
+def generate_synthetic_tracks(num_frames: int = 2000, num_tracks: int = 1000,
+                              mean_lifetime: int = 200, seed: int = 0,
+                              extent: float = 80.0) -> Dict[str, np.ndarray]:
+    """生成合成轨迹的列数组 (按帧排序)
+
+    轨迹的出生帧和寿命随机，使任意时刻平均约有 num_tracks 条轨迹存在。
+    运动模型为恒定转弯率和速度 (CTRV)。
+
+    Returns:
+        dict: sample_tokens, track_ids, frame, track, name, translation, size,
+            rotation (四元数 [w, x, y, z]), velocity, score
+    """
+    rng = np.random.default_rng(seed)
+    mean_lifetime = max(1, min(mean_lifetime, num_frames))
+    total = max(num_tracks, int(round(
+        num_tracks * (num_frames + mean_lifetime) / mean_lifetime)))
+    lifetime = rng.integers(mean_lifetime // 2 + 1, 3 * mean_lifetime // 2 + 2,
+                            size=total)
+    birth = rng.integers(-lifetime + 1, num_frames)
+    start = np.maximum(birth, 0)
+    end = np.minimum(birth + lifetime, num_frames)
+
+    cls = rng.choice(len(SYNTHETIC_CLASSES), size=total, p=_CLASS_WEIGHTS)
+    speed = rng.uniform(0.0, 1.0, total) * _CLASS_SPEEDS[cls]
+    heading0 = rng.uniform(-np.pi, np.pi, total)
+    yaw_rate = rng.normal(0.0, 0.05, total)
+    origin = rng.uniform(-extent, extent, (total, 2))
+    size = _CLASS_SIZES[cls] * rng.uniform(0.9, 1.1, (total, 1))
+
+    # 展开为每个 (轨迹, 帧) 一个框，再按帧排序
+    counts = end - start
+    track = np.repeat(np.arange(total), counts)
+    frame = (np.repeat(start, counts) + np.arange(counts.sum()) -
+             np.repeat(np.cumsum(counts) - counts, counts))
+    order = np.argsort(frame, kind='stable')
+    track, frame = track[order], frame[order]
+
+    t = (frame - birth[track]) * DEFAULT_FRAME_INTERVAL
+    omega = yaw_rate[track]
+    v = speed[track]
+    h0 = heading0[track]
+    heading = h0 + omega * t
+    safe_omega = np.where(np.abs(omega) > 1e-6, omega, 1.0)
+    dx = np.where(np.abs(omega) > 1e-6,
+                  v / safe_omega * (np.sin(heading) - np.sin(h0)),
+                  v * np.cos(h0) * t)
+    dy = np.where(np.abs(omega) > 1e-6,
+                  v / safe_omega * (np.cos(h0) - np.cos(heading)),
+                  v * np.sin(h0) * t)
+    translation = np.empty((len(track), 3))
+    translation[:, 0] = origin[track, 0] + dx
+    translation[:, 1] = origin[track, 1] + dy
+    translation[:, 2] = 0.5 * size[track, 2]
+    rotation = np.zeros((len(track), 4))
+    rotation[:, 0] = np.cos(heading / 2)
+    rotation[:, 3] = np.sin(heading / 2)
+    velocity = np.stack([v * np.cos(heading), v * np.sin(heading)], axis=1)
+
+    return {
+        'sample_tokens': _hex_tokens(rng, num_frames, 32),
+        'track_ids': _hex_tokens(rng, total, 16),
+        'frame': frame,
+        'track': track,
+        'name': cls[track],
+        'translation': translation,
+        'size': size[track],
+        'rotation': rotation,
+        'velocity': velocity,
+        'score': rng.uniform(0.3, 1.0, len(track)),
+    }
+
+
+def tracks_to_results(tracks: Dict[str, np.ndarray]) -> Dict[str, List[dict]]:
+    """将列数组转换为MCTrack/nuScenes格式的结果字典 {sample_token: [box, ...]}"""
+    sample_tokens = tracks['sample_tokens']
+    track_ids = tracks['track_ids']
+    offsets = np.searchsorted(tracks['frame'], np.arange(len(sample_tokens) + 1))
+    columns = [tracks[key].tolist() for key in
+               ('track', 'name', 'translation', 'size', 'rotation', 'velocity',
+                'score')]
+    results = {}
+    for frame_idx, token in enumerate(sample_tokens):
+        boxes = []
+        for row in range(offsets[frame_idx], offsets[frame_idx + 1]):
+            track, name, translation, size, rotation, velocity, score = (
+                column[row] for column in columns)
+            boxes.append({
+                'sample_token': token,
+                'translation': translation,
+                'size': size,
+                'rotation': rotation,
+                'velocity': velocity,
+                'tracking_id': track_ids[track],
+                'tracking_name': SYNTHETIC_CLASSES[name],
+                'tracking_score': score,
+            })
+        results[token] = boxes
+    return results
+
+
+def generate_synthetic_sweep(translation: np.ndarray, size: np.ndarray,
+                             rotation: np.ndarray, num_ground_points: int = 20000,
+                             points_per_box: int = 16, extent: float = 100.0,
+                             rng: Optional[np.random.Generator] = None
+                             ) -> np.ndarray:
+    """生成一帧伪点云: 地面随机点 + 每个框内的随机点
+
+    Returns:
+        (N, 5) float32 [x, y, z, intensity, ring]
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    ground = np.empty((num_ground_points, 3))
+    ground[:, :2] = rng.uniform(-extent, extent, (num_ground_points, 2))
+    ground[:, 2] = rng.normal(0.0, 0.05, num_ground_points)
+
+    # 在框内采样: 对单位立方体内的点应用框的变换 (通过8个顶点插值)
+    corners = box_corners(translation, size, rotation)
+    num_boxes = len(corners)
+    weights = rng.uniform(0.0, 1.0, (num_boxes, points_per_box, 3))
+    origin = corners[:, 0][:, None]  # 顶点0为 (-l/2, -w/2, -h/2)
+    axes = np.stack([corners[:, 1] - corners[:, 0],   # 长度方向
+                     corners[:, 3] - corners[:, 0],   # 宽度方向
+                     corners[:, 4] - corners[:, 0]],  # 高度方向
+                    axis=1)
+    object_points = (origin + weights @ axes).reshape(-1, 3)
+
+    xyz = np.concatenate([ground, object_points])
+    points = np.zeros((len(xyz), LIDAR_POINT_DIMS), dtype=np.float32)
+    points[:, :3] = xyz
+    points[:, 3] = rng.uniform(0.0, 255.0, len(xyz))
+    points[:, 4] = rng.integers(0, 32, len(xyz))
+    return points
+
+
+def write_synthetic_sweeps(directory: str, tracks: Dict[str, np.ndarray],
+                           num_ground_points: int = 20000,
+                           points_per_box: int = 16,
+                           seed: int = 0) -> List[str]:
+    """为每一帧写入一个 <sample_token>.pcd.bin 伪点云文件，返回文件路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    sample_tokens = tracks['sample_tokens']
+    offsets = np.searchsorted(tracks['frame'], np.arange(len(sample_tokens) + 1))
+    paths = []
+    for frame_idx, token in enumerate(sample_tokens):
+        rows = slice(offsets[frame_idx], offsets[frame_idx + 1])
+        points = generate_synthetic_sweep(
+            tracks['translation'][rows], tracks['size'][rows],
+            tracks['rotation'][rows], num_ground_points, points_per_box,
+            rng=rng)
+        path = os.path.join(directory, f"{token}.pcd.bin")
+        points.tofile(path)
+        paths.append(path)
+    return paths
+
+
+def write_synthetic_dataset(output_dir: str, num_frames: int = 2000,
+                            num_tracks: int = 1000, mean_lifetime: int = 200,
+                            num_ground_points: int = 20000, seed: int = 0,
+                            with_sweeps: bool = True) -> Tuple[str, List[str]]:
+    """生成合成数据集: results.json 和 sweeps/<sample_token>.pcd.bin
+
+    Returns:
+        (results_path, sweep_paths)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tracks = generate_synthetic_tracks(num_frames, num_tracks, mean_lifetime,
+                                       seed)
+    results_path = os.path.join(output_dir, 'results.json')
+    with open(results_path, 'w') as f:
+        json.dump({
+            'meta': {'use_lidar': True, 'use_camera': False, 'use_radar': False,
+                     'use_map': False, 'use_external': False},
+            'results': tracks_to_results(tracks),
+        }, f)
+    sweep_paths = []
+    if with_sweeps:
+        sweep_paths = write_synthetic_sweeps(
+            os.path.join(output_dir, 'sweeps'), tracks, num_ground_points,
+            seed=seed)
+    return results_path, sweep_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成MCTrack合成性能测试数据")
+    parser.add_argument('--output', default='synthetic', help="输出目录")
+    parser.add_argument('--frames', type=int, default=2000, help="帧数")
+    parser.add_argument('--tracks', type=int, default=1000,
+                        help="平均同时存在的轨迹数")
+    parser.add_argument('--lifetime', type=int, default=200,
+                        help="轨迹平均寿命 (帧)")
+    parser.add_argument('--ground-points', type=int, default=20000,
+                        help="每帧地面点数")
+    parser.add_argument('--no-sweeps', action='store_true', help="不生成点云")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results_path, sweep_paths = write_synthetic_dataset(
+        args.output, args.frames, args.tracks, args.lifetime,
+        args.ground_points, args.seed, not args.no_sweeps)
+    print(f"跟踪结果: {results_path}")
+    print(f"点云文件: {len(sweep_paths)} 个")
+
+
+if __name__ == "__main__":
+    main()
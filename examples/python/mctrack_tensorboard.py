@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+MCTrack导出到TensorBoard - 写入Open3D TensorBoard插件格式
+每个场景写为一个run，每帧一个step: 'points' 标签为点云 (雷达坐标系)，
+'boxes' 标签为跟踪框 (bboxes，类别名来自跟踪结果)。未改变的点云数据由
+summary.add_3d 写为引用之前step的property reference。多个场景在进程池中并行导出，
+之后用 tensorboard --logdir <目录> 在浏览器中查看，无需桌面GUI
+
+用法:
+    python mctrack_tensorboard.py --nuscenes-path data/nuScenes/datasets \\
+        --tracking-results results.json --logdir tb_logs --workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mctrack_data import TrackingResults
+from mctrack_frames import FrameAssembler, SweepInfo
+from mctrack_geometry import quaternion_to_matrix, transform_points
+
+
+def box_axes(translation: np.ndarray, size: np.ndarray, rotation: np.ndarray,
+             world_to_lidar: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """全局坐标系下的框 -> 雷达坐标系下 BoundingBox3D 的参数
+
+    Args:
+        translation / size / rotation: (M, 3) / (M, 3) [宽, 长, 高] /
+            (M, 4) 四元数 [w, x, y, z]
+
+    Returns:
+        center, front, up, left: (M, 3); sizes: (M, 3) 依次为沿 left, up, front
+        的尺寸 [宽, 高, 长]
+    """
+    rot = world_to_lidar[:3, :3] @ quaternion_to_matrix(
+        np.asarray(rotation).reshape(-1, 4))
+    center = transform_points(np.asarray(translation).reshape(-1, 3),
+                              world_to_lidar)
+    sizes = np.asarray(size, dtype=np.float64).reshape(-1, 3)[:, [0, 2, 1]]
+    return center, rot[:, :, 0], rot[:, :, 2], rot[:, :, 1], sizes
+
+
+def _summary_writer(logdir: str) -> Tuple[Callable, Callable]:
+    """返回 (add_3d, close)；优先使用PyTorch的 SummaryWriter，否则使用TensorFlow"""
+    from open3d.visualization.tensorboard_plugin import summary
+    try:
+        from torch.utils.tensorboard import SummaryWriter
+    except ImportError:
+        SummaryWriter = None
+    if SummaryWriter is not None:
+        writer = SummaryWriter(logdir)
+        return writer.add_3d, writer.close
+
+    import tensorflow as tf
+    writer = tf.summary.create_file_writer(logdir)
+
+    def add_3d(tag, data, step, label_to_names=None):
+        with writer.as_default():
+            summary.add_3d(tag, data, step, logdir=logdir,
+                           label_to_names=label_to_names)
+
+    return add_3d, writer.close
+
+
+def export_scene(logdir: str, tracks: TrackingResults,
+                 sweep_infos: Sequence[SweepInfo],
+                 max_points: int = 0,
+                 class_names: Optional[Sequence[str]] = None) -> int:
+    """将一个场景写为TensorBoard run，返回写入的step数
+
+    Args:
+        logdir: run目录
+        tracks: 场景的列式跟踪结果 (sample顺序即step顺序)
+        sweep_infos: 每帧的点云路径和全局->雷达变换
+        max_points: 每帧最多写入的点数 (均匀抽取)，0表示不限制
+        class_names: 整个数据集的类别列表，标签ID为其中的序号，使同一类别在
+            所有run中颜色一致；默认使用本场景的类别
+    """
+    from open3d.ml.vis import BoundingBox3D
+
+    infos = dict(zip(tracks.sample_tokens, sweep_infos))
+    assembler = FrameAssembler(tracks.sample_tokens, infos.__getitem__, tracks,
+                               cache_size=1, sweep_cache_size=2, prefetch=0)
+    if class_names is None:
+        class_names = tracks.class_names
+    label_to_names = dict(enumerate(class_names))
+    class_to_label = {name: label for label, name in label_to_names.items()}
+    # 场景内类别序号 -> 数据集标签ID
+    scene_labels = np.array([class_to_label[name] for name in tracks.class_names],
+                            dtype=np.int64)
+    add_3d, close = _summary_writer(logdir)
+    names_written = False
+    try:
+        for step in range(tracks.num_frames):
+            frame = assembler.assemble_boxes(step)
+            if assembler.sweep_info(step).path is not None:
+                sweep = assembler.load_sweep(step)
+                data, colors = sweep.data, sweep.colors
+                if 0 < max_points < len(data):
+                    keep = np.linspace(0, len(data) - 1, max_points).astype(int)
+                    data, colors = data[keep], colors[keep]
+                if len(data) > 0:
+                    # 插件的数据形状为 (B, N, 3)，每个step一个点云；
+                    # 与之前step相同的数据由 summary.add_3d 自动写为引用
+                    add_3d('points', {
+                        'vertex_positions': np.ascontiguousarray(data[None, :, :3]),
+                        'vertex_colors': np.ascontiguousarray(colors[None])}, step)
+
+            if frame.num_boxes == 0:
+                continue
+            rows = tracks.frame_slice(step)
+            center, front, up, left, sizes = box_axes(
+                frame.box_translation, frame.box_size, frame.box_rotation,
+                frame.world_to_lidar)
+            bboxes = [
+                BoundingBox3D(center[k], front[k], up[k], left[k], sizes[k],
+                              int(label), float(score), meta=str(track_id))
+                for k, (label, score, track_id) in enumerate(
+                    zip(scene_labels[tracks.name[rows]], tracks.score[rows],
+                        frame.track_ids))
+            ]
+            # 类别名只在每个标签的第一个step中保存
+            add_3d('boxes', {'bboxes': bboxes}, step,
+                   label_to_names=None if names_written else label_to_names)
+            names_written = True
+    finally:
+        close()
+        assembler.shutdown()
+    return tracks.num_frames
+
+
+def _export_task(task: dict) -> Tuple[str, int]:
+    """工作进程: 导出一个场景 (任务中只包含该场景的跟踪结果)"""
+    tracks = TrackingResults.from_dict(task['results'], task['sample_tokens'])
+    steps = export_scene(task['logdir'], tracks, task['sweep_infos'],
+                         task['max_points'], task['class_names'])
+    return task['name'], steps
+
+
+def export_scenes(results: Dict[str, List[dict]], scenes: Sequence[dict],
+                  logdir: str, workers: Optional[int] = None,
+                  max_points: int = 0) -> List[Tuple[str, int]]:
+    """并行导出多个场景，每个场景写入 logdir/<场景名>/
+
+    Args:
+        scenes: [{'name', 'sample_tokens', 'sweep_infos'}, ...]
+
+    Returns:
+        [(场景名, step数), ...]
+    """
+    # 数据集级别的类别列表 (与 TrackingResults.from_dict 一致，缺省类别名为'')
+    class_names = sorted({box.get('tracking_name', '')
+                          for boxes in results.values() for box in boxes})
+    tasks = [{'name': scene['name'], 'sample_tokens': scene['sample_tokens'],
+              'results': {token: results.get(token, [])
+                          for token in scene['sample_tokens']},
+              'sweep_infos': scene['sweep_infos'],
+              'logdir': os.path.join(logdir, scene['name']),
+              'max_points': max_points, 'class_names': class_names}
+             for scene in scenes]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        return [_export_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_export_task, tasks))
+
+
+def nuscenes_export_scenes(nusc, scene_names: Optional[Sequence[str]] = None
+                           ) -> List[dict]:
+    """由 NuScenes 对象构建导出任务的场景列表 (点云路径和位姿在主进程中查询)"""
+    from mctrack_frames import nuscenes_sweep_lookup
+    from mctrack_stats import scene_index_from_nusc
+
+    lookup = nuscenes_sweep_lookup(nusc)
+    scenes = []
+    for scene in scene_index_from_nusc(nusc):
+        if scene_names and scene['name'] not in scene_names:
+            continue
+        scene['sweep_infos'] = [lookup(token) for token in scene['sample_tokens']]
+        scenes.append(scene)
+    return scenes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="导出MCTrack场景到Open3D TensorBoard插件格式")
+    parser.add_argument('--nuscenes-path', default='data/nuScenes/datasets',
+                        help="nuScenes数据集路径")
+    parser.add_argument('--nuscenes-version', default='v1.0-mini',
+                        help="nuScenes版本")
+    parser.add_argument('--tracking-results',
+                        default='results/nuscenes/latest/results.json',
+                        help="MCTrack跟踪结果文件路径")
+    parser.add_argument('--logdir', default='tb_logs', help="TensorBoard日志目录")
+    parser.add_argument('--scenes', nargs='*', default=None,
+                        help="只导出这些场景 (场景名)，默认导出全部")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="进程数，默认为CPU核数")
+    parser.add_argument('--max-points', type=int, default=0,
+                        help="每帧最多写入的点数，0表示不限制")
+    args = parser.parse_args()
+
+    from nuscenes.nuscenes import NuScenes
+
+    start = time.time()
+    nusc = NuScenes(version=args.nuscenes_version, dataroot=args.nuscenes_path,
+                    verbose=False)
+    with open(args.tracking_results, 'r') as f:
+        data = json.load(f)
+    results = data['results'] if 'results' in data else data
+    scenes = nuscenes_export_scenes(nusc, args.scenes)
+    exported = export_scenes(results, scenes, args.logdir, args.workers,
+                             args.max_points)
+    print(f"已导出 {len(exported)} 个场景, "
+          f"{sum(steps for _, steps in exported)} 帧 "
+          f"({time.time() - start:.1f}s): {args.logdir}")
+    print(f"查看: tensorboard --logdir {args.logdir}")
+
+
+if __name__ == "__main__":
+    main()
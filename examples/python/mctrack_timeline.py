@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+MCTrack时间轴缩略图条
+在后台进程池中为场景的每一帧预先渲染BEV缩略图，并拼接为显示在时间轴上方的图像条
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, List, Optional
+
+import numpy as np
+import open3d as o3d
+import open3d.visualization.gui as gui
+
+from mctrack_bev import render_bev_thumbnail
+
+_MARKER_COLOR = np.array([255, 80, 80], dtype=np.uint8)
+_EMPTY_COLOR = np.array([40, 40, 40], dtype=np.uint8)
+
+
+class TimelineThumbnailStrip:
+    """时间轴缩略图条
+
+    缩略图在进程池中渲染，完成后在主线程中更新图像条。帧数较多时，
+    图像条按固定宽度均匀抽取帧显示。
+    """
+
+    def __init__(self, window, strip_width: int = 640, strip_height: int = 48,
+                 thumbnail_size: int = 64, max_workers: Optional[int] = None):
+        self.window = window
+        self.strip_width = strip_width
+        self.strip_height = strip_height
+        self.thumbnail_size = thumbnail_size
+        self.max_workers = max_workers
+        self.widget = gui.ImageWidget()
+        self._executor = None  # 首次使用时创建
+        self._thumbnails: List[Optional[np.ndarray]] = []
+        self._current_frame = 0
+        self._generation = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def thumbnail(self, frame_idx: int) -> Optional[np.ndarray]:
+        """获取某一帧已渲染的缩略图，尚未完成时返回 None"""
+        if 0 <= frame_idx < len(self._thumbnails):
+            return self._thumbnails[frame_idx]
+        return None
+
+    def start(self, num_frames: int, jobs: Iterable):
+        """在后台开始渲染一个场景的所有缩略图
+
+        Args:
+            num_frames: 场景帧数
+            jobs: 可迭代的 (frame_idx, pc_path, corners, colors)，在后台线程中
+                逐个取出并提交到进程池，因此可以是惰性生成器
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            for future in self._pending:
+                future.cancel()
+            self._pending = []
+        self._thumbnails = [None] * num_frames
+        self._refresh()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        threading.Thread(target=self._submit_jobs, args=(jobs, generation),
+                         name="MCTrackThumbnails", daemon=True).start()
+
+    def set_current_frame(self, frame_idx: int):
+        """更新当前帧标记"""
+        if frame_idx != self._current_frame:
+            self._current_frame = frame_idx
+            self._refresh()
+
+    def shutdown(self):
+        """停止进程池"""
+        with self._lock:
+            self._generation += 1
+            for future in self._pending:
+                future.cancel()
+            self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _submit_jobs(self, jobs: Iterable, generation: int):
+        """后台线程: 生成任务并提交到进程池"""
+        for frame_idx, pc_path, corners, colors in jobs:
+            with self._lock:
+                if generation != self._generation or self._executor is None:
+                    return  # 场景已切换
+                future = self._executor.submit(render_bev_thumbnail, frame_idx,
+                                               pc_path, corners, colors,
+                                               image_size=self.thumbnail_size)
+                self._pending.append(future)
+            future.add_done_callback(partial(self._on_rendered, generation))
+
+    def _on_rendered(self, generation: int, future):
+        """缩略图完成回调 (在后台线程中调用)"""
+        if future.cancelled() or generation != self._generation:
+            return
+        try:
+            frame_idx, image = future.result()
+        except Exception as e:
+            print(f"Error rendering BEV thumbnail: {str(e)}")
+            return
+
+        def update():
+            if (generation == self._generation and
+                    frame_idx < len(self._thumbnails)):
+                self._thumbnails[frame_idx] = image
+                self._refresh()
+
+        gui.Application.instance.post_to_main_thread(self.window, update)
+
+    def compose_strip(self) -> np.ndarray:
+        """拼接图像条: 均匀抽取帧，当前帧下方绘制标记"""
+        num_frames = len(self._thumbnails)
+        marker_height = max(2, self.strip_height // 12)
+        strip = np.empty((self.strip_height + marker_height, self.strip_width, 3),
+                         dtype=np.uint8)
+        strip[:] = _EMPTY_COLOR
+        if num_frames == 0:
+            return strip
+        num_slots = min(num_frames, max(1, self.strip_width // 16))
+        slot_frames = np.round(np.linspace(0, num_frames - 1,
+                                           num_slots)).astype(int)
+        edges = np.linspace(0, self.strip_width, num_slots + 1).astype(int)
+        rows = np.linspace(0, self.thumbnail_size - 1,
+                           self.strip_height).astype(int)
+        for slot, frame_idx in enumerate(slot_frames):
+            thumbnail = self._thumbnails[frame_idx]
+            x0, x1 = edges[slot], edges[slot + 1]
+            if thumbnail is not None and x1 > x0:
+                cols = np.linspace(0, thumbnail.shape[1] - 1, x1 - x0).astype(int)
+                strip[:self.strip_height, x0:x1] = thumbnail[rows][:, cols]
+        current_slot = int(np.argmin(np.abs(slot_frames - self._current_frame)))
+        strip[self.strip_height:, edges[current_slot]:edges[current_slot + 1]] = (
+            _MARKER_COLOR)
+        return strip
+
+    def _refresh(self):
+        """主线程: 重新拼接并显示图像条"""
+        self.widget.update_image(o3d.geometry.Image(self.compose_strip()))
+        self.window.post_redraw()
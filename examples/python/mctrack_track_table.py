@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+MCTrack轨迹列表 - 控制面板中的轨迹表
+通过区间索引只取出当前帧存活的轨迹，排序后只格式化前 max_rows 行，
+因此在包含上万条轨迹的结果上也能随帧更新。可跳转到选中轨迹的起止帧，
+也可按当前帧的框内点数排序以快速找到可疑的检测
+"""
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import open3d.visualization.gui as gui
+
+from mctrack_data import TrackingResults
+
+TRACK_SORT_KEYS = ('birth', 'death', 'length', 'points', 'id')
+
+
+def track_table_rows(tracks: TrackingResults, track_indices: np.ndarray,
+                     sort_key: str = 'birth',
+                     max_rows: int = 200,
+                     point_counts: Optional[np.ndarray] = None
+                     ) -> Tuple[np.ndarray, list]:
+    """排序并格式化轨迹表的行
+
+    Args:
+        tracks: 列式跟踪结果
+        track_indices: 要显示的轨迹序号
+        sort_key: 'birth' (起始帧), 'death' (结束帧), 'length' (观测数，降序)，
+            'points' (当前帧框内点数，升序) 或 'id'
+        max_rows: 最多显示的行数
+        point_counts: (num_tracks,) 当前帧各轨迹的框内点数，-1表示当前帧无框
+
+    Returns:
+        (rows, texts): 显示的轨迹序号和对应的文本
+    """
+    track_indices = np.asarray(track_indices, dtype=np.int64)
+    first = tracks.track_first_frame[track_indices]
+    last = tracks.track_last_frame[track_indices]
+    length = np.diff(tracks.track_offsets)[track_indices]
+    if point_counts is None:
+        points = np.full(len(track_indices), -1, dtype=np.int64)
+    else:
+        points = np.asarray(point_counts)[track_indices]
+    if sort_key == 'death':
+        order = np.lexsort((track_indices, last))
+    elif sort_key == 'length':
+        order = np.lexsort((track_indices, -length))
+    elif sort_key == 'points':
+        order = np.lexsort((track_indices,
+                            np.where(points < 0, np.iinfo(np.int64).max, points)))
+    elif sort_key == 'id':
+        order = np.argsort([str(tracks.track_ids[t]) for t in track_indices],
+                           kind='stable')
+    else:
+        order = np.lexsort((track_indices, first))
+    order = order[:max_rows]
+
+    # 每条轨迹的类别取其首个观测
+    first_rows = tracks.track_order[tracks.track_offsets[track_indices[order]]]
+    names = tracks.name[first_rows]
+    texts = [
+        f"{str(tracks.track_ids[t])[:12]:<12} {tracks.class_names[n]:<10} "
+        f"{f}-{l} ({c})" + (f" pts {p}" if p >= 0 else "")
+        for t, n, f, l, c, p in zip(track_indices[order], names, first[order],
+                                    last[order], length[order], points[order])
+    ]
+    return track_indices[order], texts
+
+
+class TrackTable:
+    """轨迹列表控件
+
+    显示当前帧存活的轨迹 (或全部轨迹)，可排序；选中一行后可跳转到该轨迹的
+    起始帧或结束帧。
+    """
+
+    def __init__(self, em: float, on_jump: Callable[[int], None],
+                 max_rows: int = 200):
+        self.on_jump = on_jump
+        self.max_rows = max_rows
+        self.tracks: Optional[TrackingResults] = None
+        self.sort_key = TRACK_SORT_KEYS[0]
+        self.show_all = False
+        self._frame_idx = 0
+        self._point_counts: Optional[np.ndarray] = None  # 当前帧各轨迹的框内点数
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._selected = -1  # 选中的轨迹序号
+
+        self.widget = gui.CollapsableVert("Tracks", 0.25 * em,
+                                          gui.Margins(em, 0, 0, 0))
+        self.widget.set_is_open(False)
+
+        self.summary = gui.Label("No tracks")
+        self.widget.add_child(self.summary)
+
+        options = gui.Horiz(0.25 * em)
+        options.add_child(gui.Label("Sort:"))
+        self.sort_combo = gui.Combobox()
+        for key in TRACK_SORT_KEYS:
+            self.sort_combo.add_item(key)
+        self.sort_combo.set_on_selection_changed(self._on_sort_changed)
+        options.add_child(self.sort_combo)
+        self.all_checkbox = gui.Checkbox("All")
+        self.all_checkbox.set_on_checked(self._on_show_all_changed)
+        options.add_child(self.all_checkbox)
+        self.widget.add_child(options)
+
+        self.list_view = gui.ListView()
+        self.list_view.set_max_visible_items(12)
+        self.list_view.set_on_selection_changed(self._on_selection_changed)
+        self.widget.add_child(self.list_view)
+
+        buttons = gui.Horiz(0.25 * em)
+        birth_button = gui.Button("Go to Birth")
+        birth_button.set_on_clicked(lambda: self._jump(birth=True))
+        death_button = gui.Button("Go to Death")
+        death_button.set_on_clicked(lambda: self._jump(birth=False))
+        buttons.add_child(birth_button)
+        buttons.add_child(death_button)
+        self.widget.add_child(buttons)
+
+    def set_tracks(self, tracks: Optional[TrackingResults]):
+        """更换跟踪结果 (区间索引在首次查询时构建)"""
+        self.tracks = tracks
+        self._selected = -1
+        self._point_counts = None
+        self.refresh()
+
+    def update(self, frame_idx: int, box_tracks: Optional[np.ndarray] = None,
+               box_point_counts: Optional[np.ndarray] = None):
+        """切换到新的一帧
+
+        Args:
+            box_tracks: 当前帧各框的轨迹序号
+            box_point_counts: 当前帧各框内的点数，未统计时为 None
+        """
+        self._frame_idx = frame_idx
+        self._point_counts = None
+        if self.tracks is not None and box_point_counts is not None:
+            self._point_counts = np.full(self.tracks.num_tracks, -1,
+                                         dtype=np.int64)
+            self._point_counts[box_tracks] = box_point_counts
+        if not self.show_all or self._point_counts is not None:
+            self.refresh()
+
+    def refresh(self):
+        """重新查询并显示轨迹列表"""
+        if self.tracks is None or self.tracks.num_tracks == 0:
+            self._rows = np.zeros(0, dtype=np.int64)
+            self.list_view.set_items([])
+            self.summary.text = "No tracks"
+            return
+        if self.show_all:
+            alive = np.arange(self.tracks.num_tracks)
+        else:
+            alive = self.tracks.alive_tracks(self._frame_idx)
+        self._rows, texts = track_table_rows(self.tracks, alive, self.sort_key,
+                                             self.max_rows, self._point_counts)
+        self.list_view.set_items(texts)
+        scope = "total" if self.show_all else "alive"
+        self.summary.text = (f"{len(alive)} {scope} / {self.tracks.num_tracks} "
+                             f"tracks (showing {len(self._rows)})")
+        matches = np.flatnonzero(self._rows == self._selected)
+        if len(matches) > 0:
+            self.list_view.selected_index = int(matches[0])
+
+    def _on_sort_changed(self, text, index):
+        self.sort_key = TRACK_SORT_KEYS[index]
+        self.refresh()
+
+    def _on_show_all_changed(self, checked):
+        self.show_all = checked
+        self.refresh()
+
+    def _on_selection_changed(self, value, is_double_click):
+        index = self.list_view.selected_index
+        if 0 <= index < len(self._rows):
+            self._selected = int(self._rows[index])
+            if is_double_click:
+                self._jump(birth=True)
+
+    def _jump(self, birth: bool):
+        if self.tracks is None or self._selected < 0:
+            return
+        frames = (self.tracks.track_first_frame if birth
+                  else self.tracks.track_last_frame)
+        self.on_jump(int(frames[self._selected]))
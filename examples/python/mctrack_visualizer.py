@@ -12,8 +12,8 @@ import open3d.visualization.rendering as rendering
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import colorsys
+from typing import Dict, Optional, Tuple
+import threading
 import time
 
 try:
@@ -25,6 +25,20 @@ except ImportError:
     print("Warning: nuscenes-devkit not available. Some features will be limited.")
     NUSCENES_AVAILABLE = False
 
+from mctrack_camera import CameraPanel
+from mctrack_labels import TrackLabelPool
+from mctrack_data import TrackingResults
+from mctrack_frames import FrameAssembler, nuscenes_sweep_lookup
+from mctrack_bev import render_bev
+from mctrack_timeline import TimelineThumbnailStrip
+from mctrack_track_table import TrackTable
+from mctrack_scene_browser import SceneBrowser
+from mctrack_map import nuscenes_map_path
+from mctrack_map_layer import MapLayer
+from mctrack_palette import make_palette
+from mctrack_stats import (default_stats_path, index_stats, load_scene_stats,
+                           scene_index_from_nusc, stats_outdated)
+
 
 class MCTrackSettings:
     """MCTrack可视化设置"""
@@ -35,33 +49,61 @@ class MCTrackSettings:
         self.show_tracking_boxes = True
         self.show_trajectories = True
         self.show_ground_truth = False
+        self.show_camera_panel = True
+        self.show_track_labels = True
+        self.show_motion = True  # 速度箭头和运动预测
+        
+        # 高精地图背景层 (按需加载的多分辨率图块)
+        self.show_map = True
+        self.map_radius = 100.0  # 显示范围 (米)，决定图块分辨率
+        
+        # 鸟瞰图 (BEV) 模式
+        self.bev_mode = False
+        self.bev_extent = 50.0  # 显示范围 [-extent, extent] (米)
+        self.bev_image_size = 512
+        self.bev_color_mode = 'height'  # 'height' 或 'intensity'
         
         # 点云设置
         self.point_size = 2.0
         self.point_cloud_color = [0.5, 0.5, 0.5]
+        self.color_by_semantics = False  # 按nuScenes-lidarseg标签着色 (有标注时)
+        
+        # 点云预处理 (解码后、上传前，结果随帧缓存)
+        self.roi_range = 0.0  # 水平距离上限 (米)，0表示不裁剪
+        self.roi_bounds = None  # 轴对齐范围 [x_min, y_min, z_min, x_max, y_max, z_max]
+        self.remove_ground = False
+        self.ground_method = 'grid'  # 'grid' (网格最低高度) 或 'ransac' (平面拟合)
+        self.ground_cell_size = 1.0
+        self.ground_height_threshold = 0.25
         
         # 跟踪框设置
         self.box_line_width = 2.0
+        self.count_box_points = True  # 统计框内点数，点数少的框颜色变暗
+        self.full_box_points = 20  # 达到该点数的框显示原色
         self.trajectory_length = 20  # 显示的历史轨迹长度
         
+        # 跟踪ID标签设置
+        self.max_track_labels = 128  # 标签池上限
+        self.label_max_distance = 60.0  # 超过该距离不显示标签
+        
+        # 运动预测设置
+        self.prediction_horizon = 3.0  # 预测时长 (秒)
+        self.prediction_step = 0.5  # 预测采样间隔 (秒)
+        self.velocity_arrow_scale = 1.0  # 箭头长度 = 速度 * 该值 (秒)
+        
         # 播放控制
         self.auto_play = False
         self.play_speed = 1.0  # 播放速度倍数
         self.current_frame = 0
         self.total_frames = 0
         
+        # 时间轴拖动: 拖动中只显示低成本预览，停止拖动后渲染完整帧
+        self.drag_preview = 'boxes'  # 'boxes' (仅跟踪框) 或 'thumbnail' (BEV缩略图)
+        self.drag_settle_time = 0.15  # 无新事件超过该时间 (秒) 视为拖动结束
+        
         # 颜色设置
         self.use_track_id_colors = True
-        self.color_palette = self._generate_color_palette(50)
-        
-    def _generate_color_palette(self, num_colors: int) -> List[List[float]]:
-        """生成不同的颜色用于区分不同的跟踪ID"""
-        colors = []
-        for i in range(num_colors):
-            hue = i / num_colors
-            rgb = colorsys.hsv_to_rgb(hue, 0.8, 0.9)
-            colors.append(list(rgb))
-        return colors
+        self.color_palette = make_palette()  # 按跟踪ID的稳定哈希索引
 
 
 class MCTrackVisualizer:
@@ -75,7 +117,10 @@ class MCTrackVisualizer:
         self.scene_token = None
         self.scene_data = None
         self.tracking_data = None
+        self.tracking_key = None  # 跟踪结果文件标识 (路径, 修改时间)
+        self.tracks = None  # 当前场景的列式跟踪结果 (TrackingResults)
         self.sample_tokens = []
+        self.assembler = None  # 当前场景的帧组装器 (FrameAssembler)
         
         # GUI组件
         self.window = None
@@ -83,11 +128,27 @@ class MCTrackVisualizer:
         self.timeline_slider = None
         self.play_button = None
         self.info_text = None
+        self.camera_panel = None
+        self.label_pool = None
+        self.bev_widget = None
+        self.thumbnail_strip = None
+        self.track_table = None
+        self.scene_browser = None
+        self.map_layer = None
+        self._map_pose = None  # 当前帧的全局 -> 雷达变换 (地图层使用)
+        self.stats_path = None  # 场景统计文件，默认在跟踪结果文件旁
         
         # 状态
         self.is_playing = False
         self.last_play_time = 0
         
+        # 时间轴事件合并
+        self._pending_frame = None  # 最新请求的目标帧
+        self._preview_scheduled = False
+        self._settle_deadline = 0.0
+        self._settle_waiting = False
+        self._bev_preview_active = False
+        
         # 几何对象缓存
         self.current_geometries = {}
         
@@ -105,12 +166,30 @@ class MCTrackVisualizer:
         self.scene_widget.scene = rendering.Open3DScene(self.window.renderer)
         self.scene_widget.set_on_sun_direction_changed(self._on_sun_dir_changed)
         
+        # 跟踪ID标签池 (标签复用，不随帧增删)
+        self.label_pool = TrackLabelPool(
+            self.scene_widget, self.settings.max_track_labels,
+            self.settings.label_max_distance)
+        
+        # 高精地图背景层
+        self.map_layer = MapLayer(self.window, self.scene_widget.scene)
+        
         # 创建控制面板
         self._create_control_panel()
         
+        # 环视相机面板 (异步解码，不阻塞3D视图)
+        self.camera_panel = CameraPanel(self.window)
+        
+        # BEV模式下代替3D场景显示的图像
+        self.bev_widget = gui.ImageWidget()
+        self.bev_widget.visible = False
+        
         # 设置布局
         self.window.set_on_layout(self._on_layout)
+        self.window.set_on_close(self._on_close)
         self.window.add_child(self.scene_widget)
+        self.window.add_child(self.camera_panel.widget)
+        self.window.add_child(self.bev_widget)
         self.window.add_child(self.control_panel)
         
         # 应用默认设置
@@ -152,9 +231,17 @@ class MCTrackVisualizer:
         
         self.control_panel.add_child(file_section)
         
+        # === 场景浏览区域 (--index-stats 生成的统计) ===
+        self.scene_browser = SceneBrowser(em, self._on_scene_selected)
+        self.control_panel.add_child(self.scene_browser.widget)
+        
         # === 播放控制区域 ===
         play_section = gui.CollapsableVert("Playback Control", 0.25 * em, gui.Margins(em, 0, 0, 0))
         
+        # 时间轴缩略图条 (后台进程池渲染BEV缩略图)
+        self.thumbnail_strip = TimelineThumbnailStrip(self.window)
+        play_section.add_child(self.thumbnail_strip.widget)
+        
         # Timeline slider
         timeline_h = gui.Horiz(0.25 * em)
         timeline_h.add_child(gui.Label("Timeline:"))
@@ -211,6 +298,66 @@ class MCTrackVisualizer:
         self.show_traj_checkbox.set_on_checked(self._on_show_traj_changed)
         display_section.add_child(self.show_traj_checkbox)
         
+        self.show_cam_checkbox = gui.Checkbox("Show Cameras")
+        self.show_cam_checkbox.checked = True
+        self.show_cam_checkbox.set_on_checked(self._on_show_cam_changed)
+        display_section.add_child(self.show_cam_checkbox)
+        
+        self.show_labels_checkbox = gui.Checkbox("Show Track IDs")
+        self.show_labels_checkbox.checked = True
+        self.show_labels_checkbox.set_on_checked(self._on_show_labels_changed)
+        display_section.add_child(self.show_labels_checkbox)
+        
+        self.show_motion_checkbox = gui.Checkbox("Show Motion Prediction")
+        self.show_motion_checkbox.checked = True
+        self.show_motion_checkbox.set_on_checked(self._on_show_motion_changed)
+        display_section.add_child(self.show_motion_checkbox)
+        
+        self.box_points_checkbox = gui.Checkbox("Shade Boxes by Point Count")
+        self.box_points_checkbox.checked = True
+        self.box_points_checkbox.set_on_checked(self._on_box_points_changed)
+        display_section.add_child(self.box_points_checkbox)
+        
+        self.bev_mode_checkbox = gui.Checkbox("BEV Mode")
+        self.bev_mode_checkbox.checked = False
+        self.bev_mode_checkbox.set_on_checked(self._on_bev_mode_changed)
+        display_section.add_child(self.bev_mode_checkbox)
+        
+        self.remove_ground_checkbox = gui.Checkbox("Remove Ground")
+        self.remove_ground_checkbox.checked = False
+        self.remove_ground_checkbox.set_on_checked(self._on_remove_ground_changed)
+        display_section.add_child(self.remove_ground_checkbox)
+        
+        self.semantics_checkbox = gui.Checkbox("Color by Lidarseg")
+        self.semantics_checkbox.checked = False
+        self.semantics_checkbox.set_on_checked(self._on_color_by_semantics_changed)
+        display_section.add_child(self.semantics_checkbox)
+        
+        # ROI range (0 = off)
+        roi_h = gui.Horiz(0.25 * em)
+        roi_h.add_child(gui.Label("ROI Range (m):"))
+        self.roi_slider = gui.Slider(gui.Slider.INT)
+        self.roi_slider.set_limits(0, 100)
+        self.roi_slider.int_value = 0
+        self.roi_slider.set_on_value_changed(self._on_roi_range_changed)
+        roi_h.add_child(self.roi_slider)
+        display_section.add_child(roi_h)
+        
+        # HD map background
+        self.show_map_checkbox = gui.Checkbox("Show HD Map")
+        self.show_map_checkbox.checked = True
+        self.show_map_checkbox.set_on_checked(self._on_show_map_changed)
+        display_section.add_child(self.show_map_checkbox)
+        
+        map_h = gui.Horiz(0.25 * em)
+        map_h.add_child(gui.Label("Map Range (m):"))
+        self.map_radius_slider = gui.Slider(gui.Slider.INT)
+        self.map_radius_slider.set_limits(25, 500)
+        self.map_radius_slider.int_value = int(self.settings.map_radius)
+        self.map_radius_slider.set_on_value_changed(self._on_map_radius_changed)
+        map_h.add_child(self.map_radius_slider)
+        display_section.add_child(map_h)
+        
         # Point cloud size
         pc_size_h = gui.Horiz(0.25 * em)
         pc_size_h.add_child(gui.Label("Point Size:"))
@@ -231,8 +378,22 @@ class MCTrackVisualizer:
         traj_len_h.add_child(self.traj_len_slider)
         display_section.add_child(traj_len_h)
         
+        # Prediction horizon
+        horizon_h = gui.Horiz(0.25 * em)
+        horizon_h.add_child(gui.Label("Pred Horizon (s):"))
+        self.horizon_slider = gui.Slider(gui.Slider.DOUBLE)
+        self.horizon_slider.set_limits(0.5, 6.0)
+        self.horizon_slider.double_value = 3.0
+        self.horizon_slider.set_on_value_changed(self._on_horizon_changed)
+        horizon_h.add_child(self.horizon_slider)
+        display_section.add_child(horizon_h)
+        
         self.control_panel.add_child(display_section)
         
+        # === 轨迹列表区域 ===
+        self.track_table = TrackTable(em, self._jump_to_frame)
+        self.control_panel.add_child(self.track_table.widget)
+        
         # === 场景信息区域 ===
         info_section = gui.CollapsableVert("Scene Info", 0.25 * em, gui.Margins(em, 0, 0, 0))
         info_section.set_is_open(False)
@@ -252,9 +413,20 @@ class MCTrackVisualizer:
                           self.control_panel.calc_preferred_size(
                               layout_context, gui.Widget.Constraints()).height)
         
-        # 3D场景占据剩余空间
+        # 3D场景占据剩余空间，相机面板位于场景下方
         scene_width = r.width - panel_width
-        self.scene_widget.frame = gui.Rect(r.x, r.y, scene_width, r.height)
+        camera_height = 0
+        self.camera_panel.widget.visible = self.settings.show_camera_panel
+        if self.settings.show_camera_panel:
+            camera_height = int(self.camera_panel.preferred_height(scene_width))
+            self.camera_panel.widget.frame = gui.Rect(
+                r.x, r.y + r.height - camera_height, scene_width, camera_height)
+        self.scene_widget.frame = gui.Rect(r.x, r.y, scene_width,
+                                           r.height - camera_height)
+        self.bev_widget.frame = self.scene_widget.frame
+        show_bev = self.settings.bev_mode or self._bev_preview_active
+        self.bev_widget.visible = show_bev
+        self.scene_widget.visible = not show_bev
         
         # 控制面板在右侧
         self.control_panel.frame = gui.Rect(r.x + scene_width, r.y, 
@@ -275,6 +447,15 @@ class MCTrackVisualizer:
         """太阳光方向改变回调"""
         pass
         
+    def _on_close(self):
+        """窗口关闭回调"""
+        self.camera_panel.shutdown()
+        self.thumbnail_strip.shutdown()
+        self.map_layer.shutdown()
+        if self.assembler is not None:
+            self.assembler.shutdown()
+        return True
+        
     # === 数据加载相关方法 ===
     def _on_load_nuscenes(self):
         """加载nuScenes数据"""
@@ -298,11 +479,13 @@ class MCTrackVisualizer:
                     
             if self.nusc is None:
                 raise Exception("无法加载任何nuScenes版本")
+            self.camera_panel.clear_calibrations()
                 
             # 加载第一个场景
             if len(self.nusc.scene) > 0:
                 self.scene_token = self.nusc.scene[0]['token']
                 self._load_scene_data()
+                self._refresh_scene_browser()
                 self._update_info_text()
                 self._show_message("成功", f"已加载nuScenes数据集 ({self.nusc.version})")
             else:
@@ -326,6 +509,9 @@ class MCTrackVisualizer:
                 self.tracking_data = data['results']
             else:
                 self.tracking_data = data
+            self.tracking_key = (os.path.abspath(path), os.path.getmtime(path))
+            self._build_track_index()
+            self._refresh_scene_browser()
                 
             self._update_info_text()
             self._show_message("成功", "已加载跟踪结果")
@@ -337,6 +523,37 @@ class MCTrackVisualizer:
         except Exception as e:
             self._show_message("错误", f"加载跟踪结果失败: {str(e)}")
             
+    def _refresh_scene_browser(self):
+        """读取场景统计文件；没有统计文件时只列出数据集中的场景"""
+        results_path = self.tracking_path_text.text_value
+        stats_path = self.stats_path or default_stats_path(results_path)
+        if os.path.exists(stats_path):
+            try:
+                data = load_scene_stats(stats_path)
+                note = "stats outdated" if stats_outdated(data, results_path) else ""
+                self.scene_browser.set_scenes(data['scenes'], note)
+                return
+            except (ValueError, KeyError, OSError) as e:
+                print(f"Error loading scene stats {stats_path}: {str(e)}")
+        if self.nusc is not None:
+            self.scene_browser.set_scenes(scene_index_from_nusc(self.nusc),
+                                          "run --index-stats for statistics")
+            
+    def _on_scene_selected(self, scene_token: str):
+        """场景浏览器中选择了场景"""
+        if self.nusc is None:
+            self._show_message("错误", "请先加载nuScenes数据")
+            return
+        try:
+            self.nusc.get('scene', scene_token)
+        except KeyError:
+            self._show_message("错误", "当前数据集中没有该场景")
+            return
+        self.scene_token = scene_token
+        self._load_scene_data()
+        self._update_info_text()
+        self._show_frame(0)
+        
     def _load_scene_data(self):
         """加载场景数据"""
         if self.nusc is None or self.scene_token is None:
@@ -360,13 +577,106 @@ class MCTrackVisualizer:
             self.timeline_slider.set_limits(0, self.settings.total_frames - 1)
             self.timeline_slider.int_value = 0
             
+        # 新场景使用新的帧组装器 (点云缓存按场景划分)
+        if self.assembler is not None:
+            self.assembler.shutdown()
+        self.assembler = FrameAssembler(
+            self.sample_tokens, nuscenes_sweep_lookup(self.nusc),
+            palette=self.settings.color_palette)
+        self._map_pose = None
+        self.map_layer.set_map(nuscenes_map_path(self.nusc, self.scene_token))
+        self._build_track_index()
+            
+    def _build_track_index(self):
+        """为当前场景构建列式跟踪结果和按轨迹索引"""
+        if self.tracking_data is None or not self.sample_tokens:
+            self.tracks = None
+            if self.assembler is not None:
+                self.assembler.set_tracks(None)
+            self.track_table.set_tracks(None)
+            return
+        timestamps = None
+        if self.nusc is not None:
+            timestamps = np.array([
+                self.nusc.get('sample', token)['timestamp']
+                for token in self.sample_tokens]) * 1e-6
+        self.tracks = TrackingResults.from_dict(
+            self.tracking_data, self.sample_tokens, timestamps)
+        if self.assembler is not None:
+            self.assembler.set_tracks(self.tracks, self.tracking_key)
+        self.track_table.set_tracks(self.tracks)
+        self._start_timeline_thumbnails()
+        
+    def _start_timeline_thumbnails(self):
+        """在后台为当前场景的所有帧渲染BEV缩略图"""
+        if self.assembler is None:
+            return
+        self.thumbnail_strip.start(
+            self.assembler.num_frames, self._bev_thumbnail_jobs(self.assembler))
+        
+    def _bev_thumbnail_jobs(self, assembler: FrameAssembler):
+        """生成缩略图任务 (在后台线程中迭代)"""
+        for frame_idx in range(assembler.num_frames):
+            boxes = assembler.assemble_boxes(frame_idx)
+            yield (frame_idx, assembler.sweep_info(frame_idx).path,
+                   boxes.box_corners, boxes.box_colors)
+            
     # === 播放控制相关方法 ===
     def _on_timeline_changed(self, value):
-        """时间轴滑块改变"""
+        """时间轴滑块改变 (拖动时每个中间值都会触发)"""
         frame_id = int(value)
         if frame_id != self.settings.current_frame:
             self.settings.current_frame = frame_id
-            self._show_frame(frame_id)
+            self._request_frame(frame_id)
+            
+    def _request_frame(self, frame_id: int):
+        """合并帧请求: 只渲染最新的目标帧
+        
+        预览通过 post_to_main_thread 延后执行，期间到达的事件只更新目标帧；
+        停止拖动 drag_settle_time 秒后再渲染完整帧。
+        """
+        self._pending_frame = frame_id
+        if not self._preview_scheduled:
+            self._preview_scheduled = True
+            gui.Application.instance.post_to_main_thread(
+                self.window, self._render_preview)
+        self._settle_deadline = time.time() + self.settings.drag_settle_time
+        self._start_settle_wait()
+            
+    def _start_settle_wait(self):
+        """启动等待拖动停止的后台线程 (已在等待时不重复启动)"""
+        if not self._settle_waiting:
+            self._settle_waiting = True
+            threading.Thread(target=self._wait_for_settle, daemon=True).start()
+            
+    def _wait_for_settle(self):
+        """后台线程: 等待拖动停止"""
+        while True:
+            remaining = self._settle_deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(remaining)
+        self._settle_waiting = False
+        gui.Application.instance.post_to_main_thread(
+            self.window, self._render_settled)
+            
+    def _render_preview(self):
+        """主线程: 渲染最新目标帧的低成本预览"""
+        self._preview_scheduled = False
+        if self._pending_frame is not None:
+            self._show_frame(self._pending_frame, preview=True)
+            
+    def _render_settled(self):
+        """主线程: 拖动结束，渲染完整帧"""
+        if self._pending_frame is None:
+            return  # 已由其他请求渲染
+        if time.time() < self._settle_deadline:
+            # 仍在拖动: 等待线程可能在截止时间延长前已退出，重新等待
+            self._start_settle_wait()
+            return
+        frame_id = self._pending_frame
+        self._pending_frame = None
+        self._show_frame(frame_id)
             
     def _on_play_pause(self):
         """播放/暂停按钮"""
@@ -391,6 +701,13 @@ class MCTrackVisualizer:
             self.timeline_slider.int_value = self.settings.current_frame
             self._show_frame(self.settings.current_frame)
             
+    def _jump_to_frame(self, frame_id: int):
+        """跳转到指定帧 (轨迹列表)"""
+        if 0 <= frame_id < self.settings.total_frames:
+            self.settings.current_frame = frame_id
+            self.timeline_slider.int_value = frame_id
+            self._show_frame(frame_id)
+            
     def _on_speed_changed(self, value):
         """播放速度改变"""
         self.settings.play_speed = value
@@ -439,6 +756,69 @@ class MCTrackVisualizer:
         self.settings.show_trajectories = checked
         self._update_display()
         
+    def _on_show_cam_changed(self, checked):
+        """显示相机面板开关"""
+        self.settings.show_camera_panel = checked
+        self.window.set_needs_layout()
+        self._update_display()
+        
+    def _on_show_labels_changed(self, checked):
+        """显示跟踪ID开关"""
+        self.settings.show_track_labels = checked
+        self._update_display()
+        
+    def _on_show_motion_changed(self, checked):
+        """显示运动预测开关"""
+        self.settings.show_motion = checked
+        self._update_display()
+        
+    def _on_box_points_changed(self, checked):
+        """框内点数统计开关"""
+        self.settings.count_box_points = checked
+        self._update_display()
+        
+    def _on_horizon_changed(self, value):
+        """预测时长改变"""
+        self.settings.prediction_horizon = value
+        self._update_display()
+        
+    def _on_bev_mode_changed(self, checked):
+        """BEV模式开关"""
+        self.settings.bev_mode = checked
+        self.window.set_needs_layout()
+        self._update_display()
+        
+    def _on_remove_ground_changed(self, checked):
+        """地面去除开关"""
+        self.settings.remove_ground = checked
+        self._update_display()
+        
+    def _on_color_by_semantics_changed(self, checked):
+        """语义着色开关"""
+        self.settings.color_by_semantics = checked
+        self._update_display()
+        
+    def _on_roi_range_changed(self, value):
+        """ROI范围改变"""
+        self.settings.roi_range = float(value)
+        self._update_display()
+        
+    def _on_show_map_changed(self, checked):
+        """地图显示开关"""
+        self.settings.show_map = checked
+        self.map_layer.set_enabled(checked)
+        self._update_map()
+        
+    def _on_map_radius_changed(self, value):
+        """地图范围改变 (只更新地图层，不重新组装帧)"""
+        self.settings.map_radius = float(value)
+        self._update_map()
+        
+    def _update_map(self):
+        """按当前帧位姿更新地图图块"""
+        if self.settings.show_map and self._map_pose is not None:
+            self.map_layer.update(self._map_pose, self.settings.map_radius)
+        
     def _on_pc_size_changed(self, value):
         """点云大小改变"""
         self.settings.point_size = value
@@ -450,29 +830,72 @@ class MCTrackVisualizer:
         self._update_display()
         
     # === 可视化核心方法 ===
-    def _show_frame(self, frame_id: int):
-        """显示指定帧"""
-        if (self.nusc is None or frame_id >= len(self.sample_tokens) or 
+    def _show_frame(self, frame_id: int, preview: bool = False):
+        """显示指定帧
+        
+        Args:
+            frame_id: 帧序号
+            preview: 拖动时间轴时的低成本预览 (仅跟踪框或BEV缩略图)
+        """
+        if (self.assembler is None or frame_id >= len(self.sample_tokens) or 
             frame_id < 0):
             return
             
+        self.thumbnail_strip.set_current_frame(frame_id)
+        if preview and self._show_preview(frame_id):
+            return
+        self._pending_frame = None  # 完整渲染取代所有未完成的请求
+        if self._bev_preview_active:  # 恢复3D场景布局
+            self._bev_preview_active = False
+            self.window.set_needs_layout()
+            
         # 清除当前几何对象
         self._clear_scene()
         
-        sample_token = self.sample_tokens[frame_id]
-        sample = self.nusc.get('sample', sample_token)
-        
+        try:
+            frame = self.assembler.assemble(frame_id, self.settings)
+        except Exception as e:
+            print(f"Error assembling frame {frame_id}: {str(e)}")
+            self._update_info_text()
+            return
+        self.track_table.update(frame_id, frame.box_tracks,
+                                frame.box_point_counts)
+        self._map_pose = frame.world_to_lidar
+        self._update_map()
+        
+        # BEV模式: 只栅格化为2D图像，不渲染3D场景
+        if self.settings.bev_mode:
+            self.label_pool.hide_all()
+            self._show_bev(frame)
+            if self.settings.show_camera_panel:
+                self._update_camera_panel(frame)
+            self._update_info_text()
+            return
+            
         # 显示点云
         if self.settings.show_point_cloud:
-            self._show_point_cloud(sample)
+            self._show_point_cloud(frame)
             
-        # 显示跟踪结果
-        if self.settings.show_tracking_boxes and self.tracking_data is not None:
-            self._show_tracking_boxes(sample_token, frame_id)
+        # 显示跟踪框 (所有框合并为一个LineSet)
+        self._add_lineset("boxes", frame.box_lines, self.settings.box_line_width)
             
         # 显示轨迹
-        if self.settings.show_trajectories and self.tracking_data is not None:
-            self._show_trajectories(frame_id)
+        self._add_lineset("trajectories", frame.trajectories, 1.5)
+            
+        # 显示速度箭头和运动预测 (合并为一个LineSet)
+        self._add_lineset("motion", frame.motion, 1.5)
+            
+        # 更新跟踪ID标签 (复用标签池)
+        if self.settings.show_track_labels and frame.num_boxes > 0:
+            self.label_pool.update(frame.label_positions,
+                                   [str(track_id) for track_id in frame.track_ids],
+                                   frame.box_colors)
+        else:
+            self.label_pool.hide_all()
+            
+        # 更新相机面板 (后台线程解码和投影)
+        if self.settings.show_camera_panel:
+            self._update_camera_panel(frame)
             
         # 更新相机视角（仅第一次）
         if frame_id == 0:
@@ -480,204 +903,78 @@ class MCTrackVisualizer:
             
         self._update_info_text()
         
-    def _show_point_cloud(self, sample):
-        """显示点云"""
-        try:
-            lidar_token = sample['data']['LIDAR_TOP']
-            lidar_data = self.nusc.get('sample_data', lidar_token)
-            
-            # 加载点云文件
-            pc_path = os.path.join(self.nusc.dataroot, lidar_data['filename'])
-            if os.path.exists(pc_path):
-                # nuScenes点云格式为.pcd.bin (32-bit float, x,y,z,intensity,ring)
-                if pc_path.endswith('.pcd.bin'):
-                    points_data = np.fromfile(pc_path, dtype=np.float32).reshape(-1, 5)
-                    points = points_data[:, :3]  # 只取x,y,z坐标
-                    
-                    # 可选：使用intensity作为颜色
-                    if points_data.shape[1] >= 4:
-                        intensities = points_data[:, 3]
-                        # 归一化intensity到0-1范围
-                        intensities_norm = (intensities - intensities.min()) / (intensities.max() - intensities.min() + 1e-8)
-                        # 创建基于intensity的颜色
-                        colors = np.zeros((len(points), 3))
-                        colors[:, 0] = intensities_norm  # 红色通道
-                        colors[:, 1] = intensities_norm * 0.5  # 绿色通道
-                        colors[:, 2] = intensities_norm * 0.3  # 蓝色通道
-                    else:
-                        # 使用默认颜色
-                        colors = np.tile(self.settings.point_cloud_color, (len(points), 1))
-                else:
-                    pcd = o3d.io.read_point_cloud(pc_path)
-                    points = np.asarray(pcd.points)
-                    colors = np.tile(self.settings.point_cloud_color, (len(points), 1))
-                    
-                # 创建点云对象
-                pcd = o3d.geometry.PointCloud()
-                pcd.points = o3d.utility.Vector3dVector(points)
-                pcd.colors = o3d.utility.Vector3dVector(colors)
-                
-                # 创建材质
-                material = rendering.MaterialRecord()
-                material.point_size = self.settings.point_size
-                material.shader = "unlitPoints"
-                
-                # 添加到场景
-                self.scene_widget.scene.add_geometry("point_cloud", pcd, material)
-                self.current_geometries["point_cloud"] = True
-                print(f"Loaded point cloud: {len(points)} points from {pc_path}")
-            else:
-                print(f"Point cloud file not found: {pc_path}")
-                
-        except Exception as e:
-            print(f"Error loading point cloud: {str(e)}")
-            # 创建一个简单的测试点云
-            test_points = np.random.rand(1000, 3) * 50 - 25  # -25到25的随机点
-            pcd = o3d.geometry.PointCloud()
-            pcd.points = o3d.utility.Vector3dVector(test_points)
-            pcd.colors = o3d.utility.Vector3dVector(np.tile([0.7, 0.7, 0.7], (len(test_points), 1)))
-            
-            material = rendering.MaterialRecord()
-            material.point_size = self.settings.point_size
-            material.shader = "unlitPoints"
-            
-            self.scene_widget.scene.add_geometry("point_cloud", pcd, material)
-            self.current_geometries["point_cloud"] = True
-            print("Loaded test point cloud due to error")
-            
-    def _show_tracking_boxes(self, sample_token: str, frame_id: int):
-        """显示跟踪框"""
-        if sample_token not in self.tracking_data:
-            return
+    def _show_preview(self, frame_id: int) -> bool:
+        """拖动预览，返回是否已显示预览"""
+        if not self.settings.bev_mode and self.settings.drag_preview == 'thumbnail':
+            thumbnail = self.thumbnail_strip.thumbnail(frame_id)
+            if thumbnail is not None:
+                self.bev_widget.update_image(o3d.geometry.Image(thumbnail))
+                if not self._bev_preview_active:
+                    self._bev_preview_active = True
+                    self.window.set_needs_layout()
+                self._update_info_text()
+                return True
+        if self.settings.bev_mode:
+            return False  # BEV模式本身开销较低，直接渲染完整帧
             
-        boxes_data = self.tracking_data[sample_token]
+        # 仅跟踪框: 不加载点云，不更新轨迹、标签和相机面板
+        self._clear_scene()
+        self.label_pool.hide_all()
+        if self.settings.show_tracking_boxes:
+            frame = self.assembler.assemble_boxes(frame_id)
+            self._add_lineset("boxes", frame.box_lines,
+                              self.settings.box_line_width)
+        self._update_info_text()
+        return True
         
-        for i, box_data in enumerate(boxes_data):
-            track_id = box_data.get('tracking_id', i)
-            
-            # 获取3D框参数
-            translation = box_data['translation']
-            size = box_data['size'] 
-            rotation = box_data['rotation']
-            
-            # 创建3D边界框
-            bbox = self._create_bbox_lineset(translation, size, rotation)
-            
-            # 设置颜色（基于track_id）
-            color_idx = track_id % len(self.settings.color_palette)
-            color = self.settings.color_palette[color_idx]
-            bbox.paint_uniform_color(color)
-            
-            # 添加到场景
-            bbox_name = f"bbox_{track_id}_{i}"
-            material = rendering.MaterialRecord()
-            material.line_width = self.settings.box_line_width
-            material.shader = "unlitLine"
-            
-            self.scene_widget.scene.add_geometry(bbox_name, bbox, material)
-            self.current_geometries[bbox_name] = True
-            
-    def _show_trajectories(self, current_frame: int):
-        """显示轨迹"""
-        if current_frame == 0:
+    def _show_point_cloud(self, frame):
+        """显示点云 (激光雷达坐标系)"""
+        if len(frame.points) == 0:
+            print(f"Point cloud not available for frame {frame.frame_idx}")
             return
-            
-        # 收集轨迹数据
-        trajectories = {}  # track_id -> [(x, y, z), ...]
+        pcd = o3d.geometry.PointCloud()
+        pcd.points = o3d.utility.Vector3dVector(frame.points)
+        pcd.colors = o3d.utility.Vector3dVector(frame.point_colors)
         
-        start_frame = max(0, current_frame - self.settings.trajectory_length)
+        material = rendering.MaterialRecord()
+        material.point_size = self.settings.point_size
+        material.shader = "unlitPoints"
         
-        for frame_idx in range(start_frame, current_frame + 1):
-            if frame_idx >= len(self.sample_tokens):
-                continue
-                
-            sample_token = self.sample_tokens[frame_idx]
-            if sample_token not in self.tracking_data:
-                continue
-                
-            boxes_data = self.tracking_data[sample_token]
-            
-            for box_data in boxes_data:
-                track_id = box_data.get('tracking_id', -1)
-                if track_id == -1:
-                    continue
-                    
-                translation = box_data['translation']
-                
-                if track_id not in trajectories:
-                    trajectories[track_id] = []
-                trajectories[track_id].append(translation)
-                
-        # 创建轨迹线条
-        for track_id, points in trajectories.items():
-            if len(points) < 2:
-                continue
-                
-            # 创建线段
-            line_set = o3d.geometry.LineSet()
-            line_set.points = o3d.utility.Vector3dVector(points)
-            
-            # 创建线段连接
-            lines = []
-            for i in range(len(points) - 1):
-                lines.append([i, i + 1])
-            line_set.lines = o3d.utility.Vector2iVector(lines)
-            
-            # 设置颜色（渐变透明度效果）
-            color_idx = track_id % len(self.settings.color_palette)
-            base_color = self.settings.color_palette[color_idx]
-            
-            colors = []
-            for i in range(len(lines)):
-                alpha = (i + 1) / len(lines)  # 越新的轨迹越明亮
-                color = [c * alpha for c in base_color]
-                colors.append(color)
-            line_set.colors = o3d.utility.Vector3dVector(colors)
-            
-            # 添加到场景
-            traj_name = f"trajectory_{track_id}"
-            material = rendering.MaterialRecord()
-            material.line_width = 1.5
-            material.shader = "unlitLine"
-            
-            self.scene_widget.scene.add_geometry(traj_name, line_set, material)
-            self.current_geometries[traj_name] = True
-            
-    def _create_bbox_lineset(self, translation, size, rotation) -> o3d.geometry.LineSet:
-        """创建3D边界框线条"""
-        # 创建标准3D框
-        l, w, h = size
-        
-        # 8个顶点
-        vertices = np.array([
-            [-l/2, -w/2, -h/2], [l/2, -w/2, -h/2], [l/2, w/2, -h/2], [-l/2, w/2, -h/2],  # 底面
-            [-l/2, -w/2, h/2],  [l/2, -w/2, h/2],  [l/2, w/2, h/2],  [-l/2, w/2, h/2]    # 顶面
-        ])
-        
-        # 应用旋转
-        from scipy.spatial.transform import Rotation as R
-        if len(rotation) == 4:  # 四元数
-            r = R.from_quat(rotation)
-        else:  # 欧拉角
-            r = R.from_euler('xyz', rotation)
-        vertices = r.apply(vertices)
-        
-        # 应用平移
-        vertices += np.array(translation)
-        
-        # 创建边线连接
-        lines = [
-            [0, 1], [1, 2], [2, 3], [3, 0],  # 底面
-            [4, 5], [5, 6], [6, 7], [7, 4],  # 顶面
-            [0, 4], [1, 5], [2, 6], [3, 7]   # 垂直边
-        ]
+        self.scene_widget.scene.add_geometry("point_cloud", pcd, material)
+        self.current_geometries["point_cloud"] = True
         
+    def _add_lineset(self, name: str, arrays, line_width: float):
+        """将 (points, lines, colors) 数组作为一个LineSet添加到场景"""
+        points, lines, colors = arrays
+        if len(lines) == 0:
+            return
         line_set = o3d.geometry.LineSet()
-        line_set.points = o3d.utility.Vector3dVector(vertices)
+        line_set.points = o3d.utility.Vector3dVector(points)
         line_set.lines = o3d.utility.Vector2iVector(lines)
-        
-        return line_set
-        
+        line_set.colors = o3d.utility.Vector3dVector(colors)
+        
+        material = rendering.MaterialRecord()
+        material.line_width = line_width
+        material.shader = "unlitLine"
+        
+        self.scene_widget.scene.add_geometry(name, line_set, material)
+        self.current_geometries[name] = True
+        
+    def _show_bev(self, frame):
+        """BEV模式: 点云最大池化 + 跟踪框轮廓"""
+        image = render_bev(frame.sweep, frame.box_corners, frame.box_colors,
+                           self.settings.bev_extent,
+                           self.settings.bev_image_size,
+                           self.settings.bev_color_mode)
+        self.bev_widget.update_image(o3d.geometry.Image(image))
+        
+    def _update_camera_panel(self, frame):
+        """将当前帧的跟踪框 (全局坐标系) 提交给相机面板"""
+        sample = self.nusc.get('sample', frame.sample_token)
+        self.camera_panel.update(self.nusc, sample, frame.box_translation,
+                                 frame.box_size, frame.box_rotation,
+                                 frame.box_colors)
+            
     def _clear_scene(self):
         """清除场景中的几何对象"""
         for name in self.current_geometries.keys():
@@ -764,15 +1061,29 @@ def main():
                        help="窗口宽度")
     parser.add_argument("--height", type=int, default=1080,
                        help="窗口高度")
+    parser.add_argument("--index-stats", action="store_true",
+                       help="并行计算所有场景的统计并写入统计文件后退出 (不启动GUI)")
+    parser.add_argument("--stats-file", type=str, default=None,
+                       help="场景统计文件路径，默认在跟踪结果文件旁")
+    parser.add_argument("--nuscenes-version", type=str, default=None,
+                       help="nuScenes版本，默认依次尝试 v1.0-trainval 和 v1.0-mini")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="--index-stats 的进程数，默认为CPU核数")
     
     args = parser.parse_args()
     
+    if args.index_stats:
+        index_stats(args.tracking_results, args.nuscenes_path,
+                    args.nuscenes_version, args.stats_file, args.workers)
+        return
+    
     # 创建并运行可视化工具
     visualizer = MCTrackVisualizer(args.width, args.height)
     
     # 设置默认路径
     visualizer.nuscenes_path_text.text_value = args.nuscenes_path
     visualizer.tracking_path_text.text_value = args.tracking_results
+    visualizer.stats_path = args.stats_file
     
     print("MCTrack Visualizer 启动")
     print("="*50)
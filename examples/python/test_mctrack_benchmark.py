@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+MCTrack性能测试 (pytest-benchmark)
+在合成的大规模场景上测量JSON加载、列式转换、框顶点计算、轨迹构建、点云预处理、
+框内点数统计、帧组装和缓存命中路径的耗时。
+
+用法:
+    python test_mctrack_benchmark.py            # 结果保存到 benchmark_results/
+    pytest test_mctrack_benchmark.py --benchmark-json=out.json
+
+场景规模可通过环境变量调整: MCTRACK_BENCH_FRAMES (默认200)、
+MCTRACK_BENCH_TRACKS (默认1000，同时存在的轨迹数)。保存的JSON可用
+pytest-benchmark compare 命令在不同提交之间比较。
+"""
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from mctrack_bev import render_bev
+from mctrack_data import TrackingResults
+from mctrack_frames import FrameAssembler, FrameSettings, SweepInfo
+from mctrack_geometry import (box_corners, count_points_in_boxes,
+                              quaternion_to_matrix)
+from mctrack_motion import build_motion_lineset, build_trajectory_lineset
+from mctrack_preprocess import preprocess_mask
+from mctrack_synthetic import (generate_synthetic_tracks, tracks_to_results,
+                               write_synthetic_sweeps)
+
+NUM_FRAMES = int(os.environ.get("MCTRACK_BENCH_FRAMES", 200))
+NUM_TRACKS = int(os.environ.get("MCTRACK_BENCH_TRACKS", 1000))
+TRAJECTORY_LENGTH = 10
+PALETTE = np.random.default_rng(0).uniform(0.2, 1.0, (50, 3))
+
+
+@pytest.fixture(scope="module")
+def synthetic_tracks():
+    return generate_synthetic_tracks(NUM_FRAMES, NUM_TRACKS,
+                                     mean_lifetime=max(1, NUM_FRAMES // 4))
+
+
+@pytest.fixture(scope="module")
+def results_dict(synthetic_tracks):
+    return tracks_to_results(synthetic_tracks)
+
+
+@pytest.fixture(scope="module")
+def results_path(results_dict, tmp_path_factory):
+    path = tmp_path_factory.mktemp("mctrack") / "results.json"
+    with open(path, "w") as f:
+        json.dump({"results": results_dict}, f)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def sweep_paths(synthetic_tracks, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("sweeps")
+    return write_synthetic_sweeps(str(directory), synthetic_tracks)
+
+
+@pytest.fixture(scope="module")
+def tracks(results_dict):
+    return TrackingResults.from_dict(results_dict)
+
+
+@pytest.fixture(scope="module")
+def track_colors(tracks):
+    return PALETTE[np.arange(tracks.num_tracks) % len(PALETTE)]
+
+
+@pytest.fixture(scope="module")
+def sweep_lookup(synthetic_tracks, sweep_paths):
+    paths = dict(zip(synthetic_tracks["sample_tokens"], sweep_paths))
+    return lambda token: SweepInfo(paths[token], np.eye(4))
+
+
+@pytest.fixture
+def assembler(synthetic_tracks, sweep_lookup, tracks):
+    assembler = FrameAssembler(synthetic_tracks["sample_tokens"], sweep_lookup,
+                               tracks, palette=PALETTE, prefetch=0)
+    yield assembler
+    assembler.shutdown()
+
+
+def test_json_load(benchmark, results_path):
+    def load():
+        with open(results_path) as f:
+            return json.load(f)
+
+    data = benchmark.pedantic(load, rounds=3)
+    assert len(data["results"]) == NUM_FRAMES
+
+
+def test_columnar_conversion(benchmark, results_dict):
+    tracks = benchmark.pedantic(TrackingResults.from_dict, args=(results_dict,),
+                                rounds=3)
+    assert tracks.num_frames == NUM_FRAMES
+    assert isinstance(tracks.track_ids[0], str)
+
+
+def test_box_corners_frame(benchmark, tracks):
+    rows = tracks.frame_slice(NUM_FRAMES // 2)
+    corners = benchmark(box_corners, tracks.translation[rows],
+                        tracks.size[rows], tracks.rotation[rows])
+    assert corners.shape == (rows.stop - rows.start, 8, 3)
+
+
+def test_box_corners_all(benchmark, tracks):
+    corners = benchmark(box_corners, tracks.translation, tracks.size,
+                        tracks.rotation)
+    assert len(corners) == len(tracks)
+
+
+def test_trajectory_building(benchmark, tracks, track_colors):
+    points, lines, colors = benchmark(build_trajectory_lineset, tracks,
+                                      NUM_FRAMES // 2, TRAJECTORY_LENGTH,
+                                      track_colors)
+    assert len(lines) > 0 and len(colors) == len(lines)
+
+
+def test_motion_building(benchmark, tracks, track_colors):
+    rows = tracks.frame_slice(NUM_FRAMES // 2)
+    points, lines, colors = benchmark(build_motion_lineset, tracks,
+                                      NUM_FRAMES // 2,
+                                      track_colors[tracks.track[rows]])
+    assert len(lines) > 0
+
+
+def test_point_counts(benchmark, assembler, tracks):
+    rows = tracks.frame_slice(NUM_FRAMES // 2)
+    raw = assembler.load_sweep(NUM_FRAMES // 2)
+    counts = benchmark(count_points_in_boxes, raw.data, tracks.translation[rows],
+                       tracks.size[rows],
+                       quaternion_to_matrix(tracks.rotation[rows]))
+    assert len(counts) == rows.stop - rows.start and counts.sum() > 0
+
+
+def test_frame_assembly(benchmark, assembler):
+    # 轮流组装不同帧，帧缓存和点云缓存都不会命中
+    frames = itertools.cycle(range(NUM_FRAMES))
+    frame = benchmark(lambda: assembler.assemble(next(frames), prefetch=False))
+    assert frame.points.shape[1] == 3 and frame.num_boxes > 0
+
+
+def test_bev_render(benchmark, assembler):
+    frame = assembler.assemble(NUM_FRAMES // 2)
+    image = benchmark(render_bev, frame.sweep, frame.box_corners,
+                      frame.box_colors)
+    assert image.shape == (512, 512, 3)
+
+
+@pytest.mark.parametrize("method", ["grid", "ransac"])
+def test_ground_removal(benchmark, assembler, method):
+    settings = FrameSettings()
+    settings.roi_range = 60.0
+    settings.remove_ground = True
+    settings.ground_method = method
+    raw = assembler.load_sweep(NUM_FRAMES // 2)
+    keep, _ = benchmark(preprocess_mask, raw.data, settings)
+    assert 0 < keep.sum() < len(raw.data)
+
+
+def test_frame_cache_hit(benchmark, assembler):
+    assembler.assemble(0)
+    frame = benchmark(assembler.assemble, 0)
+    assert frame.frame_idx == 0
+    assert assembler.frames.hits > 0
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "benchmark_results")
+    os.makedirs(output_dir, exist_ok=True)
+    output = os.path.join(output_dir, f"mctrack_{_git_revision()}.json")
+    sys.exit(pytest.main([__file__, "-q", f"--benchmark-json={output}"] +
+                         sys.argv[1:]))
@@ -176,6 +176,464 @@ def test_visualization():
         return False
 
 
+def test_box_projection():
+    """测试跟踪框顶点计算和相机投影"""
+    from mctrack_geometry import box_corners, project_boxes
+
+    # nuScenes尺寸 [宽, 长, 高]，无旋转时长度沿x轴
+    corners = box_corners([[10, 0, 0]], [[2, 4, 1]], [[1, 0, 0, 0]])
+    assert np.allclose(corners[0].min(axis=0), [8, -1, -0.5])
+    assert np.allclose(corners[0].max(axis=0), [12, 1, 0.5])
+
+    # 相机朝向+x: 前方的框可见，后方的框不可见
+    world_to_camera = np.eye(4)
+    world_to_camera[:3, :3] = [[0, -1, 0], [0, 0, -1], [1, 0, 0]]
+    intrinsic = np.array([[100, 0, 160], [0, 100, 90], [0, 0, 1]])
+    corners = box_corners([[10, 0, 0], [-10, 0, 0]], [[2, 4, 1]] * 2,
+                          [[1, 0, 0, 0]] * 2)
+    pixels, visible = project_boxes(corners, world_to_camera, intrinsic,
+                                    (320, 180))
+    assert visible.tolist() == [True, False]
+    assert np.allclose(pixels[0].mean(axis=0), [160, 90])
+
+
+def test_motion_prediction():
+    """测试列式跟踪结果的按轨迹索引和运动预测"""
+    from mctrack_data import TrackingResults
+    from mctrack_motion import build_motion_lineset, future_positions
+
+    tracks = TrackingResults.from_dict(
+        create_mock_tracking_data(10, 5)["results"])
+    assert tracks.num_frames == 10 and tracks.num_tracks == 5
+    assert tracks.track_offsets.tolist() == [0, 10, 20, 30, 40, 50]
+
+    # 实际未来位置即同一轨迹的下一个观测
+    rows = np.arange(*tracks.frame_offsets[3:5])
+    future, valid = future_positions(tracks, rows, horizon=1.0)
+    assert valid.all()
+    assert np.allclose(future[:, 0], tracks.translation[rows + 5])
+
+    # 最后一帧没有实际未来位置，只有箭头和预测
+    points, lines, colors = build_motion_lineset(tracks, 9,
+                                                 np.full((5, 3), 0.5))
+    assert len(points) == 2 * len(lines) == 2 * len(colors)
+    assert len(lines) == 5 * 3 + 5 * 6
+
+
+def test_synthetic_trajectories():
+    """测试合成数据 (字符串跟踪ID) 的轨迹线段构建"""
+    from mctrack_data import TrackingResults
+    from mctrack_motion import build_trajectory_lineset
+    from mctrack_synthetic import generate_synthetic_tracks, tracks_to_results
+
+    synthetic = generate_synthetic_tracks(num_frames=30, num_tracks=20,
+                                          mean_lifetime=10, seed=1)
+    tracks = TrackingResults.from_dict(tracks_to_results(synthetic))
+    assert all(isinstance(track_id, str) for track_id in tracks.track_ids)
+
+    # 每条线段连接同一轨迹在窗口内的相邻两帧
+    points, lines, colors = build_trajectory_lineset(
+        tracks, 20, 5, np.ones((tracks.num_tracks, 3)))
+    rows = np.arange(tracks.frame_offsets[16], tracks.frame_offsets[21])
+    assert len(lines) == (tracks.neighbor_rows(rows, -1) >= 0).sum()
+    assert len(points) == 2 * len(lines)
+    assert np.all(colors <= 1.0) and np.all(colors > 0.0)
+
+
+def test_frame_assembler():
+    """测试与GUI无关的帧组装: 坐标系、合并线段、缓存和预取"""
+    import tempfile
+    from mctrack_data import TrackingResults
+    from mctrack_frames import (PREPROCESS_SETTING_KEYS, FrameAssembler,
+                                FrameSettings, SweepInfo, settings_key)
+    from mctrack_synthetic import (generate_synthetic_tracks, tracks_to_results,
+                                   write_synthetic_sweeps)
+
+    synthetic = generate_synthetic_tracks(num_frames=6, num_tracks=10,
+                                          mean_lifetime=6, seed=2)
+    tracks = TrackingResults.from_dict(tracks_to_results(synthetic))
+    world_to_lidar = np.eye(4)
+    world_to_lidar[:3, 3] = [-5.0, 3.0, 0.0]
+    with tempfile.TemporaryDirectory() as directory:
+        paths = dict(zip(synthetic['sample_tokens'],
+                         write_synthetic_sweeps(directory, synthetic,
+                                                num_ground_points=100)))
+        assembler = FrameAssembler(
+            synthetic['sample_tokens'],
+            lambda token: SweepInfo(paths[token], world_to_lidar), tracks,
+            palette=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        try:
+            frame = assembler.assemble(2)
+            rows = tracks.frame_slice(2)
+            num_boxes = rows.stop - rows.start
+            assert frame.num_boxes == num_boxes
+            assert isinstance(frame.track_ids[0], str)
+            # 框变换到雷达坐标系，中心与全局坐标相差平移量
+            assert np.allclose(frame.box_corners.mean(axis=1),
+                               tracks.translation[rows] + [-5.0, 3.0, 0.0])
+            points, lines, colors = frame.box_lines
+            assert points.shape == (8 * num_boxes, 3)
+            assert lines.shape == (12 * num_boxes, 2) and lines.max() < len(points)
+            assert len(colors) == len(lines)
+            assert frame.points.shape[1] == 3 and frame.attributes.shape[1] == 2
+
+            # 相同设置命中帧缓存，改变设置重新组装
+            assert assembler.assemble(2) is frame
+            settings = FrameSettings()
+            settings.show_motion = False
+            other = assembler.assemble(2, settings)
+            assert other is not frame and len(other.motion[1]) == 0
+            # 点云解码结果在两种设置之间共享；预取的相邻帧可直接读取
+            assert other.sweep is frame.sweep
+            assert assembler.load_sweep(3) is assembler.sweeps.get(3)
+
+            # 地面去除: 预处理结果单独缓存，不影响解码结果
+            settings.remove_ground = True
+            cropped = assembler.assemble(2, settings)
+            assert 0 < len(cropped.points) < len(frame.points)
+            assert len(assembler.processed) > 0
+            assert len(assembler.load_sweep(2).data) == len(frame.points)
+            # 已解码的相邻帧在新设置下也在后台预处理
+            with assembler._lock:
+                pending = list(assembler._loading.values())
+            for future in pending:
+                future.result()
+            assert ((3, settings_key(settings, PREPROCESS_SETTING_KEYS))
+                    in assembler.processed)
+        finally:
+            assembler.shutdown()
+
+
+def test_track_colors():
+    """测试轨迹配色: 颜色只取决于跟踪ID，与结果中的顺序和ID的类型无关"""
+    from mctrack_data import TrackingResults
+    from mctrack_frames import FrameAssembler
+    from mctrack_palette import make_palette, track_colors, track_id_hashes
+
+    palette = make_palette()
+    assert palette.shape == (256, 3)
+    assert palette.min() >= 0.0 and palette.max() <= 1.0
+    assert len(np.unique(palette.round(3), axis=0)) == len(palette)
+
+    colors = track_colors(['7', 'abc', 7], palette)
+    assert np.array_equal(colors[0], colors[2])
+    assert np.array_equal(track_colors(['abc'], palette)[0], colors[1])
+    # 负数ID与其字符串相同；非ASCII数字 (如 '²') 和 '--5' 按字符串哈希
+    assert track_id_hashes([-5])[0] == track_id_hashes(['-5'])[0]
+    assert len(track_colors(['²', '--5', '-'], palette)) == 3
+    # 连续ID的哈希均匀分布 (不像取模那样每隔 len(palette) 个重复)
+    index = track_id_hashes([str(i) for i in range(256)]) % np.uint64(256)
+    assert len(np.unique(index)) > 256 * 0.55
+
+    box = {'translation': [0, 0, 0], 'size': [1, 1, 1], 'rotation': [1, 0, 0, 0]}
+    first = {'a': [dict(box, tracking_id='12'), dict(box, tracking_id='car_3')]}
+    second = {'a': [dict(box, tracking_id='car_3'), dict(box, tracking_id='x'),
+                    dict(box, tracking_id='12')]}
+    frames = []
+    for results in (first, second):
+        assembler = FrameAssembler(['a'], tracks=TrackingResults.from_dict(results),
+                                   prefetch=0)
+        frames.append(assembler.assemble_boxes(0))
+        assembler.shutdown()
+    colors = [dict(zip(frame.track_ids, frame.box_colors)) for frame in frames]
+    for track_id in ('12', 'car_3'):
+        assert np.array_equal(colors[0][track_id], colors[1][track_id])
+
+
+def test_ground_removal():
+    """测试ROI裁剪、网格地面分割和RANSAC地面平面"""
+    from mctrack_preprocess import (crop_roi_mask, fit_ground_plane,
+                                    grid_ground_mask, plane_ground_mask)
+
+    rng = np.random.default_rng(0)
+    ground = np.column_stack([rng.uniform(-30, 30, (2000, 2)),
+                              -1.8 + 0.02 * rng.standard_normal(2000)])
+    # 一个立方体障碍物 (x, y在[10, 12]，高度-1.8 ~ 0)
+    obstacle = np.column_stack([rng.uniform(10, 12, (200, 2)),
+                                rng.uniform(-1.2, 0.0, 200)])
+    points = np.concatenate([ground, obstacle])
+
+    ground_mask = grid_ground_mask(points, cell_size=1.0, height_threshold=0.25)
+    assert ground_mask[:2000].all() and not ground_mask[2000:].any()
+
+    plane = fit_ground_plane(points, threshold=0.2)
+    assert np.allclose(plane[:3], [0, 0, 1], atol=1e-2)
+    assert np.isclose(plane[3], 1.8, atol=0.05)
+    assert plane_ground_mask(points, plane, 0.2)[:2000].mean() > 0.99
+
+    keep = crop_roi_mask(points, max_range=20.0)
+    assert np.all(np.hypot(points[keep, 0], points[keep, 1]) <= 20.0)
+    assert keep[2000:].all()
+
+
+def test_point_counts():
+    """测试框内点数统计 (与暴力计算比较) 和按结果文件的缓存"""
+    import tempfile
+    from mctrack_data import TrackingResults
+    from mctrack_frames import FrameAssembler, SweepInfo
+    from mctrack_geometry import count_points_in_boxes, quaternion_to_matrix
+    from mctrack_synthetic import (generate_synthetic_sweep,
+                                   generate_synthetic_tracks, tracks_to_results,
+                                   write_synthetic_sweeps)
+
+    synthetic = generate_synthetic_tracks(num_frames=4, num_tracks=60,
+                                          mean_lifetime=4, extent=20, seed=3)
+    rows = synthetic['frame'] == 1
+    translation = synthetic['translation'][rows]
+    size = synthetic['size'][rows]
+    quaternions = synthetic['rotation'][rows]
+    rotation = quaternion_to_matrix(quaternions)
+    points = generate_synthetic_sweep(translation, size, quaternions,
+                                      num_ground_points=5000,
+                                      rng=np.random.default_rng(0))
+    local = np.einsum('mji,mnj->mni', rotation,
+                      points[None, :, :3] - translation[:, None])
+    expected = np.all(np.abs(local) <= 0.5 * size[:, None, [1, 0, 2]],
+                      axis=2).sum(axis=1)
+    counts = count_points_in_boxes(points, translation, size, rotation)
+    assert np.array_equal(counts, expected) and np.all(counts >= 16)
+    empty = count_points_in_boxes(points[:0], translation, size, rotation)
+    assert np.array_equal(empty, np.zeros(len(size)))
+
+    tracks = TrackingResults.from_dict(tracks_to_results(synthetic))
+    with tempfile.TemporaryDirectory() as directory:
+        paths = dict(zip(synthetic['sample_tokens'],
+                         write_synthetic_sweeps(directory, synthetic,
+                                                num_ground_points=100)))
+        assembler = FrameAssembler(
+            synthetic['sample_tokens'],
+            lambda token: SweepInfo(paths[token], np.eye(4)), prefetch=0)
+        try:
+            assembler.set_tracks(tracks, 'results.json')
+            frame = assembler.assemble(1)
+            assert len(frame.box_point_counts) == frame.num_boxes
+            assert np.all(frame.box_point_counts >= 16)
+            # 同一结果文件重新加载时直接使用缓存的点数
+            assembler.set_tracks(tracks, 'results.json')
+            assert assembler.box_point_counts(1) is frame.box_point_counts
+        finally:
+            assembler.shutdown()
+
+
+def test_lidarseg_colors():
+    """测试lidarseg标签的内存映射读取、查表着色和随预处理筛选"""
+    import tempfile
+    from mctrack_frames import FrameAssembler, FrameSettings, SweepInfo
+    from mctrack_lidarseg import color_table
+    from mctrack_synthetic import generate_synthetic_tracks, write_synthetic_sweeps
+
+    synthetic = generate_synthetic_tracks(num_frames=2, num_tracks=5, seed=5)
+    table = color_table({1: [1.0, 0.0, 0.0], 2: [0.0, 2.0, 0.0]})
+    assert np.allclose(table[2], [0, 1, 0]) and np.allclose(table[7], 0.5)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_synthetic_sweeps(directory, synthetic,
+                                       num_ground_points=500)
+        infos = {}
+        for token, path in zip(synthetic['sample_tokens'], paths):
+            num_points = len(np.fromfile(path, dtype=np.float32)) // 5
+            labels_path = path + '.lidarseg.bin'
+            # 地面点为类别1，框内点为类别2
+            labels = np.where(np.arange(num_points) < 500, 1, 2)
+            labels.astype(np.uint8).tofile(labels_path)
+            infos[token] = SweepInfo(path, np.eye(4), labels_path)
+        assembler = FrameAssembler(synthetic['sample_tokens'], infos.get,
+                                   prefetch=0, label_table=table)
+        try:
+            settings = FrameSettings()
+            settings.color_by_semantics = True
+            frame = assembler.assemble(0, settings)
+            assert isinstance(assembler.load_sweep(0).labels, np.memmap)
+            assert np.array_equal(frame.point_colors,
+                                  table[frame.point_labels])
+            settings.remove_ground = True
+            cropped = assembler.assemble(0, settings)
+            assert len(cropped.point_labels) == len(cropped.points)
+            assert np.mean(cropped.point_labels == 2) > 0.9
+        finally:
+            assembler.shutdown()
+
+
+def test_map_tiles():
+    """测试地图多分辨率图块: 图块内容、坐标范围和按位置查询"""
+    import tempfile
+    from mctrack_map import MapTiles, build_map_tiles_from_array
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (1000, 700)).astype(np.uint8)
+    with tempfile.TemporaryDirectory() as directory:
+        build_map_tiles_from_array(image, directory, resolution=0.1,
+                                   tile_size=128, levels=3)
+        tiles = MapTiles(directory)
+        assert tiles.grids == [(8, 6), (4, 3), (2, 2)]
+        assert np.array_equal(tiles.tile(0, 2, 1), image[128:256, 256:384])
+        # 边缘图块补零
+        assert np.all(tiles.tile(0, 5, 7)[1000 - 7 * 128:] == 0)
+        assert tiles.tile(1, 0, 0)[0, 0] == round(image[:2, :2].mean())
+
+        # 全局坐标 (米): 原点在图像左下角，第0行为北侧
+        x, y = 30.0, 100.0 - 20.0  # 第200行，第300列
+        keys = tiles.tiles_around(x, y, 1.0, 0)
+        assert keys == [(0, 2, 1)]
+        x_min, y_min, x_max, y_max = tiles.tile_bounds(*keys[0])
+        assert x_min <= x <= x_max and y_min <= y <= y_max
+        assert tiles.level_for_radius(20.0) == 0
+        assert tiles.level_for_radius(1000.0) == 2
+        assert len(tiles.tiles_around(x, y, 30.0, 1)) == 3 * 2  # 25.6米的图块
+
+
+def test_tensorboard_box_axes():
+    """测试导出到TensorBoard的框参数: 由中心和三个轴重建的顶点与框顶点一致"""
+    from mctrack_geometry import box_corners, transform_points
+    from mctrack_tensorboard import box_axes
+
+    rng = np.random.default_rng(0)
+    translation = rng.uniform(-50, 50, (5, 3))
+    size = rng.uniform(0.5, 5, (5, 3))
+    rotation = rng.normal(size=(5, 4))
+    rotation /= np.linalg.norm(rotation, axis=1, keepdims=True)
+    yaw = 0.7
+    world_to_lidar = np.eye(4)
+    world_to_lidar[:2, :2] = [[np.cos(yaw), -np.sin(yaw)],
+                              [np.sin(yaw), np.cos(yaw)]]
+    world_to_lidar[:3, 3] = [3, -2, 1]
+
+    center, front, up, left, sizes = box_axes(translation, size, rotation,
+                                              world_to_lidar)
+    expected = transform_points(box_corners(translation, size, rotation),
+                                world_to_lidar)
+    signs = np.array([[a, b, c] for a in (-1, 1) for b in (-1, 1)
+                      for c in (-1, 1)], dtype=np.float64)
+    for k in range(len(translation)):
+        axes = np.stack([left[k], up[k], front[k]])  # 与 sizes 的顺序一致
+        corners = center[k] + (signs * 0.5 * sizes[k]) @ axes
+        assert np.allclose(np.sort(corners, axis=0),
+                           np.sort(expected[k], axis=0))
+        assert np.allclose(np.cross(front[k], left[k]), up[k])
+
+
+def test_interval_index():
+    """测试区间索引和存活轨迹查询 (与暴力计算比较)"""
+    from mctrack_data import TrackingResults
+    from mctrack_intervals import IntervalIndex
+    from mctrack_synthetic import generate_synthetic_tracks, tracks_to_results
+
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 100, 300)
+    ends = starts + rng.integers(0, 30, 300)
+    index = IntervalIndex(starts, ends)
+    for x in range(-2, 135):
+        expected = np.flatnonzero((starts <= x) & (ends >= x))
+        assert np.array_equal(index.stab(x), expected)
+        assert index.count(x) == len(expected)
+        expected = np.flatnonzero((starts <= x + 7) & (ends >= x))
+        assert np.array_equal(index.overlapping(x, x + 7), expected)
+    assert len(IntervalIndex([], []).stab(0)) == 0
+
+    synthetic = generate_synthetic_tracks(num_frames=50, num_tracks=40,
+                                          mean_lifetime=10, seed=2)
+    tracks = TrackingResults.from_dict(tracks_to_results(synthetic))
+    for frame_idx in range(tracks.num_frames):
+        alive = tracks.alive_tracks(frame_idx)
+        rows = np.arange(tracks.frame_offsets[frame_idx],
+                         tracks.frame_offsets[frame_idx + 1])
+        # 当前帧有观测的轨迹一定存活
+        assert np.isin(tracks.track[rows], alive).all()
+        assert np.all(tracks.track_first_frame[alive] <= frame_idx)
+        assert np.all(tracks.track_last_frame[alive] >= frame_idx)
+
+
+def test_scene_stats():
+    """测试场景统计: 元数据表索引、进程池与单进程结果一致、排序筛选"""
+    import tempfile
+    from mctrack_data import TrackingResults
+    from mctrack_stats import (compute_dataset_stats, load_scene_stats,
+                               scene_index_from_tables, select_scenes,
+                               write_scene_stats)
+    from mctrack_synthetic import generate_synthetic_tracks, tracks_to_results
+
+    synthetic = generate_synthetic_tracks(num_frames=30, num_tracks=12,
+                                          mean_lifetime=8, seed=4)
+    results = tracks_to_results(synthetic)
+    tokens = synthetic['sample_tokens']
+    with tempfile.TemporaryDirectory() as directory:
+        # 三个场景，每个10帧 (sample表顺序打乱，按 next 链接排序)
+        os.makedirs(os.path.join(directory, 'v1.0-mini'))
+        samples = [{'token': token,
+                    'next': tokens[i + 1] if i % 10 != 9 else ''}
+                   for i, token in enumerate(tokens)]
+        scenes = [{'token': f'scene{i}', 'name': f'scene-{i:04d}',
+                   'description': 'night' if i == 1 else 'day',
+                   'first_sample_token': tokens[10 * i]} for i in range(3)]
+        for table, rows in (('sample', samples[::-1]), ('scene', scenes)):
+            with open(os.path.join(directory, 'v1.0-mini', table + '.json'),
+                      'w') as f:
+                json.dump(rows, f)
+        index = scene_index_from_tables(directory, 'v1.0-mini')
+        assert index[1]['sample_tokens'] == tokens[10:20]
+
+        serial = compute_dataset_stats(results, index, workers=1)
+        assert compute_dataset_stats(results, index, workers=2) == serial
+        for scene, stats in zip(index, serial):
+            tracks = TrackingResults.from_dict(results, scene['sample_tokens'])
+            alive = [len(tracks.alive_tracks(f)) for f in range(10)]
+            assert stats['max_concurrent'] == max(alive)
+            assert stats['num_boxes'] == len(tracks)
+            assert sum(stats['class_boxes'].values()) == len(tracks)
+
+        path = os.path.join(directory, 'scene_stats.json')
+        write_scene_stats(path, serial)
+        loaded = load_scene_stats(path)['scenes']
+        assert loaded == serial
+
+    order = select_scenes(loaded, 'tracks', descending=True)
+    assert [loaded[i]['num_tracks'] for i in order] == sorted(
+        (s['num_tracks'] for s in loaded), reverse=True)
+    assert select_scenes(loaded, text='NIGHT') == [1]
+    assert select_scenes(loaded, min_tracks=10 ** 6) == []
+
+
+def test_bev_rasterization():
+    """测试BEV栅格化的最大池化"""
+    from mctrack_bev import rasterize_points
+
+    points = np.array([[10.2, 0.2, -1.0], [10.4, 0.4, 2.0], [10.6, 0.6, 0.5],
+                       [200.0, 0.0, 0.0]])
+    grid = rasterize_points(points, extent=50.0, image_size=100,
+                            height_range=(-3.0, 3.0))
+    # 前三个点落在同一网格，取最大高度；范围外的点被忽略
+    assert (grid >= 0).sum() == 1
+    assert np.isclose(grid[39, 49], (2.0 + 3.0) / 6.0)
+
+
+def test_label_selection():
+    """测试标签筛选: 剔除相机后方、屏幕外和过远的标签，每个屏幕网格只保留
+    最近的标签，并按距离限制数量"""
+    from mctrack_labels import select_visible_labels
+
+    near, far = 0.1, 1000.0
+    projection = np.array([[1.0, 0, 0, 0], [0, 1.0, 0, 0],
+                           [0, 0, -(far + near) / (far - near),
+                            -2 * far * near / (far - near)],
+                           [0, 0, -1.0, 0]])  # 90度视场，相机看向 -z
+    positions = np.array([
+        [0.0, 0.0, -10.0],   # 屏幕中心
+        [0.0, 0.0, 5.0],     # 相机后方
+        [50.0, 0.0, -10.0],  # 屏幕外
+        [0.0, 0.0, -200.0],  # 超出距离
+        [2.0, 2.0, -5.0],    # 最近
+        [0.05, 0.0, -20.0],  # 与第0个同一网格，较远
+        [-6.0, -6.0, -30.0],
+    ])
+    kwargs = dict(view_matrix=np.eye(4), projection_matrix=projection,
+                  viewport_size=(100, 100), max_distance=100.0, cell_size=10.0)
+    selected = select_visible_labels(positions, max_labels=10, **kwargs)
+    assert selected.tolist() == [4, 0, 6]
+    selected = select_visible_labels(positions, max_labels=2, **kwargs)
+    assert selected.tolist() == [4, 0]
+    assert len(select_visible_labels(np.zeros((0, 3)), max_labels=2,
+                                     **kwargs)) == 0
+
+
 def run_demo_mode():
     """运行演示模式"""
     print("🚀 启动演示模式...")
@@ -0,0 +1,63 @@
+# ----------------------------------------------------------------------------
+# -                        Open3D: www.open3d.org                            -
+# ----------------------------------------------------------------------------
+# Copyright (c) 2018-2024 www.open3d.org
+# SPDX-License-Identifier: MIT
+# ----------------------------------------------------------------------------
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorboard")
+from open3d.visualization.tensorboard_plugin.util import LRUCache, SizedLRUCache
+
+NUM_ITEMS = 256
+HITS_PER_ROUND = 200000
+
+
+def make_cache(cache_type):
+    if cache_type == "lru":
+        cache = LRUCache(max_items=NUM_ITEMS)
+    else:
+        cache = SizedLRUCache(max_bytes=1 << 30)
+    for key in range(NUM_ITEMS):
+        cache.put(key, np.zeros(1024, dtype=np.float32))
+    return cache
+
+
+def concurrent_hits(cache, num_threads):
+    """Read cached items from ``num_threads`` threads simultaneously."""
+    hits_per_thread = HITS_PER_ROUND // num_threads
+    start = threading.Barrier(num_threads)
+
+    def reader(offset):
+        get = cache.get
+        start.wait()
+        for k in range(hits_per_thread):
+            get((k + offset) % NUM_ITEMS)
+
+    threads = [
+        threading.Thread(target=reader, args=(t * 7,))
+        for t in range(num_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize("num_threads", [1, 2, 4, 8])
+@pytest.mark.parametrize("cache_type", ["lru", "clock"])
+def test_cache_hit_throughput(benchmark, cache_type, num_threads):
+    """Hit throughput of the geometry cache with concurrent readers. Compare
+    hits / s (``extra_info``) across ``num_threads``."""
+    cache = make_cache(cache_type)
+    benchmark.pedantic(concurrent_hits,
+                       args=(cache, num_threads),
+                       rounds=5,
+                       warmup_rounds=1)
+    if benchmark.stats is not None:  # None with --benchmark-disable
+        benchmark.extra_info["hits_per_second"] = (HITS_PER_ROUND /
+                                                   benchmark.stats.stats.mean)
@@ -0,0 +1,85 @@
+# ----------------------------------------------------------------------------
+# -                        Open3D: www.open3d.org                            -
+# ----------------------------------------------------------------------------
+# Copyright (c) 2018-2024 www.open3d.org
+# SPDX-License-Identifier: MIT
+# ----------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorboard")
+import open3d as o3d
+from open3d.visualization.tensorboard_plugin import metadata
+
+CODECS = ("none",) + metadata.available_compressions()
+
+
+def lidar_sweep(num_points=120000, seed=0):
+    """Point cloud similar to a rotating LiDAR sweep: 32 rings of points on the
+    ground and on a few walls, with intensity and color attributes."""
+    rng = np.random.default_rng(seed)
+    num_rings = 32
+    azimuth = np.tile(np.linspace(-np.pi, np.pi, num_points // num_rings),
+                      num_rings)
+    elevation = np.repeat(np.linspace(-0.5, 0.2, num_rings),
+                          num_points // num_rings)
+    distance = np.minimum(1.8 / np.maximum(-np.sin(elevation), 0.02),
+                          30 + 5 * np.cos(4 * azimuth))
+    distance += rng.normal(scale=0.02, size=distance.shape)
+    positions = np.stack(
+        (distance * np.cos(elevation) * np.cos(azimuth), distance *
+         np.cos(elevation) * np.sin(azimuth), distance * np.sin(elevation)),
+        axis=1).astype(np.float32)
+    intensity = rng.integers(0, 256, size=(len(positions), 1)).astype(
+        np.float32) / 255
+    colors = (np.abs(positions) * 8 % 256).astype(np.uint8)
+    return positions, intensity, colors
+
+
+def serialize(positions, intensity, colors):
+    """msgpack buffer as written by ``summary.add_3d()``."""
+    buf_con = o3d.io.rpc.BufferConnection()
+    assert o3d.io.rpc.set_mesh_data(path="points",
+                                    time=0,
+                                    layer="",
+                                    vertices=o3d.core.Tensor(positions),
+                                    vertex_attributes={
+                                        "intensity": o3d.core.Tensor(intensity),
+                                        "colors": o3d.core.Tensor(colors)
+                                    },
+                                    o3d_type="PointCloud",
+                                    connection=buf_con)
+    return buf_con.get_buffer()
+
+
+@pytest.fixture(scope="module")
+def sweep_buffer():
+    return serialize(*lidar_sweep())
+
+
+def compress(buffer, codec):
+    return buffer if codec == "none" else metadata.compress(buffer, codec)
+
+
+def read(buffer, codec, uncompressed_size):
+    if codec != "none":
+        buffer = metadata.decompress(buffer, codec, uncompressed_size)
+    return o3d.io.rpc.data_buffer_to_meta_geometry(buffer)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_compression_write(benchmark, sweep_buffer, codec):
+    """Write overhead: compression time for a point cloud. The size ratio
+    (compressed / raw) is in ``extra_info``."""
+    compressed = benchmark(compress, sweep_buffer, codec)
+    benchmark.extra_info["size_ratio"] = len(compressed) / len(sweep_buffer)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_compression_read(benchmark, sweep_buffer, codec):
+    """Read latency: decompression and deserialization of a point cloud."""
+    compressed = compress(sweep_buffer, codec)
+    benchmark.extra_info["size_ratio"] = len(compressed) / len(sweep_buffer)
+    geometry = benchmark(read, compressed, codec, len(sweep_buffer))[2]
+    assert len(geometry.point.positions) == 120000
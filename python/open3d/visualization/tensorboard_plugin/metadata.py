@@ -6,8 +6,18 @@
 # ----------------------------------------------------------------------------
 """Internal information about the Open3D plugin."""
 
+import zlib
+
 from tensorboard.compat.proto.summary_pb2 import SummaryMetadata
 from .plugin_data_pb2 import LabelToNames
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 PLUGIN_NAME = "Open3D"
 
@@ -108,3 +118,58 @@ def parse_plugin_metadata(content):
     ln_proto = LabelToNames()
     ln_proto.ParseFromString(content)
     return ln_proto.label_to_names
+
+
+# Geometry data compression codecs: {name: (compress(data),
+# decompress(data, uncompressed_size))}. Names match the
+# Open3DPluginData.Compression enum. Fast compression levels are used since
+# data is compressed while training.
+_COMPRESSION_CODECS = {
+    'zlib': (lambda data: zlib.compress(data, 1),
+             lambda data, size: zlib.decompress(data, bufsize=max(size, 1)))
+}
+# Exceptions raised by the codecs for corrupt data.
+_DECOMPRESSION_ERRORS = (zlib.error,)
+if lz4_frame is not None:
+    _COMPRESSION_CODECS['lz4'] = (lz4_frame.compress,
+                                  lambda data, size: lz4_frame.decompress(data))
+    _DECOMPRESSION_ERRORS += (RuntimeError,)
+if zstandard is not None:
+    _DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+    # Compressor objects are not thread safe, so create one per call.
+    _COMPRESSION_CODECS['zstd'] = (
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data, size: zstandard.ZstdDecompressor().decompress(
+            data, max_output_size=size))
+
+
+def available_compressions():
+    """Names of the geometry data compression codecs available in this Python
+    environment. zlib is always available. lz4 and zstd require the ``lz4`` and
+    ``zstandard`` packages."""
+    return tuple(_COMPRESSION_CODECS.keys())
+
+
+def compress(data, codec):
+    """Compress a data buffer with a codec from ``available_compressions()``.
+    """
+    if codec not in _COMPRESSION_CODECS:
+        raise ValueError(f"Compression {codec} is not available. Available "
+                         f"compressions are {available_compressions()}.")
+    return _COMPRESSION_CODECS[codec][0](data)
+
+
+def decompress(data, codec, uncompressed_size):
+    """Decompress a data buffer compressed with ``compress()``.
+
+    Raises:
+        ValueError: If ``codec`` is not available.
+        IOError: If the data is corrupt.
+    """
+    if codec not in _COMPRESSION_CODECS:
+        raise ValueError(f"Compression {codec} is not available. Please "
+                         "install the Python package for it.")
+    try:
+        return _COMPRESSION_CODECS[codec][1](data, uncompressed_size)
+    except _DECOMPRESSION_ERRORS as err:
+        raise IOError(f"Decompressing {codec} data failed: {err}") from err
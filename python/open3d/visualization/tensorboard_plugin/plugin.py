@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: MIT
 # ----------------------------------------------------------------------------
 """Open3D visualization plugin for TensorBoard."""
+import bisect
 import os
 import sys
 import threading
@@ -27,6 +28,18 @@ from .util import RenderUpdate
 from .util import _log
 
 
+def _env_bytes(name, default):
+    """Read a size in bytes from the environment variable ``name``."""
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(float(value))
+    except ValueError:
+        _log.warning(f"Ignoring invalid value {value} for {name}.")
+        return default
+
+
 class Open3DPluginWindow:
     """Create and manage a single Open3D WebRTC GUI window."""
 
@@ -34,7 +47,8 @@ class Open3DPluginWindow:
                  data_reader,
                  title="Open3D for Tensorboard",
                  width=1024,
-                 height=768):
+                 height=768,
+                 prefetch_steps=2):
         """
         Args:
             data_reader: Open3DPluginDataReader object to read Tensorboard event
@@ -42,8 +56,12 @@ class Open3DPluginWindow:
             title (str): Window title. [Unused in WebRTC]
             width (int): Window width (px).
             height (int): Window height (px).
+            prefetch_steps (int): After displaying a step, read geometry for
+                this many next and previous steps (and the other batch
+                elements of the step) into the cache in the background.
         """
         self.data_reader = data_reader
+        self.prefetch_steps = prefetch_steps
         self.run = "."  # fixed for a window once set
         self.tags = []
         self.batch_idx = 0
@@ -53,6 +71,7 @@ class Open3DPluginWindow:
         self.wall_time = 0
         self.idx = 0
         self.step_to_idx = dict()
+        self._steps = []  # sorted steps
         # self.all_tensor_events[self.tags[0]][prop][self.idx].step == self.step
         self.all_tensor_events = dict()
 
@@ -187,6 +206,7 @@ class Open3DPluginWindow:
             tevt.step: idx
             for idx, tevt in enumerate(self.all_tensor_events[self.tags[0]])
         }
+        self._steps = sorted(self.step_to_idx)
         self.step_limits = [min(self.step_to_idx), max(self.step_to_idx)]
 
     def _validate_step(self, selected_step):
@@ -334,6 +354,13 @@ class Open3DPluginWindow:
         """
         if message is None:
             message = {"render_state": {}}
+        # Do not compete with prefetching for the previous state.
+        self.data_reader.cancel_prefetch(self.window.uid)
+        # Geometry on screen is not evicted by prefetching or other windows.
+        self.data_reader.pin(
+            self.window.uid, self.run,
+            [(tag, self.step, self.batch_idx) for tag in self.tags],
+            self.step_to_idx)
         status = ""
         new_geometry_list = []
         tag_label_to_names = message.setdefault("tag_label_to_names", dict())
@@ -351,13 +378,13 @@ class Open3DPluginWindow:
             new_geometry_list.append(geometry_name)
             if geometry_name not in self.geometry_list:
                 try:
-                    geometry, inference_data_proto = self.data_reader.read_geometry(
+                    geometry, inference_data = self.data_reader.read_geometry(
                         self.run, tag, self.step, self.batch_idx,
                         self.step_to_idx)
                     _log.debug(
                         f"Displaying geometry {geometry_name}:{geometry}")
                     render_update.apply(self.window, geometry_name, geometry,
-                                        inference_data_proto)
+                                        inference_data)
                     message["render_state"][
                         tag] = render_update.get_render_state()
                 except IOError as err:
@@ -380,8 +407,29 @@ class Open3DPluginWindow:
         if not self.init_done.is_set():
             self.init_done.set()
         _log.debug("Displaying complete!")
+        self._prefetch_adjacent()
         return "OK" if len(status) == 0 else status[1:]
 
+    def _prefetch_adjacent(self):
+        """Prefetch geometry for the next and previous ``prefetch_steps``
+        steps (nearest first), followed by the other batch elements of the
+        current step.
+        """
+        if len(self.tags) == 0 or self.prefetch_steps <= 0:
+            return
+        pos = bisect.bisect_left(self._steps, self.step)
+        requests = []
+        for offset in range(1, self.prefetch_steps + 1):
+            for adjacent in (pos + offset, pos - offset):
+                if 0 <= adjacent < len(self._steps):
+                    requests.extend((tag, self._steps[adjacent], self.batch_idx)
+                                    for tag in self.tags)
+        requests.extend((tag, self.step, batch_idx)
+                        for batch_idx in range(self.batch_size)
+                        if batch_idx != self.batch_idx for tag in self.tags)
+        self.data_reader.prefetch(self.window.uid, self.run, requests,
+                                  self.step_to_idx)
+
     def _create_ui(self, title, width, height):
         """Create new Open3D application window and rendering widgets. Must run
         in the GUI thread.
@@ -439,7 +487,12 @@ class Open3DPlugin(base_plugin.TBPlugin):
             context: A `base_plugin.TBContext` instance.
         """
         self._logdir = context.logdir
-        self.data_reader = Open3DPluginDataReader(self._logdir)
+        # Geometry cache budget, configured with environment variables
+        self.data_reader = Open3DPluginDataReader(
+            self._logdir,
+            cache_max_bytes=_env_bytes("OPEN3D_TB_CACHE_MAX_BYTES", 1 << 30),
+            cache_run_max_bytes=_env_bytes("OPEN3D_TB_CACHE_RUN_MAX_BYTES",
+                                           None))
         self.window_lock = threading.Lock()  # protect self._windows
         self._http_api_lock = threading.Lock()
         self._windows = {}
@@ -619,11 +672,11 @@ class Open3DPlugin(base_plugin.TBPlugin):
                     render_update = RenderUpdate(
                         o3dvis.scaling, message,
                         self.data_reader.get_label_to_names(run, tag))
-                geometry, inference_data_proto = self.data_reader.read_geometry(
+                geometry, inference_data = self.data_reader.read_geometry(
                     run, tag, int(step), int(batch_idx),
                     plugin_window.step_to_idx)
                 render_update.apply(o3dvis, geometry_name, geometry,
-                                    inference_data_proto)
+                                    inference_data)
 
         message["window_uid_list"] = window_uid_list
         message["render_state"] = render_update.get_render_state()
@@ -647,6 +700,7 @@ class Open3DPlugin(base_plugin.TBPlugin):
             "/style.css": self._serve_css,
             "/new_window": self._new_window,
             "/close_window": self._close_window,
+            "/cache_stats": self._cache_stats,
             "/api/*": self._webrtc_http_api
         }
 
@@ -718,6 +772,8 @@ class Open3DPlugin(base_plugin.TBPlugin):
                 f"Invalid Window ID {this_window_id}",
                 response=self._ERROR_RESPONSE)
 
+        self.data_reader.cancel_prefetch(this_window_id)
+        self.data_reader.unpin(this_window_id)
         self._gui.run_sync(self._windows[this_window_id].window.close)
         with self.window_lock:
             del self._windows[this_window_id]
@@ -726,6 +782,13 @@ class Open3DPlugin(base_plugin.TBPlugin):
                                  content_type="text/plain",
                                  headers=self._HEADERS)
 
+    @wrappers.Request.application
+    def _cache_stats(self, unused_request):
+        """Serve geometry cache statistics, for tuning the cache budget."""
+        return werkzeug.Response(json.dumps(self.data_reader.cache_stats()),
+                                 content_type="application/json",
+                                 headers=self._HEADERS)
+
     @wrappers.Request.application
     def _webrtc_http_api(self, request):
         """Relay WebRTC connection setup messages coming as HTTP requests."""
@@ -7,9 +7,10 @@
 """Summary writer for the TensorBoard Open3D plugin"""
 import threading
 import os
+import hashlib
 import socket
 import time
-import queue
+from collections import deque, OrderedDict
 import warnings
 
 import numpy as np
@@ -49,13 +50,31 @@ except ImportError:
     BoundingBox3D = None
 
 
+class _DataStream:
+    """Pending writes for a single data file. Writes to a file are done by one
+    writer thread at a time, in ``enqueue()`` order."""
+
+    __slots__ = ("handle", "filename", "next_write_pos", "pending", "scheduled",
+                 "next_flush_time")
+
+    def __init__(self, handle, filename, next_flush_time):
+        self.handle = handle
+        self.filename = filename
+        self.next_write_pos = 0
+        self.pending = deque()  # data buffers
+        self.scheduled = False  # In the ready queue or being written
+        self.next_flush_time = next_flush_time
+
+
 class _AsyncDataWriter:
     """Write binary data to file asynchronously. Data buffers and files are
-    queued with ``enqueue()`` and actual writing is done in a separate
-    thread. GFile (``tf.io.gfile``) is used for writing to local and remote
-    (Google cloud storage with gs:// URI and HDFS with hdfs:// URIs) locations.
-    If tensorflow is not available, we fallback to Python I/O. The filename
-    format is
+    queued with ``enqueue()`` and actual writing is done by a pool of writer
+    threads. Each file is an ordered stream written by one thread at a time,
+    and different files are written in parallel. Small pending buffers of a
+    file are coalesced into a single larger write. GFile (``tf.io.gfile``) is
+    used for writing to local and remote (Google cloud storage with gs:// URI
+    and HDFS with hdfs:// URIs) locations. If tensorflow is not available, we
+    fallback to Python I/O. The filename format is
     ``{tagfilepath}.{current time (s)}.{hostname}.{ProcessID}{filename_extension}``
     following the TensorFlow event file name format.
 
@@ -64,101 +83,269 @@ class _AsyncDataWriter:
     """
 
     def __init__(self,
-                 max_queue=10,
+                 max_queue=1000,
+                 max_pending_bytes=1 << 28,
+                 num_workers=4,
+                 coalesce_bytes=1 << 20,
                  flush_secs=120,
                  filename_extension='.msgpack'):
         """
         Args:
             max_queue (int): enqueue will block if more than ``max_queue``
                 writes are pending.
+            max_pending_bytes (int): enqueue will block if more than
+                ``max_pending_bytes`` bytes are pending. A single write larger
+                than this is accepted when nothing is pending.
+            num_workers (int): Max number of writer threads. Threads are
+                started when needed and exit when idle.
+            coalesce_bytes (int): Pending buffers of a file are combined into
+                a single write of up to this size.
             flush_secs (Number): Data is flushed to disk / network periodically
                 with this interval. Note that the data may still be in an OS
                 buffer and not on disk.
             filename_extension (str): Extension for binary file.
+
+        Raises:
+            ValueError: If ``max_queue``, ``max_pending_bytes`` or
+                ``num_workers`` is less than 1.
         """
-        self._max_queue = max_queue
-        self._flush_secs = flush_secs
-        self._next_flush_time = time.time() + self._flush_secs
+        self._check_option("max_queue", max_queue)
+        self._check_option("max_pending_bytes", max_pending_bytes)
+        self._check_option("num_workers", num_workers)
+        self.max_queue = max_queue
+        self.max_pending_bytes = max_pending_bytes
+        self.num_workers = num_workers
+        self.coalesce_bytes = coalesce_bytes
+        self.flush_secs = flush_secs
         self._filename_extension = filename_extension
-        self._write_queue = queue.Queue(maxsize=self._max_queue)
-        self._file_handles = dict()
-        self._file_next_write_pos = dict()
-        # protects _file_handles and _file_next_write_pos
-        self._file_lock = threading.Lock()
-        self._writer_thread = threading.Thread()
+        # Protects all members below
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._space_available = threading.Condition(self._lock)
+        self._streams = dict()  # {tagfilepath: _DataStream}
+        self._ready = deque()  # Streams with pending writes
+        self._num_threads = 0
+        self._num_idle_threads = 0
+        self._pending_count = 0
+        self._pending_bytes = 0
+        # Statistics
+        self._time_blocked = 0.
+        self._num_dropped = 0
+        self._num_writes = 0
+        self._bytes_written = 0
+
+    @staticmethod
+    def _check_option(name, value):
+        """Raise ValueError for an invalid option value."""
+        if name in ("max_queue", "max_pending_bytes",
+                    "num_workers") and value < 1:
+            raise ValueError(
+                f"Data writer option {name} must be at least 1, got {value}.")
+
+    def configure(self, **options):
+        """Change writer options. See ``__init__()`` for the options, except
+        ``filename_extension``."""
+        for name, value in options.items():
+            if name not in ("max_queue", "max_pending_bytes", "num_workers",
+                            "coalesce_bytes", "flush_secs"):
+                raise ValueError(f"Unknown data writer option {name}.")
+            self._check_option(name, value)
+        with self._lock:
+            for name, value in options.items():
+                setattr(self, name, value)
+            self._space_available.notify_all()
+
+    def _is_full(self):
+        return self._pending_count > 0 and (
+            self._pending_count >= self.max_queue or
+            self._pending_bytes >= self.max_pending_bytes)
+
+    def is_full(self):
+        """Would ``enqueue()`` block now?"""
+        with self._lock:
+            return self._is_full()
+
+    def record_dropped(self):
+        """Count a summary that was not written since the queue was full."""
+        with self._lock:
+            self._num_dropped += 1
+
+    def stats(self):
+        """Writer statistics.
+
+        Returns:
+            dict: ``queue_depth`` (pending writes), ``bytes_pending``,
+            ``time_blocked`` (total time in seconds ``enqueue()`` was
+            blocked), ``dropped`` (summaries), ``writes`` (file writes after
+            coalescing), ``bytes_written`` and ``threads``.
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._pending_count,
+                "bytes_pending": self._pending_bytes,
+                "time_blocked": self._time_blocked,
+                "dropped": self._num_dropped,
+                "writes": self._num_writes,
+                "bytes_written": self._bytes_written,
+                "threads": self._num_threads
+            }
 
     def _writer(self):
         """Writer thread main function."""
         while True:
+            with self._lock:
+                self._num_idle_threads += 1
+                while len(self._ready) == 0:
+                    if not self._work_available.wait(timeout=0.25):
+                        break
+                self._num_idle_threads -= 1
+                if len(self._ready) == 0:  # exit if nothing to do.
+                    self._num_threads -= 1
+                    return
+                stream = self._ready.popleft()
+                chunk = [stream.pending.popleft()]
+                chunk_size = len(chunk[0])
+                while (len(stream.pending) > 0 and
+                       chunk_size + len(stream.pending[0])
+                       <= self.coalesce_bytes):
+                    chunk.append(stream.pending.popleft())
+                    chunk_size += len(chunk[-1])
+            # Only this thread writes to the stream till it is rescheduled, so
+            # release lock for expensive I/O op.
+            _log.debug(f"Writing {chunk_size}b data ({len(chunk)} buffers) "
+                       f"at {stream.filename}")
             try:
-                tagfilepath, data = self._write_queue.get(timeout=0.25)
-            except queue.Empty:  # exit if nothing to do.
-                break
-            _log.debug(
-                f"Writing {len(data)}b data at "
-                f"{tagfilepath}+{self._file_handles[tagfilepath].tell()}")
-            with self._file_lock:
-                handle = self._file_handles[tagfilepath]
-            handle.write(data)  # release lock for expensive I/O op
-            self._write_queue.task_done()
-            if time.time() > self._next_flush_time:
-                file_handle_iter = iter(self._file_handles.values())
-                try:
-                    while True:
-                        with self._file_lock:
-                            handle = next(file_handle_iter)
-                        handle.flush()  # release lock for expensive I/O op
-                        _log.debug(f"Flushed {tagfilepath}.")
-                except (StopIteration, RuntimeError):
-                    # RuntimeError: possible race condition in dict iterator,
-                    # but PEP3106 guarantees no corruption. Try again later.
-                    pass
-                self._next_flush_time += self._flush_secs
+                stream.handle.write(b"".join(chunk) if len(chunk) >
+                                    1 else chunk[0])
+                if time.time() > stream.next_flush_time:
+                    stream.handle.flush()
+                    stream.next_flush_time = time.time() + self.flush_secs
+                    _log.debug(f"Flushed {stream.filename}.")
+            except (OSError, IOError) as err:
+                _log.error(f"Writing data to {stream.filename} failed: {err}")
+            with self._lock:
+                self._pending_count -= len(chunk)
+                self._pending_bytes -= chunk_size
+                self._num_writes += 1
+                self._bytes_written += chunk_size
+                if len(stream.pending) > 0:
+                    self._ready.append(stream)  # Round robin between files
+                else:
+                    stream.scheduled = False
+                self._space_available.notify_all()
+
+    def _open_stream(self, tagfilepath):
+        """Get the data stream for a file, opening it if required. Call with
+        ``self._lock`` held."""
+        if tagfilepath not in self._streams:
+            # summary.writer.EventFileWriter name format
+            fullfilepath = "{}.{}.{}.{}{}".format(tagfilepath, int(time.time()),
+                                                  socket.gethostname(),
+                                                  os.getpid(),
+                                                  self._filename_extension)
+            _makedirs(os.path.dirname(fullfilepath))
+            self._streams[tagfilepath] = _DataStream(
+                _fileopen(fullfilepath, 'wb'), fullfilepath,
+                time.time() + self.flush_secs)
+            _log.debug(f"msgpack file {fullfilepath} opened for writing.")
+        return self._streams[tagfilepath]
+
+    def filename(self, tagfilepath):
+        """Complete filename that data for ``tagfilepath`` is written to. The
+        file is opened if required.
+
+        Args:
+            tagfilepath (str): Full file pathname for data, as passed to
+                ``enqueue()``.
+
+        Returns:
+            str: Full pathname of the data file.
+        """
+        with self._lock:
+            return self._open_stream(tagfilepath).filename
 
     def enqueue(self, tagfilepath, data):
-        """Add a write job to the write queue.
+        """Add a write job to the write queue. This blocks while the queue is
+        full.
 
         Args:
             tagfilepath (str): Full file pathname for data. A suffix will be
-                added to get the complete filename. A None value indicates
-                writing is over and the writer thread should join.
+                added to get the complete filename.
             data (bytes): Data buffer to write.
 
         Returns:
             Tuple of filename and location (in bytes) where the data will be
             written.
         """
-        with self._file_lock:
-            if tagfilepath not in self._file_handles:
-                # summary.writer.EventFileWriter name format
-                fullfilepath = "{}.{}.{}.{}{}".format(tagfilepath,
-                                                      int(time.time()),
-                                                      socket.gethostname(),
-                                                      os.getpid(),
-                                                      self._filename_extension)
-                _makedirs(os.path.dirname(fullfilepath))
-                self._file_handles[tagfilepath] = _fileopen(fullfilepath, 'wb')
-                _log.debug(f"msgpack file {fullfilepath} opened for writing.")
-                this_write_loc = 0
-                self._file_next_write_pos[tagfilepath] = len(data)
-            else:
-                this_write_loc = self._file_next_write_pos[tagfilepath]
-                self._file_next_write_pos[tagfilepath] += len(data)
-                fullfilepath = self._file_handles[tagfilepath].name
-        # Blocks till queue has available slot.
-        self._write_queue.put((tagfilepath, data), block=True)
-        if not self._writer_thread.is_alive():
-            self._writer_thread = threading.Thread(target=self._writer,
-                                                   name="Open3DDataWriter")
-            self._writer_thread.start()
-
-        return os.path.basename(fullfilepath), this_write_loc
+        with self._lock:
+            stream = self._open_stream(tagfilepath)
+            if self._is_full():  # Blocks till queue has space.
+                start = time.perf_counter()
+                while self._is_full():
+                    self._space_available.wait()
+                self._time_blocked += time.perf_counter() - start
+            this_write_loc = stream.next_write_pos
+            stream.next_write_pos += len(data)
+            stream.pending.append(data)
+            self._pending_count += 1
+            self._pending_bytes += len(data)
+            if not stream.scheduled:
+                stream.scheduled = True
+                self._ready.append(stream)
+                if self._num_idle_threads > 0:
+                    self._work_available.notify()
+                elif self._num_threads < self.num_workers:
+                    self._num_threads += 1
+                    threading.Thread(target=self._writer,
+                                     name="Open3DDataWriter").start()
+
+        return os.path.basename(stream.filename), this_write_loc
+
+    def flush(self):
+        """Wait till all pending data is written and flush all files."""
+        with self._lock:
+            while self._pending_count > 0:
+                self._space_available.wait()
+            handles = [stream.handle for stream in self._streams.values()]
+        for handle in handles:
+            handle.flush()
 
 
 # Single global writer per process
 _async_data_writer = _AsyncDataWriter()
 
 
+def configure_data_writer(**options):
+    """Configure the asynchronous writer for 3D data of this process.
+
+    Args:
+        max_queue (int): ``add_3d()`` will block if more than ``max_queue``
+            writes are pending. Default 1000.
+        max_pending_bytes (int): ``add_3d()`` will block if more than
+            ``max_pending_bytes`` bytes are pending. Default 256MiB.
+        num_workers (int): Max number of writer threads. Different tags are
+            written in parallel. Default 4.
+        coalesce_bytes (int): Small writes to a file are combined into a single
+            write of up to this size. Default 1MiB.
+        flush_secs (Number): Data is flushed to disk / network periodically
+            with this interval. Default 120s.
+    """
+    _async_data_writer.configure(**options)
+
+
+def data_writer_stats():
+    """Statistics of the asynchronous writer for 3D data of this process.
+
+    Returns:
+        dict: ``queue_depth`` (pending writes), ``bytes_pending``,
+        ``time_blocked`` (total time in seconds ``add_3d()`` was blocked by a
+        full queue), ``dropped`` (summaries dropped with
+        ``drop_when_full=True``), ``writes`` (file writes after coalescing),
+        ``bytes_written`` and ``threads`` (active writer threads).
+    """
+    return _async_data_writer.stats()
+
+
 def _to_o3d(tensor, min_ndim=0, max_len=None):
     """Convert Tensorflow, PyTorch and Numpy tensors to Open3D tensor without
     copying. Python lists and tuples are also accepted, but will be copied. If
@@ -348,7 +535,96 @@ def _convert_bboxes(bboxes):
     return data, data_bbox
 
 
-def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
+# Content hashes of recently written geometry properties, for automatic
+# property references: {(data filename, property): OrderedDict({(hash for
+# each batch element): step})}. References can only be resolved within a data
+# file, so the history is keyed on the data file (which includes the
+# timestamp and pid of the writer) and not reused by a later writer session.
+_content_hashes = dict()
+_content_hashes_lock = threading.Lock()
+_MAX_CONTENT_HASHES = 16  # per tag and property
+
+
+def _content_hash(tensor):
+    """Hash of the shape, dtype and data of an Open3D tensor."""
+    array = tensor.cpu().numpy()
+    content_hash = hashlib.blake2b(digest_size=16)
+    content_hash.update(f"{array.dtype.str}{array.shape}".encode())
+    content_hash.update(np.ascontiguousarray(array).data)
+    return content_hash.digest()
+
+
+def _deduplicate(write_dir, tag, step, geometry_data, geometry_metadata):
+    """Replace geometry properties identical to the data written at an earlier
+    step (for all batch elements) by property references to that step.
+
+    Args:
+        write_dir (str): Path of folder to write data file.
+        tag (str): Full name for geometry.
+        step (int): Iteration / step count.
+        geometry_data (dict): {prefix: {property name: tuple of tensors}} with
+            prefixes "vertex_", "triangle_" and "line_". Modified in place.
+        geometry_metadata (Open3DPluginData): Property references are added
+            here.
+
+    Returns:
+        list: (history key, content hashes, step) for properties written at
+        this step. Pass to ``_record_content_hashes()`` after the data is
+        written.
+    """
+    candidates = []
+    for prefix, prop_data in geometry_data.items():
+        for name, tensors in prop_data.items():
+            if prefix + name in metadata.GEOMETRY_PROPERTY_DIMS:
+                candidates.append(
+                    (prefix, name, tuple(_content_hash(t) for t in tensors)))
+    filename = _async_data_writer.filename(
+        os.path.join(write_dir, tag.replace('/', '-')))
+    step_refs = {}
+    with _content_hashes_lock:
+        for prefix, name, hashes in candidates:
+            history = _content_hashes.get((filename, prefix + name), {})
+            step_ref = history.get(hashes)
+            if step_ref is not None and step_ref < step:
+                step_refs[(prefix, name)] = step_ref
+                history.move_to_end(hashes)
+    if len(step_refs) > 0 and len(step_refs) == sum(
+            len(prop_data) for prop_data in geometry_data.values()):
+        # Write some data to keep the geometry valid.
+        if ("vertex_", "positions") in step_refs:
+            del step_refs[("vertex_", "positions")]
+        else:
+            step_refs.popitem()
+    written = []
+    for prefix, name, hashes in candidates:
+        if (prefix, name) in step_refs:
+            del geometry_data[prefix][name]
+            geometry_metadata.property_references.add(
+                geometry_property=plugin_data_pb2.Open3DPluginData.
+                GeometryProperty.Value(prefix + name),
+                step_ref=step_refs[(prefix, name)])
+        else:
+            written.append(((filename, prefix + name), hashes, int(step)))
+    return written
+
+
+def _record_content_hashes(written):
+    """Record content hashes of geometry properties written at a step."""
+    with _content_hashes_lock:
+        for key, hashes, step in written:
+            history = _content_hashes.setdefault(key, OrderedDict())
+            history[hashes] = step
+            history.move_to_end(hashes)
+            if len(history) > _MAX_CONTENT_HASHES:
+                history.popitem(last=False)
+
+
+def _write_geometry_data(write_dir,
+                         tag,
+                         step,
+                         data,
+                         max_outputs=1,
+                         compression=None):
     """Serialize and write geometry data for a tag. Data is written to a
     separate file per tag.
     TODO: Add version specific reader / writer
@@ -360,6 +636,8 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
         data (dict): Property name to tensor mapping.
         max_outputs (int): Only the first `max_samples` data points in each
             batch will be saved.
+        compression (str): Compress geometry data with this codec (one of
+            ``metadata.available_compressions()``). None to disable.
 
     Returns:
         A comma separated data location string with the format
@@ -384,6 +662,11 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
             f"Unknown geometry properties in data: {unknown_props}")
     if "vertex_positions" not in data:
         raise ValueError("Primary key 'vertex_positions' not provided.")
+    if (compression is not None and
+            compression not in metadata.available_compressions()):
+        raise ValueError(f"Compression {compression} is not available. "
+                         "Available compressions are "
+                         f"{metadata.available_compressions()}.")
     if max_outputs == 0:  # save all
         max_outputs = np.iinfo(np.int32).max
     elif max_outputs < 1:
@@ -486,6 +769,15 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
         raise ValueError(
             "Please provide a 'material_name' for the material properties.")
 
+    # Reference identical data from earlier steps. Bounding box LineSets are
+    # excluded, since their lines are modified in place for rendering.
+    written_hashes = []
+    if data_bbox is None:
+        written_hashes = _deduplicate(write_dir, tag, step, {
+            "vertex_": vertex_data,
+            "triangle_": triangle_data,
+            "line_": line_data
+        }, geometry_metadata)
     vertices = vertex_data.pop("positions",
                                o3d.core.Tensor((), dtype=o3d.core.float32))
     faces = triangle_data.pop("indices",
@@ -531,6 +823,12 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
         # TODO(ssheorey): This returns a copy instead of the original. Benchmark
         # vs numpy
         data_buffer = buf_con.get_buffer()
+        uncompressed_size = len(data_buffer)
+        codec = "none"
+        if compression is not None:
+            compressed_buffer = metadata.compress(data_buffer, compression)
+            if len(compressed_buffer) < uncompressed_size:  # else store raw
+                data_buffer, codec = compressed_buffer, compression
         filename, this_write_location = _async_data_writer.enqueue(
             os.path.join(write_dir, tag.replace('/', '-')), data_buffer)
         if bidx == 0:
@@ -538,7 +836,10 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
         geometry_metadata.batch_index.start_size.add(
             start=this_write_location,
             size=len(data_buffer),
-            masked_crc32c=masked_crc32c(data_buffer))
+            masked_crc32c=masked_crc32c(data_buffer),
+            compression=plugin_data_pb2.Open3DPluginData.Compression.Value(
+                codec),
+            uncompressed_size=(0 if codec == "none" else uncompressed_size))
         if data_bbox is not None:
             data_bbox_proto = plugin_data_pb2.InferenceData()
             for l, c in zip(data_bbox['bbox_labels'][bidx],
@@ -555,6 +856,7 @@ def _write_geometry_data(write_dir, tag, step, data, max_outputs=1):
             geometry_metadata.batch_index.start_size[
                 -1].aux_masked_crc32c = masked_crc32c(data_bbox_serial)
 
+    _record_content_hashes(written_hashes)
     return geometry_metadata.SerializeToString()
 
 
@@ -564,7 +866,9 @@ def add_3d(name,
            logdir=None,
            max_outputs=1,
            label_to_names=None,
-           description=None):
+           description=None,
+           drop_when_full=False,
+           compression=None):
     """Write 3D geometry data as TensorBoard summary for visualization with the
     Open3D for TensorBoard plugin.
 
@@ -634,6 +938,10 @@ def add_3d(name,
             steps. This is not supported for ``material_name``,
             ``material_scalar_*PROPERTY*`` and custom vertex features.
 
+            Geometry properties identical to the data written for the same tag
+            at an earlier step (for all elements in the batch) are saved as
+            references automatically.
+
             Please see the `Filament Materials Guide
             <https://google.github.io/filament/Materials.html#materialmodels>`__ for
             a complete description of material properties.
@@ -654,10 +962,19 @@ def add_3d(name,
         description (str): Optional long-form description for this summary, as a
           constant ``str``. Markdown is supported. Defaults to empty. Currently
           unused.
+        drop_when_full (bool): Skip writing this summary instead of waiting if
+          the queue of the asynchronous data writer is full. Use for
+          non-critical summaries to avoid slowing down training. See
+          ``configure_data_writer()`` and ``data_writer_stats()``.
+        compression (str): Optional codec to compress the geometry data with, to
+          reduce storage size. One of ``zlib`` (always available), ``lz4`` or
+          ``zstd`` (if the ``lz4`` or ``zstandard`` Python package is
+          installed). Compressed data is decompressed transparently when
+          reading. Defaults to ``None`` (no compression).
 
     Returns:
       [TensorFlow] True on success, or false if no summary was emitted because
-      no default summary writer was available.
+      no default summary writer was available or the summary was dropped.
 
     Raises:
       ValueError: if a default writer exists, but no step was provided and
@@ -726,6 +1043,9 @@ def add_3d(name,
         raise ValueError("Step is not provided or set.")
     if logdir is None:
         raise ValueError("logdir must be provided with TensorFlow.")
+    if drop_when_full and _async_data_writer.is_full():
+        _async_data_writer.record_dropped()
+        return False
 
     mdata = {} if label_to_names is None else {'label_to_names': label_to_names}
     summary_metadata = metadata.create_summary_metadata(description=description,
@@ -743,7 +1063,7 @@ def add_3d(name,
         def lazy_tensor():
             write_dir = PluginDirectory(logdir, metadata.PLUGIN_NAME)
             geometry_metadata_string = _write_geometry_data(
-                write_dir, tag, step, data, max_outputs)
+                write_dir, tag, step, data, max_outputs, compression)
             return tf.convert_to_tensor(geometry_metadata_string)
 
         return tf.summary.write(tag=tag,
@@ -759,10 +1079,15 @@ def _add_3d_torch(self,
                   logdir=None,
                   max_outputs=1,
                   label_to_names=None,
-                  description=None):
+                  description=None,
+                  drop_when_full=False,
+                  compression=None):
     walltime = None
     if step is None:
         raise ValueError("Step is not provided or set.")
+    if drop_when_full and _async_data_writer.is_full():
+        _async_data_writer.record_dropped()
+        return
 
     mdata = {} if label_to_names is None else {'label_to_names': label_to_names}
     summary_metadata = metadata.create_summary_metadata(description=description,
@@ -772,7 +1097,7 @@ def _add_3d_torch(self,
         logdir = writer.get_logdir()
     write_dir = PluginDirectory(logdir, metadata.PLUGIN_NAME)
     geometry_metadata_string = _write_geometry_data(write_dir, tag, step, data,
-                                                    max_outputs)
+                                                    max_outputs, compression)
     tensor_proto = TensorProto(dtype='DT_STRING',
                                string_val=[geometry_metadata_string],
                                tensor_shape=TensorShapeProto())
@@ -7,13 +7,15 @@
 """Utility functions for the Open3D TensorBoard plugin."""
 
 import os
-from glob import iglob
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import logging
+import mmap
 import threading
 
 import numpy as np
+from tensorboard.backend.event_processing import directory_watcher
 from tensorboard.backend.event_processing.plugin_event_multiplexer import EventMultiplexer
 from tensorboard.backend.event_processing.plugin_asset_util import PluginDirectory
 from tensorboard.compat.tensorflow_stub.pywrap_tensorflow import masked_crc32c
@@ -151,6 +153,254 @@ class LRUCache:
                 f"Hits: {self.hits}, Misses: {self.misses}")
 
 
+def _nbytes(value):
+    """Approximate memory used by a cached value in bytes.
+
+    Open3D and Numpy tensors, Open3D tensor geometries (including material
+    texture maps), protobuf messages and tuples / lists of these are supported.
+    Other values count as 0 bytes.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, o3d.core.Tensor):
+        return value.num_elements() * value.dtype.byte_size()
+    if isinstance(value, o3d.t.geometry.Image):
+        return _nbytes(value.as_tensor())
+    if hasattr(value, "ByteSize"):  # protobuf message
+        return value.ByteSize()
+    total = 0
+    for attr in ("point", "vertex", "triangle", "line"):
+        if hasattr(value, attr):
+            total += sum(
+                _nbytes(tensor) for _, tensor in getattr(value, attr).items())
+    if hasattr(value, "material") and value.has_valid_material():
+        total += sum(
+            _nbytes(image) for image in value.material.texture_maps.values())
+    return total
+
+
+class _CacheEntry:
+    """Cached value with its size, group and CLOCK reference bit."""
+
+    __slots__ = ("value", "size", "group", "referenced")
+
+    def __init__(self, value, size, group):
+        self.value = value
+        self.size = size
+        self.group = group
+        self.referenced = False
+
+
+class SizedLRUCache:
+    """Cache with a memory budget and approximate LRU (CLOCK) eviction. Items
+    are evicted when the total size of cached values exceeds ``max_bytes``.
+    Optionally, the total size of items in a group (e.g. all geometry from a
+    run) may be limited to ``max_group_bytes``, so that a single large run does
+    not evict everything else. This is thread safe for concurrent access.
+
+    A cache hit does not take any lock: it only looks up the key and sets the
+    entry's reference bit. Insertion and eviction are serialized by a lock.
+    Eviction scans entries in insertion order, and entries referenced since
+    the last scan get a second chance (moved to the end with the bit cleared).
+    Keys pinned with ``pin()`` (e.g. geometry on screen) are never evicted.
+    """
+
+    def __init__(self,
+                 max_bytes=1 << 30,
+                 max_items=None,
+                 max_group_bytes=None,
+                 group_fn=None,
+                 size_fn=_nbytes):
+        """
+        Args:
+            max_bytes (int): Max total size of cached values in bytes.
+            max_items (int): Optional max items in cache.
+            max_group_bytes (int): Optional max total size of cached values in
+                a group in bytes.
+            group_fn (Callable): Map key to group. Required for
+                ``max_group_bytes``.
+            size_fn (Callable): Map value to its size in bytes.
+        """
+        self.cache = OrderedDict()  # key -> _CacheEntry, CLOCK order
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_group_bytes = max_group_bytes
+        self._group_fn = group_fn or (lambda key: None)
+        self._size_fn = size_fn
+        self._group_keys = dict()  # group -> OrderedDict(key -> None)
+        self._group_bytes = dict()  # group -> size
+        self._pins = dict()  # owner -> pinned keys
+        self._pin_counts = dict()  # key -> number of owners pinning it
+        self._write_lock = threading.Lock()
+        self.nbytes = 0
+        # hits, misses are not protected against concurrent access for
+        # performance.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0  # Items larger than the budget are not cached
+
+    def get(self, key):
+        """Retrieve value corresponding to ``key`` from the cache.
+
+        Return:
+            Value if ``key`` is found, else None.
+        """
+        entry = self.cache.get(key)  # atomic
+        if entry is None:
+            self.misses += 1
+            return None
+        entry.referenced = True  # harmless if concurrently evicted
+        self.hits += 1
+        return entry.value
+
+    def _pop(self, key):
+        """Remove ``key``. Caller must hold the write lock."""
+        entry = self.cache.pop(key)
+        group_keys = self._group_keys[entry.group]
+        del group_keys[key]
+        if len(group_keys) == 0:
+            del self._group_keys[entry.group]
+            del self._group_bytes[entry.group]
+        else:
+            self._group_bytes[entry.group] -= entry.size
+        self.nbytes -= entry.size
+
+    def _evict_one(self, keys, exclude):
+        """Evict the first unpinned entry in ``keys`` (ordered keys of the cache
+        or of a group) not referenced since the last scan. ``exclude`` (the
+        entry being inserted) is only evicted if there is no other unpinned
+        entry. Caller must hold the write lock.
+        """
+        # Bound the scan, since readers may set reference bits concurrently.
+        for _ in range(len(keys)):
+            key = next(iter(keys))
+            entry = self.cache[key]
+            if key != exclude and key not in self._pin_counts:
+                if not entry.referenced:
+                    break
+                entry.referenced = False  # second chance
+            self.cache.move_to_end(key)
+            self._group_keys[entry.group].move_to_end(key)
+        else:
+            key = next((key for key in keys
+                        if key != exclude and key not in self._pin_counts),
+                       exclude)
+        self._pop(key)
+        self.evictions += 1
+
+    def put(self, key, value):
+        """Add (key, value) pair to the cache. If cache limits are exceeded,
+        evict items (from the same group first if the group quota is exceeded)
+        till the cache is within limits. Values larger than the budget are not
+        cached.
+
+        Args:
+            key: Hashable key.
+            value: Value to cache.
+
+        Returns:
+            bool: True if the value was added to the cache. This is False if
+            only pinned items could be evicted to make space.
+        """
+        size = self._size_fn(value)
+        group = self._group_fn(key)
+        budget = self.max_bytes
+        if self.max_group_bytes is not None:
+            budget = min(budget, self.max_group_bytes)
+        if size > budget:
+            self.rejected += 1
+            _log.debug(f"Not caching {key}: {size} bytes exceeds budget.")
+            return False
+        with self._write_lock:
+            if key in self.cache:
+                self._pop(key)
+            self.cache[key] = _CacheEntry(value, size, group)
+            self._group_keys.setdefault(group, OrderedDict())[key] = None
+            self._group_bytes[group] = self._group_bytes.get(group, 0) + size
+            self.nbytes += size
+            if self.max_group_bytes is not None:
+                while (key in self.cache and
+                       self._group_bytes[group] > self.max_group_bytes):
+                    self._evict_one(self._group_keys[group], key)
+            while key in self.cache and (self.nbytes > self.max_bytes or
+                                         (self.max_items is not None and
+                                          len(self.cache) > self.max_items)):
+                self._evict_one(self.cache, key)
+            added = key in self.cache
+        _log.debug(str(self))
+        return added
+
+    def pin(self, owner, keys):
+        """Protect ``keys`` from eviction, replacing keys previously pinned by
+        ``owner``. Keys need not be in the cache yet.
+
+        Args:
+            owner: Hashable identity, e.g. a window id.
+            keys (Iterable): Keys to pin.
+        """
+        keys = frozenset(keys)
+        with self._write_lock:
+            self._unpin(owner)
+            self._pins[owner] = keys
+            for key in keys:
+                self._pin_counts[key] = self._pin_counts.get(key, 0) + 1
+
+    def unpin(self, owner):
+        """Release keys pinned by ``owner``."""
+        with self._write_lock:
+            self._unpin(owner)
+
+    def _unpin(self, owner):
+        """Release keys pinned by ``owner``. Caller must hold the write lock."""
+        for key in self._pins.pop(owner, ()):
+            if self._pin_counts[key] == 1:
+                del self._pin_counts[key]
+            else:
+                self._pin_counts[key] -= 1
+
+    def clear(self):
+        """Invalidate cache."""
+        with self._write_lock:
+            self.cache.clear()
+            self._group_keys.clear()
+            self._group_bytes.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Cache statistics, for tuning the cache budget.
+
+        Returns:
+            dict: Items, bytes and budgets, hit, miss, eviction and rejection
+            counts and bytes used per group.
+        """
+        with self._write_lock:
+            return {
+                "items": len(self.cache),
+                "max_items": self.max_items,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "max_group_bytes": self.max_group_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "group_bytes": {
+                    str(group): size
+                    for group, size in self._group_bytes.items()
+                }
+            }
+
+    def __str__(self):
+        return (f"Items: {len(self.cache)}, Bytes: {self.nbytes}/"
+                f"{self.max_bytes}, Hits: {self.hits}, Misses: {self.misses}, "
+                f"Evictions: {self.evictions}")
+
+
 def _classify_properties(tensormap):
     """Classify custom geometry properties (other than positions, indices,
     colors, normals) into labels and other custom properties.
@@ -180,6 +430,34 @@ def _classify_properties(tensormap):
     return label_prop, custom_prop
 
 
+class BoxInferenceData(namedtuple("BoxInferenceData",
+                                  ("labels", "confidences"))):
+    """Bounding box labels and confidences, as arrays with one element per
+    box.
+
+    Attributes:
+        labels (np.ndarray): (N,) int32 box labels.
+        confidences (np.ndarray): (N,) float32 box confidences.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_proto(cls, inference_data_proto=None):
+        """Convert an ``InferenceData`` protobuf message. ``None`` gives empty
+        arrays."""
+        if inference_data_proto is None:
+            return cls(np.empty((0,), dtype=np.int32),
+                       np.empty((0,), dtype=np.float32))
+        results = inference_data_proto.inference_result
+        return cls(
+            np.fromiter((result.label for result in results),
+                        dtype=np.int32,
+                        count=len(results)),
+            np.fromiter((result.confidence for result in results),
+                        dtype=np.float32,
+                        count=len(results)))
+
+
 class Open3DPluginDataReader:
     """Manage TB event data and geometry data for common use by all
     Open3DPluginWindow instances. This is thread safe for simultaneous use by
@@ -188,67 +466,160 @@ class Open3DPluginDataReader:
 
     Args:
         logdir (str): TensorBoard logs directory.
-        cache_max_items (int): Max geometry elements to be cached in memory.
+        cache_max_items (int): Optional max geometry elements to be cached in
+            memory.
+        cache_max_bytes (int): Max total size (bytes) of geometry data cached
+            in memory.
+        cache_run_max_bytes (int): Optional max total size (bytes) of geometry
+            data cached in memory for a single run.
     """
 
-    def __init__(self, logdir, cache_max_items=128):
+    def __init__(self,
+                 logdir,
+                 cache_max_items=None,
+                 cache_max_bytes=1 << 30,
+                 cache_run_max_bytes=None):
         self.logdir = logdir
         self.event_mux = EventMultiplexer(tensor_size_guidance={
             metadata.PLUGIN_NAME: 0  # Store all metadata in RAM
         })
         self._run_to_tags = {}
+        # {run: event file (name, size, mtime) tuple} at the last reload
+        self._run_signatures = {}
         self._event_lock = threading.Lock()  # Protect TB event file data
+        self._reload_lock = threading.Lock()  # Serialize reload_events()
         # Geometry data reading
         self._tensor_events = dict()
-        self.geometry_cache = LRUCache(max_items=cache_max_items)
+        # {(run, tag): (metadata protos, property reference source steps)}
+        self._tag_index = dict()
+        # Cache geometry and aux data. Keys: (filename, read_location,
+        # read_size, run, tag, step, batch_idx). Group by run for per-run
+        # quotas.
+        self.geometry_cache = SizedLRUCache(max_bytes=cache_max_bytes,
+                                            max_items=cache_max_items,
+                                            max_group_bytes=cache_run_max_bytes,
+                                            group_fn=lambda key: key[3])
+        self._empty_inference_data = BoxInferenceData.from_proto()
         self.runtag_prop_shape = dict()
         self._file_handles = {}  # {filename, (open_handle, read_lock)}
+        self._file_maps = {}  # {filename, mmap} for local files
         self._file_handles_lock = threading.Lock()
+        self._prefetch_executor = None  # Created on first use
+        self._prefetch_futures = {}  # {owner: [Future, ...]}
+        self._prefetch_lock = threading.Lock()
         self.reload_events()
 
-    def _have_data(self):
-        """Do we have any Open3D data?"""
-        try:
-            next(
-                iglob(os.path.join(self.logdir, "**", "plugins", "Open3D",
-                                   "*.msgpack"),
-                      recursive=True))
-            return True
-        except StopIteration:
-            return False
+    def _scan_runs(self):
+        """Find runs with Open3D data and the state of their event files.
+
+        Plugin data directories are not searched for runs, so the (many)
+        msgpack data files are not listed.
+
+        Returns:
+            dict: {run: (run directory, signature)}. The signature is a tuple
+            of (name, size, mtime) for all event files of the run.
+        """
+        runs = {}
+        for dirpath, dirnames, filenames in os.walk(self.logdir):
+            has_data = "plugins" in dirnames and os.path.isdir(
+                os.path.join(dirpath, "plugins", metadata.PLUGIN_NAME))
+            if "plugins" in dirnames:
+                dirnames.remove("plugins")
+            if not has_data:
+                continue
+            signature = []
+            for filename in filenames:
+                if "tfevents" not in filename:
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                except OSError:  # Deleted after listing
+                    continue
+                signature.append((filename, stat.st_size, stat.st_mtime_ns))
+            if len(signature) > 0:
+                run = os.path.relpath(dirpath, self.logdir)
+                runs[run] = (dirpath, tuple(sorted(signature)))
+        return runs
 
     def reload_events(self):
-        """Reload event file"""
-        # Quickly check for Open3D data, since adding all runs can take a long
-        # time
-        if not self._have_data():
-            with self._event_lock:
-                self._run_to_tags = {}
-            _log.debug(f"No event data found in {self.logdir}")
-        else:
-            self.event_mux.AddRunsFromDirectory(self.logdir)
-            self.event_mux.Reload()
-            run_tags = self.event_mux.PluginRunToTagToContent(
-                metadata.PLUGIN_NAME)
+        """Reload event files. Only new runs and runs whose event files have
+        changed are reloaded, and only their new events are read. Indexes, open
+        files and cached geometry of unchanged runs are kept."""
+        with self._reload_lock:
+            runs = self._scan_runs()
+            changed = [
+                run for run, (unused_path, signature) in runs.items()
+                if self._run_signatures.get(run) != signature
+            ]
+            removed = [run for run in self._run_signatures if run not in runs]
+            run_to_tags = dict(self._run_to_tags)
+            for run in changed:
+                self.event_mux.AddRun(runs[run][0], name=run)
+                accumulator = self.event_mux.GetAccumulator(run)
+                try:
+                    accumulator.Reload()  # Reads only new events
+                    tag_to_content = accumulator.PluginTagToContent(
+                        metadata.PLUGIN_NAME)
+                except KeyError:  # No Open3D events yet
+                    tag_to_content = {}
+                except (OSError, IOError,
+                        directory_watcher.DirectoryDeletedError) as err:
+                    _log.warning(f"Unable to reload run {run}: {err}")
+                    tag_to_content = {}
+                if len(tag_to_content) > 0:
+                    run_to_tags[run] = sorted(tag_to_content.keys())
+                else:
+                    run_to_tags.pop(run, None)
+            for run in removed:
+                run_to_tags.pop(run, None)
+                self._delete_run(run)
+            stale_runs = set(changed) | set(removed)
             with self._event_lock:
-                self._run_to_tags = {
-                    run: sorted(tagdict.keys())
-                    for run, tagdict in sorted(run_tags.items())
+                self._run_to_tags = dict(sorted(run_to_tags.items()))
+                self._run_signatures = {
+                    run: signature
+                    for run, (unused_path, signature) in runs.items()
                 }
-            _log.debug(f"Event data reloaded: {self._run_to_tags}")
-        self._tensor_events = dict()  # Invalidate index
-        # Close all open files
-        with self._file_handles_lock:
-            while len(self._file_handles) > 0:
-                unused_filename, file_handle = self._file_handles.popitem()
-                with file_handle[1]:
-                    file_handle[0].close()
+                for run in stale_runs:  # Invalidate index
+                    self._tensor_events.pop(run, None)
+                self._tag_index = {
+                    run_tag: index
+                    for run_tag, index in self._tag_index.items()
+                    if run_tag[0] not in stale_runs
+                }
+            if len(stale_runs) > 0:
+                _log.debug(f"Event data reloaded for runs {sorted(stale_runs)}:"
+                           f" {self._run_to_tags}")
+            # Close open files of changed runs. Memory maps are closed when no
+            # longer referenced by readers.
+            stale_dirs = tuple(
+                PluginDirectory(os.path.join(self.logdir, run),
+                                metadata.PLUGIN_NAME) + os.sep
+                for run in stale_runs)
+            with self._file_handles_lock:
+                for filename in list(self._file_maps):
+                    if filename.startswith(stale_dirs):
+                        del self._file_maps[filename]
+                for filename in list(self._file_handles):
+                    if filename.startswith(stale_dirs):
+                        file_handle = self._file_handles.pop(filename)
+                        with file_handle[1]:
+                            file_handle[0].close()
+
+    def _delete_run(self, run):
+        """Remove the event accumulator of a deleted run, releasing its
+        events."""
+        if hasattr(self.event_mux, "DeleteRun"):
+            self.event_mux.DeleteRun(run)
+        else:  # Not available in the EventMultiplexer of TensorBoard 2.x
+            with self.event_mux._accumulators_mutex:
+                self.event_mux._accumulators.pop(run, None)
+                self.event_mux._paths.pop(run, None)
 
     def is_active(self):
         """Do we have any Open3D data to display?"""
         with self._event_lock:
-            return self._have_data() and any(
-                len(tags) > 0 for tags in self._run_to_tags.values())
+            return any(len(tags) > 0 for tags in self._run_to_tags.values())
 
     @property
     def run_to_tags(self):
@@ -266,39 +637,146 @@ class Open3DPluginDataReader:
                 }
             return self._tensor_events[run]
 
+    def prefetch(self, owner, run, requests, step_to_idx):
+        """Read geometry into the cache in the background. Pending prefetch
+        requests from the same ``owner`` are cancelled. Prefetched geometry may
+        evict any cached geometry except geometry pinned with ``pin()``.
+
+        Args:
+            owner: Hashable requester identity, e.g. a window id.
+            run (str): Run name.
+            requests (Iterable): (tag, step, batch_idx) tuples, in the order
+                in which they should be read.
+            step_to_idx (dict): Map from step to tensor event index.
+
+        Returns:
+            List of futures, one per request.
+        """
+        self.cancel_prefetch(owner)
+        with self._prefetch_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="Open3DPrefetch")
+            futures = [
+                self._prefetch_executor.submit(self._prefetch_one, run, tag,
+                                               step, batch_idx, step_to_idx)
+                for tag, step, batch_idx in requests
+            ]
+            self._prefetch_futures[owner] = futures
+        return futures
+
+    def cancel_prefetch(self, owner):
+        """Cancel pending prefetch requests from ``owner``. A read in progress
+        is completed."""
+        with self._prefetch_lock:
+            futures = self._prefetch_futures.pop(owner, ())
+        for future in futures:
+            future.cancel()
+
+    def pin(self, owner, run, requests, step_to_idx):
+        """Protect geometry displayed by ``owner`` from eviction by other reads
+        (e.g. prefetching). This replaces geometry previously pinned by
+        ``owner``.
+
+        Args:
+            owner: Hashable requester identity, e.g. a window id.
+            run (str): Run name.
+            requests (Iterable): (tag, step, batch_idx) tuples of displayed
+                geometry.
+            step_to_idx (dict): Map from step to tensor event index.
+        """
+        keys = []
+        for tag, step, batch_idx in requests:
+            try:
+                keys.extend(
+                    self._cache_keys(run, tag, step, batch_idx, step_to_idx))
+            except (KeyError, IndexError) as err:
+                _log.debug(f"Not pinning {(run, tag, step, batch_idx)}: {err}")
+        self.geometry_cache.pin(owner, keys)
+
+    def unpin(self, owner):
+        """Release geometry pinned by ``owner``."""
+        self.geometry_cache.unpin(owner)
+
+    def _prefetch_one(self, run, tag, step, batch_idx, step_to_idx):
+        try:
+            self.read_geometry(run, tag, step, batch_idx, step_to_idx)
+        except (IOError, KeyError, IndexError) as err:
+            _log.debug(f"Prefetching {(run, tag, step, batch_idx)} failed: "
+                       f"{err}")
+
+    def cache_stats(self):
+        """Geometry cache statistics (items, bytes, hits, misses, evictions
+        and bytes used per run)."""
+        return self.geometry_cache.stats()
+
     def get_label_to_names(self, run, tag):
         """Get label (id) to name (category) mapping for a tag."""
         md_proto = self.event_mux.SummaryMetadata(run, tag)
         lab2name = metadata.parse_plugin_metadata(md_proto.plugin_data.content)
         return dict(sorted(lab2name.items()))
 
+    def _mapped_file(self, filename, min_size):
+        """Memory map of a local file, covering at least ``min_size`` bytes.
+        Returns None for remote files or if memory mapping fails.
+        """
+        if "://" in filename:  # Remote storage, e.g. gs:// or s3://
+            return None
+        file_map = self._file_maps.get(filename)  # atomic
+        if file_map is not None and len(file_map) >= min_size:
+            return file_map
+        with self._file_handles_lock:
+            file_map = self._file_maps.get(filename)
+            if file_map is None or len(file_map) < min_size:
+                # Map again if the file has grown since it was mapped.
+                try:
+                    with open(filename, "rb") as infile:
+                        file_map = mmap.mmap(infile.fileno(),
+                                             0,
+                                             access=mmap.ACCESS_READ)
+                except (OSError, ValueError) as err:
+                    _log.debug(f"Cannot memory map {filename}: {err}")
+                    return None
+                # Old maps are closed when no longer referenced by readers.
+                self._file_maps[filename] = file_map
+        return file_map if len(file_map) >= min_size else None
+
     def read_from_file(self, filename, read_location, read_size,
                        read_masked_crc32c):
         """Read data from the file ``filename`` from a given offset
         ``read_location`` and size ``read_size``. Data is validated with the provided
         ``masked_crc32c``. This is thread safe and manages a list of open files.
+
+        Local files are memory mapped and a zero copy ``memoryview`` of the
+        data is returned, so that concurrent reads do not need a lock. Remote
+        files are read with a shared file handle and a ``bytes`` object is
+        returned.
         """
-        with self._file_handles_lock:
-            if filename not in self._file_handles:
-                self._file_handles[filename] = (_fileopen(filename, "rb"),
-                                                threading.Lock())
-                if not self._file_handles[filename][0].seekable():
-                    raise RuntimeError(filename + " does not support seeking."
-                                       " This storage is not supported.")
-            # lock to seek + read
-            file_handle = self._file_handles[filename]
-            file_handle[1].acquire()
-
-        file_handle[0].seek(read_location)
-        buf = file_handle[0].read(read_size)
-        file_handle[1].release()
+        file_map = self._mapped_file(filename, read_location + read_size)
+        if file_map is not None:
+            buf = memoryview(file_map)[read_location:read_location + read_size]
+        else:
+            with self._file_handles_lock:
+                if filename not in self._file_handles:
+                    self._file_handles[filename] = (_fileopen(filename, "rb"),
+                                                    threading.Lock())
+                    if not self._file_handles[filename][0].seekable():
+                        raise RuntimeError(filename +
+                                           " does not support seeking."
+                                           " This storage is not supported.")
+                # lock to seek + read
+                file_handle = self._file_handles[filename]
+                file_handle[1].acquire()
+
+            file_handle[0].seek(read_location)
+            buf = file_handle[0].read(read_size)
+            file_handle[1].release()
         if masked_crc32c(buf) == read_masked_crc32c:
             return buf
         else:
             return None
 
-    def update_runtag_prop_shape(self, run, tag, geometry,
-                                 inference_data_proto):
+    def update_runtag_prop_shape(self, run, tag, geometry, inference_data):
         """Update list of custom properties and their shapes for different runs
         and tags.
         """
@@ -311,35 +789,124 @@ class Open3DPluginDataReader:
                         getattr(geometry, prop_type))
                     prop_shape.update(custom_props)
                     prop_shape.update(label_props)
-            if len(inference_data_proto.inference_result) > 0:
+            if len(inference_data.labels) > 0:
                 # Only bbox labels can be visualized. Scalars such as
                 # 'confidence' from BoundingBox3D requires
                 # unlitGradient.GRADIENT shader support for LineSet.
                 prop_shape.update({'labels': 1})
 
-    def read_geometry(self, run, tag, step, batch_idx, step_to_idx):
-        """Geometry reader from msgpack files."""
-        idx = step_to_idx[step]
-        metadata_proto = plugin_data_pb2.Open3DPluginData()
-        run_tensor_events = self.tensor_events(run)
-        metadata_proto.ParseFromString(
-            run_tensor_events[tag][idx].tensor_proto.string_val[0])
+    def tag_index(self, run, tag):
+        """Parsed geometry metadata for all events of a run and tag, and the
+        resolved source step of each property reference. Chains of references
+        (step 3 -> step 2 -> step 0) are flattened to the step with the data
+        (step 3 -> step 0). This is computed once per run and tag and reset by
+        ``reload_events()``.
+
+        Returns:
+            tuple: (List of ``Open3DPluginData`` protos in event order, dict
+            mapping (step, geometry property name) to source step)
+        """
+        index = self._tag_index.get((run, tag))  # atomic
+        if index is not None:
+            return index
+        events = self.tensor_events(run)[tag]
+        metadata_protos = []
+        for event in events:
+            metadata_proto = plugin_data_pb2.Open3DPluginData()
+            metadata_proto.ParseFromString(event.tensor_proto.string_val[0])
+            metadata_protos.append(metadata_proto)
+        ref_sources = {}
+        # Referenced steps are earlier, so process in step order.
+        for idx in sorted(range(len(events)), key=lambda k: events[k].step):
+            step = events[idx].step
+            for prop_ref in metadata_protos[idx].property_references:
+                prop = plugin_data_pb2.Open3DPluginData.GeometryProperty.Name(
+                    prop_ref.geometry_property)
+                if prop_ref.step_ref >= step:
+                    _log.warning(
+                        f"Incorrect future step reference {prop_ref.step_ref} "
+                        f"for property {prop} of geometry at step {step}. "
+                        "Ignoring.")
+                    continue
+                ref_sources[(step, prop)] = ref_sources.get(
+                    (prop_ref.step_ref, prop), prop_ref.step_ref)
+        index = (metadata_protos, ref_sources)
+        with self._event_lock:
+            self._tag_index[(run, tag)] = index
+        return index
+
+    def _geometry_cache_key(self, run, tag, step, batch_idx, metadata_proto):
+        """Cache key of geometry data stored for a step. The first element is
+        the msgpack filename."""
         data_dir = PluginDirectory(os.path.join(self.logdir, run),
                                    metadata.PLUGIN_NAME)
         filename = os.path.join(data_dir, metadata_proto.batch_index.filename)
-        read_location = metadata_proto.batch_index.start_size[batch_idx].start
-        read_size = metadata_proto.batch_index.start_size[batch_idx].size
-        read_masked_crc32c = metadata_proto.batch_index.start_size[
-            batch_idx].masked_crc32c
-        cache_key = (filename, read_location, read_size, run, tag, step,
-                     batch_idx)
+        start_size = metadata_proto.batch_index.start_size[batch_idx]
+        return (filename, start_size.start, start_size.size, run, tag, step,
+                batch_idx)
+
+    @staticmethod
+    def _inference_cache_key(run, tag, step, batch_idx, metadata_proto,
+                             filename):
+        """Cache key of aux data stored for a step, or None if there is no aux
+        data."""
+        start_size = metadata_proto.batch_index.start_size[batch_idx]
+        if start_size.aux_size == 0:
+            return None
+        return (filename, start_size.aux_start, start_size.aux_size, run, tag,
+                step, batch_idx)
+
+    def _cache_keys(self, run, tag, step, batch_idx, step_to_idx):
+        """Cache keys of all data read by ``read_geometry()``, including data
+        from the steps that properties are referenced from."""
+        metadata_protos, ref_sources = self.tag_index(run, tag)
+        metadata_proto = metadata_protos[step_to_idx[step]]
+        geometry_key = self._geometry_cache_key(run, tag, step, batch_idx,
+                                                metadata_proto)
+        keys = [
+            geometry_key,
+            self._inference_cache_key(run, tag, step, batch_idx, metadata_proto,
+                                      geometry_key[0])
+        ]
+        for prop_ref in metadata_proto.property_references:
+            prop = plugin_data_pb2.Open3DPluginData.GeometryProperty.Name(
+                prop_ref.geometry_property)
+            source_step = ref_sources.get((step, prop))
+            if source_step is not None:
+                keys.append(
+                    self._geometry_cache_key(
+                        run, tag, source_step, batch_idx,
+                        metadata_protos[step_to_idx[source_step]]))
+        return [key for key in keys if key is not None]
+
+    def _read_geometry_data(self, run, tag, step, batch_idx, metadata_proto):
+        """Read geometry data stored for a step (without properties stored by
+        reference) from the cache or from storage.
+
+        Returns:
+            tuple: (geometry, cache key, msgpack filename)
+        """
+        cache_key = self._geometry_cache_key(run, tag, step, batch_idx,
+                                             metadata_proto)
+        filename, read_location, read_size = cache_key[:3]
+        start_size = metadata_proto.batch_index.start_size[batch_idx]
         geometry = self.geometry_cache.get(cache_key)
         if geometry is None:  # Read from storage
             buf = self.read_from_file(filename, read_location, read_size,
-                                      read_masked_crc32c)
+                                      start_size.masked_crc32c)
             if buf is None:
                 raise IOError(f"Geometry {cache_key} reading failed! CRC "
                               "mismatch in msgpack data.")
+            if start_size.compression != plugin_data_pb2.Open3DPluginData.none:
+                try:
+                    buf = metadata.decompress(
+                        buf,
+                        plugin_data_pb2.Open3DPluginData.Compression.Name(
+                            start_size.compression),
+                        start_size.uncompressed_size)
+                except (ValueError, IOError) as err:
+                    raise IOError(
+                        f"Geometry {cache_key} reading failed! {err}") from err
             msg_tag, msg_step, geometry = o3d.io.rpc.data_buffer_to_meta_geometry(
                 buf)
             if geometry is None:
@@ -352,20 +919,32 @@ class Open3DPluginDataReader:
                     "Possible data corruption.")
             _log.debug(f"Geometry {cache_key} reading successful!")
             self.geometry_cache.put(cache_key, geometry)
+        return geometry, cache_key, filename
+
+    def read_geometry(self, run, tag, step, batch_idx, step_to_idx):
+        """Geometry reader from msgpack files.
+
+        Returns:
+            tuple: (geometry, BoxInferenceData with bounding box labels and
+            confidences)
+        """
+        metadata_protos, ref_sources = self.tag_index(run, tag)
+        metadata_proto = metadata_protos[step_to_idx[step]]
+        geometry, cache_key, filename = self._read_geometry_data(
+            run, tag, step, batch_idx, metadata_proto)
 
-        # Fill in properties by reference
+        # Fill in properties by reference, from the step storing the data.
         for prop_ref in metadata_proto.property_references:
             prop = plugin_data_pb2.Open3DPluginData.GeometryProperty.Name(
                 prop_ref.geometry_property)
-            if prop_ref.step_ref >= step:
-                _log.warning(
-                    f"Incorrect future step reference {prop_ref.step_ref} for"
-                    f" property {prop} of geometry at step {step}. Ignoring.")
+            source_step = ref_sources.get((step, prop))
+            if source_step is None:  # Invalid reference
                 continue
-            geometry_ref = self.read_geometry(run, tag, prop_ref.step_ref,
-                                              batch_idx, step_to_idx)[0]
+            geometry_ref = self._read_geometry_data(
+                run, tag, source_step, batch_idx,
+                metadata_protos[step_to_idx[source_step]])[0]
             # "vertex_normals" -> ["vertex", "normals"]
-            prop_map, prop_attribute = prop.split("_")
+            prop_map, prop_attribute = prop.split("_", 1)
             if prop_map == "vertex" and not isinstance(
                     geometry, o3d.t.geometry.TriangleMesh):
                 prop_map = "point"
@@ -373,25 +952,38 @@ class Open3DPluginDataReader:
             getattr(geometry, prop_map)[prop_attribute] = getattr(
                 geometry_ref, prop_map)[prop_attribute]
 
-        # Aux data (e.g. labels, confidences) -> not cached
-        aux_read_location = metadata_proto.batch_index.start_size[
-            batch_idx].aux_start
-        aux_read_size = metadata_proto.batch_index.start_size[
-            batch_idx].aux_size
-        aux_read_masked_crc32c = metadata_proto.batch_index.start_size[
-            batch_idx].aux_masked_crc32c
-        data_bbox_proto = plugin_data_pb2.InferenceData()
-        if aux_read_size > 0:
-            data_bbox_serial = self.read_from_file(filename, aux_read_location,
-                                                   aux_read_size,
-                                                   aux_read_masked_crc32c)
+        inference_data = self._read_inference_data(run, tag, step, batch_idx,
+                                                   metadata_proto, filename)
+        self.update_runtag_prop_shape(run, tag, geometry, inference_data)
+        return geometry, inference_data
+
+    def _read_inference_data(self, run, tag, step, batch_idx, metadata_proto,
+                             filename):
+        """Read aux data (bounding box labels and confidences) from the cache
+        or from storage. This shares the geometry cache and its budget.
+
+        Returns:
+            BoxInferenceData: Empty if there is no aux data.
+        """
+        cache_key = self._inference_cache_key(run, tag, step, batch_idx,
+                                              metadata_proto, filename)
+        if cache_key is None:
+            return self._empty_inference_data
+        start_size = metadata_proto.batch_index.start_size[batch_idx]
+        inference_data = self.geometry_cache.get(cache_key)
+        if inference_data is None:
+            data_bbox_serial = self.read_from_file(filename,
+                                                   start_size.aux_start,
+                                                   start_size.aux_size,
+                                                   start_size.aux_masked_crc32c)
             if data_bbox_serial is None:
                 raise IOError(f"Aux data for {cache_key} reading failed! CRC "
                               "mismatch in protobuf data.")
+            data_bbox_proto = plugin_data_pb2.InferenceData()
             data_bbox_proto.ParseFromString(data_bbox_serial)
-
-        self.update_runtag_prop_shape(run, tag, geometry, data_bbox_proto)
-        return geometry, data_bbox_proto
+            inference_data = BoxInferenceData.from_proto(data_bbox_proto)
+            self.geometry_cache.put(cache_key, inference_data)
+        return inference_data
 
 
 def _normalize(tensor):
@@ -508,7 +1100,7 @@ class RenderUpdate:
         _log.debug("material colormap range range set to "
                    f"{material.scalar_min, material.scalar_max}")
 
-    def _set_render_defaults(self, geometry, inference_result, label_props,
+    def _set_render_defaults(self, geometry, inference_data, label_props,
                              custom_props):
         """Set default options for rendering (shader and property), based on
         data type and properties.
@@ -516,7 +1108,7 @@ class RenderUpdate:
         geometry_vertex = (geometry.point
                            if hasattr(geometry, 'point') else geometry.vertex)
         if self._shader == "":
-            if (len(inference_result) > 0  # Have BB labels
+            if (len(inference_data.labels) > 0  # Have BB labels
                     or len(label_props) > 0):  # Have vertex labels
                 self._shader = "unlitGradient.LUT"
                 if self._property == "":
@@ -603,7 +1195,33 @@ class RenderUpdate:
                 show += "__" + prop + repr(tm["__" + prop][:0])
             self.backup_list = []
 
-    def apply(self, o3dvis, geometry_name, geometry, inference_data_proto=None):
+    def _color_bbox_lines(self, line, labels):
+        """Color LineSet lines of bounding boxes by box label with the label
+        colormap. Boxes with transparent (alpha = 0) colors are hidden by
+        collapsing their lines.
+
+        Args:
+            line (TensorMap): LineSet line tensormap with "indices" and
+                "colors".
+            labels (np.ndarray): (N,) box labels.
+        """
+        if len(labels) == 0:
+            return
+        unique_labels, box_lut_idx = np.unique(labels, return_inverse=True)
+        label_colors = [
+            self._colormap.setdefault(label, (128, 128, 128, 255))
+            for label in unique_labels.tolist()
+        ]
+        lut = np.array(label_colors, dtype=np.uint8).reshape(-1, 4)
+        line_colors = np.repeat(lut[box_lut_idx], self._LINES_PER_BBOX, axis=0)
+        n_lines = min(len(line_colors), len(line.indices))
+        line.colors[:n_lines] = o3d.core.Tensor(
+            np.ascontiguousarray(line_colors[:n_lines, :3]))
+        hidden = line_colors[:n_lines, 3] == 0  # alpha
+        if hidden.any():
+            line.indices[:n_lines][o3d.core.Tensor(hidden)] = 0
+
+    def apply(self, o3dvis, geometry_name, geometry, inference_data=None):
         """Apply the RenderUpdate to a geometry.
 
         Args:
@@ -611,7 +1229,8 @@ class RenderUpdate:
             geometry_name (str): Geometry name in the window.
             geometry (o3d.t.geometry): Geometry whose rendering is to be
                 updated.
-            inference_data_proto : BoundingBox labels and confidences.
+            inference_data (BoxInferenceData): BoundingBox labels and
+                confidences.
         """
         if (len(self._updated) == 0 or geometry.is_empty()):
             _log.debug("No updates, or empty geometry.")
@@ -630,12 +1249,10 @@ class RenderUpdate:
             geometry, 'line') else ("colors" in geometry.triangle if hasattr(
                 geometry, 'triangle') else "colors" in geometry_vertex))
 
-        if inference_data_proto is not None:
-            inference_result = inference_data_proto.inference_result
-        else:
-            inference_result = []
+        if inference_data is None:
+            inference_data = BoxInferenceData.from_proto()
         label_props, custom_props = _classify_properties(geometry_vertex)
-        self._set_render_defaults(geometry, inference_result, label_props,
+        self._set_render_defaults(geometry, inference_data, label_props,
                                   custom_props)
 
         if o3dvis.scene.has_geometry(geometry_name):
@@ -690,16 +1307,7 @@ class RenderUpdate:
                                 "colors",
                                 shape=(len(geometry.line.indices), 3),
                                 dtype=o3d.core.uint8)
-                    t_lines = geometry.line.indices
-                    t_colors = geometry.line.colors
-                    idx = 0
-                    for bbir in inference_result:
-                        col = self._colormap.setdefault(bbir.label,
-                                                        (128, 128, 128, 255))
-                        t_colors[idx:idx + self._LINES_PER_BBOX] = col[:3]
-                        if col[3] == 0:  # alpha
-                            t_lines[idx:idx + self._LINES_PER_BBOX] = 0
-                        idx += self._LINES_PER_BBOX
+                    self._color_bbox_lines(geometry.line, inference_data.labels)
 
         # PointCloud, Mesh, LineSet with colors
         elif (("shader" in updated or "colormap" in updated) and
@@ -9,6 +9,7 @@ from time import sleep
 import subprocess as sp
 import webbrowser
 import shutil
+import threading
 import numpy as np
 import pytest
 try:
@@ -26,6 +27,8 @@ import open3d as o3d
 from open3d.visualization.tensorboard_plugin import summary
 from open3d.visualization.tensorboard_plugin.util import to_dict_batch
 from open3d.visualization.tensorboard_plugin.util import Open3DPluginDataReader
+from open3d.visualization.tensorboard_plugin.util import SizedLRUCache
+from open3d.visualization.tensorboard_plugin.util import BoxInferenceData
 
 
 @pytest.fixture
@@ -439,7 +442,7 @@ def test_plugin_data_reader(geometry_data, logdir):
             assert (cube_ls_out.line.colors == cube_ls_ref.line.colors).all()
             check_material_dict(cube_ls_out, material_ls, batch_idx)
 
-            bbox_ls_out, data_bbox_proto = reader.read_geometry(
+            bbox_ls_out, inference_data = reader.read_geometry(
                 "test_tensorboard_plugin", "bboxes", step, batch_idx,
                 step_to_idx)
             bbox_ls_ref = o3d.t.geometry.LineSet.from_legacy(
@@ -453,11 +456,389 @@ def test_plugin_data_reader(geometry_data, logdir):
             assert "colors" not in bbox_ls_out.line
             label_conf_ref = tuple((bb.label_class, bb.confidence)
                                    for bb in bboxes_ref[step][batch_idx])
-            label_conf_out = tuple((bb.label, bb.confidence)
-                                   for bb in data_bbox_proto.inference_result)
+            label_conf_out = tuple(
+                zip(inference_data.labels, inference_data.confidences))
             np.testing.assert_allclose(label_conf_ref, label_conf_out)
 
 
+def test_sized_lru_cache():
+    """Test eviction by total bytes and per group quotas."""
+    cache = SizedLRUCache(max_bytes=1000,
+                          max_group_bytes=600,
+                          group_fn=lambda key: key[0])
+    cache.put(("a", 0), np.zeros(100, dtype=np.uint8))
+    cache.put(("a", 1), np.zeros(400, dtype=np.uint8))
+    cache.put(("b", 0), np.zeros(400, dtype=np.uint8))
+    assert cache.nbytes == 900
+    assert cache.get(("a", 0)) is not None  # ("a", 1) is now LRU
+    cache.put(("b", 1), np.zeros(200, dtype=np.uint8))
+    assert cache.get(("a", 1)) is None  # evicted by total budget
+    assert cache.nbytes == 700
+    # Group quota: evict LRU items from the same group only
+    cache.put(("b", 2), np.zeros(100, dtype=np.uint8))
+    assert cache.get(("b", 0)) is None
+    assert cache.get(("a", 0)) is not None
+    # Items larger than the budget are not cached
+    cache.put(("c", 0), np.zeros(2000, dtype=np.uint8))
+    assert cache.get(("c", 0)) is None
+    stats = cache.stats()
+    assert stats["bytes"] == 400 and stats["items"] == 3
+    assert stats["group_bytes"] == {"a": 100, "b": 300}
+    assert stats["evictions"] == 2 and stats["rejected"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 3
+    cache.clear()
+    assert cache.nbytes == 0 and cache.stats()["group_bytes"] == {}
+
+
+def test_sized_lru_cache_keeps_new_entry():
+    """Test that a new entry is not evicted when all others are referenced."""
+    cache = SizedLRUCache(max_bytes=300)
+    for key in range(3):
+        cache.put(key, np.zeros(100, dtype=np.uint8))
+    for key in range(3):
+        assert cache.get(key) is not None
+    assert cache.put(3, np.zeros(100, dtype=np.uint8))
+    assert cache.get(3) is not None
+    assert cache.get(0) is None  # oldest entry, after its second chance
+    assert cache.nbytes == 300 and cache.stats()["evictions"] == 1
+
+
+def test_sized_lru_cache_pin():
+    """Test that pinned entries are not evicted."""
+    cache = SizedLRUCache(max_bytes=300)
+    for key in range(3):
+        cache.put(key, np.zeros(100, dtype=np.uint8))
+    cache.pin("window", (0, 1))
+    assert cache.put(3, np.zeros(100, dtype=np.uint8))
+    assert cache.get(2) is None
+    assert all(cache.get(key) is not None for key in (0, 1, 3))
+    # Only pinned entries could be evicted: the new entry is not cached.
+    cache.pin("other", (3,))
+    assert not cache.put(4, np.zeros(100, dtype=np.uint8))
+    assert cache.get(4) is None and cache.nbytes == 300
+    # Pins are replaced and released per owner.
+    cache.pin("window", (0,))
+    cache.unpin("other")
+    assert cache.put(4, np.zeros(100, dtype=np.uint8))
+    assert cache.get(0) is not None and cache.get(4) is not None
+
+
+def test_sized_lru_cache_concurrent():
+    """Test cache consistency with concurrent readers and writers."""
+    cache = SizedLRUCache(max_bytes=50 * 80,
+                          max_group_bytes=30 * 80,
+                          group_fn=lambda key: key % 3)
+    errors = []
+
+    def worker(seed):
+        rng = np.random.default_rng(seed)
+        for key in rng.integers(0, 200, size=2000):
+            value = cache.get(int(key))
+            if value is None:
+                cache.put(int(key), np.full(10, key, dtype=np.float64))
+            elif value[0] != key:
+                errors.append(key)
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    stats = cache.stats()
+    assert stats["bytes"] == 80 * stats["items"] <= 50 * 80
+    assert sum(stats["group_bytes"].values()) == stats["bytes"]
+    assert all(size <= 30 * 80 for size in stats["group_bytes"].values())
+    assert stats["hits"] > 0
+
+
+def test_geometry_cache_budget(logdir):
+    """Test that the reader geometry cache is limited by size."""
+    reader = Open3DPluginDataReader(logdir, cache_max_bytes=1 << 12)
+    step_to_idx = {i: i for i in range(3)}
+    for step in range(3):
+        reader.read_geometry("test_tensorboard_plugin", "cube_pcd", step, 0,
+                             step_to_idx)
+    stats = reader.cache_stats()
+    assert 0 < stats["bytes"] <= 1 << 12
+    assert stats["misses"] == 3
+    reader.read_geometry("test_tensorboard_plugin", "cube_pcd", 2, 0,
+                         step_to_idx)
+    assert reader.cache_stats()["misses"] == 3
+
+
+def test_prefetch(logdir):
+    """Test that prefetched geometry is cached without evicting pinned
+    (displayed) geometry."""
+    import concurrent.futures
+    run = "test_tensorboard_plugin"
+    step_to_idx = {i: i for i in range(3)}
+    reader = Open3DPluginDataReader(logdir)
+    futures = reader.prefetch("window", run, [("cube", 1, 0), ("cube", 2, 0)],
+                              step_to_idx)
+    concurrent.futures.wait(futures)
+    misses = reader.cache_stats()["misses"]
+    reader.read_geometry(run, "cube", 1, 0, step_to_idx)
+    reader.read_geometry(run, "cube", 2, 0, step_to_idx)
+    assert reader.cache_stats()["misses"] == misses
+    # Pending requests are cancelled by a new request from the same owner.
+    reader.prefetch("window", run, [("cube", 0, 0)] * 100, step_to_idx)
+    reader.cancel_prefetch("window")
+
+    # No room for prefetched geometry: the displayed geometry is kept.
+    reader = Open3DPluginDataReader(logdir, cache_max_items=1)
+    reader.pin("window", run, [("cube", 0, 0)], step_to_idx)
+    reader.read_geometry(run, "cube", 0, 0, step_to_idx)
+    concurrent.futures.wait(
+        reader.prefetch("window", run, [("cube", 1, 0)], step_to_idx))
+    assert reader.cache_stats()["items"] == 1
+    misses = reader.cache_stats()["misses"]
+    reader.read_geometry(run, "cube", 0, 0, step_to_idx)
+    assert reader.cache_stats()["misses"] == misses
+    # Unpinned geometry is evicted by prefetching.
+    reader.unpin("window")
+    evictions = reader.cache_stats()["evictions"]
+    concurrent.futures.wait(
+        reader.prefetch("window", run, [("cube", 1, 0)], step_to_idx))
+    assert reader.cache_stats()["evictions"] > evictions
+
+
+def test_property_reference_index(logdir):
+    """Test that property references resolve to the step storing the data,
+    which is read only once."""
+    run = "test_tensorboard_plugin"
+    step_to_idx = {i: i for i in range(3)}
+    reader = Open3DPluginDataReader(logdir)
+    metadata_protos, ref_sources = reader.tag_index(run, "cube")
+    assert len(metadata_protos) == 3
+    assert ref_sources == {
+        (step, prop): 0 for step in (1, 2)
+        for prop in ("vertex_positions", "vertex_normals")
+    }
+    assert reader.tag_index(run, "cube")[1] is ref_sources
+    cube_ref = reader.read_geometry(run, "cube", 0, 0, step_to_idx)[0]
+    misses = reader.cache_stats()["misses"]
+    cube = reader.read_geometry(run, "cube", 2, 0, step_to_idx)[0]
+    assert reader.cache_stats()["misses"] == misses + 1
+    np.testing.assert_equal(cube.vertex.positions.numpy(),
+                            cube_ref.vertex.positions.numpy())
+    reader.reload_events()  # No change
+    assert reader.tag_index(run, "cube")[1] is ref_sources
+
+
+def test_inference_data_cache(logdir):
+    """Test that bounding box inference data is cached with the geometry."""
+    run = "test_tensorboard_plugin"
+    step_to_idx = {i: i for i in range(3)}
+    reader = Open3DPluginDataReader(logdir)
+    _, inference_data = reader.read_geometry(run, "bboxes", 1, 1, step_to_idx)
+    assert isinstance(inference_data, BoxInferenceData)
+    assert inference_data.labels.dtype == np.int32
+    assert len(inference_data.labels) == len(inference_data.confidences) == 4
+    stats = reader.cache_stats()
+    assert stats["items"] == 2 and stats["misses"] == 2
+    assert reader.read_geometry(run, "bboxes", 1, 1,
+                                step_to_idx)[1] is inference_data
+    assert reader.cache_stats()["misses"] == 2
+    # No aux data
+    _, inference_data = reader.read_geometry(run, "cube", 0, 0, step_to_idx)
+    assert len(inference_data.labels) == 0
+
+
+def test_reload_events(logdir):
+    """Test that only new or changed runs are reloaded."""
+    run = "test_tensorboard_plugin"
+    reader = Open3DPluginDataReader(logdir)
+    tensor_events = reader.tensor_events(run)
+    run_to_tags = reader.run_to_tags
+    reader.reload_events()
+    assert reader.tensor_events(run) is tensor_events
+    shutil.copytree(os.path.join(logdir, run), os.path.join(logdir, "copy"))
+    reader.reload_events()
+    assert reader.run_to_tags == dict(run_to_tags, copy=run_to_tags[run])
+    assert reader.tensor_events(run) is tensor_events
+    assert len(reader.tensor_events("copy")["cube"]) == len(
+        tensor_events["cube"])
+    shutil.rmtree(os.path.join(logdir, "copy"))
+    reader.reload_events()
+    assert reader.run_to_tags == run_to_tags
+    assert "copy" not in reader.event_mux.Runs()
+
+
+def test_async_data_writer(tmp_path):
+    """Test that concurrent writes to different files are written in order to
+    the returned locations."""
+    writer = summary._AsyncDataWriter(max_queue=8,
+                                      num_workers=2,
+                                      coalesce_bytes=1024)
+    written = {tag: [] for tag in ("a", "b", "c")}
+
+    def write(tag):
+        for k in range(200):
+            data = bytes([k % 256]) * (1 + 7 * k % 100)
+            filename, location = writer.enqueue(str(tmp_path / tag), data)
+            written[tag].append((filename, location, data))
+
+    threads = [threading.Thread(target=write, args=(tag,)) for tag in written]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.flush()
+    for tag, writes in written.items():
+        assert len(set(filename for filename, _, _ in writes)) == 1
+        with open(tmp_path / writes[0][0], "rb") as data_file:
+            file_data = data_file.read()
+        assert len(file_data) == sum(len(data) for _, _, data in writes)
+        for _, location, data in writes:
+            assert file_data[location:location + len(data)] == data
+    stats = writer.stats()
+    assert stats["queue_depth"] == stats["bytes_pending"] == 0
+    assert stats["bytes_written"] == sum(
+        len(data) for writes in written.values() for _, _, data in writes)
+    assert stats["writes"] < 600
+    with pytest.raises(ValueError):
+        summary._AsyncDataWriter(num_workers=0)
+    with pytest.raises(ValueError):
+        writer.configure(max_queue=0)
+    assert writer.max_queue == 8
+
+
+@pytest.mark.parametrize("compression",
+                         summary.metadata.available_compressions())
+def test_compression(tmp_path, compression):
+    """Test that compressed geometry data is decompressed when reading."""
+    from tensorboard.backend.event_processing.plugin_asset_util import PluginDirectory
+    from open3d.visualization.tensorboard_plugin import plugin_data_pb2
+    write_dir = PluginDirectory(str(tmp_path / "run"),
+                                summary.metadata.PLUGIN_NAME)
+    positions = np.zeros((1, 10000, 3), dtype=np.float32)
+    positions[0, :, 0] = np.arange(10000)
+    geometry_metadata = plugin_data_pb2.Open3DPluginData()
+    geometry_metadata.ParseFromString(
+        summary._write_geometry_data(write_dir,
+                                     "points",
+                                     0, {"vertex_positions": positions},
+                                     compression=compression))
+    summary._async_data_writer.flush()
+    start_size = geometry_metadata.batch_index.start_size[0]
+    assert (plugin_data_pb2.Open3DPluginData.Compression.Name(
+        start_size.compression) == compression)
+    assert start_size.size < start_size.uncompressed_size
+
+    reader = Open3DPluginDataReader(str(tmp_path))
+    pcd = reader._read_geometry_data("run", "points", 0, 0,
+                                     geometry_metadata)[0]
+    np.testing.assert_equal(pcd.point.positions.numpy(), positions[0])
+
+    with pytest.raises(IOError):
+        summary.metadata.decompress(b"corrupt data", compression, 100)
+    with pytest.raises(ValueError):
+        summary._write_geometry_data(write_dir,
+                                     "points",
+                                     0, {"vertex_positions": positions},
+                                     compression="unknown")
+
+
+def test_automatic_property_references(tmp_path):
+    """Test that unchanged geometry properties are written as references to
+    the step where they were first written, and are read back."""
+    from tensorboard.backend.event_processing.plugin_asset_util import PluginDirectory
+    from tensorboard.compat.proto.event_pb2 import Event
+    from tensorboard.summary.writer.event_file_writer import EventFileWriter
+    from open3d.visualization.tensorboard_plugin import plugin_data_pb2
+    run_dir = str(tmp_path / "run")
+    write_dir = PluginDirectory(run_dir, summary.metadata.PLUGIN_NAME)
+    event_writer = EventFileWriter(run_dir)
+
+    def write(tag, step, data):
+        geometry_metadata_string = summary._write_geometry_data(write_dir,
+                                                                tag,
+                                                                step,
+                                                                data,
+                                                                max_outputs=0)
+        tensor_proto = summary.TensorProto(
+            dtype='DT_STRING',
+            string_val=[geometry_metadata_string],
+            tensor_shape=summary.TensorShapeProto())
+        event_writer.add_event(
+            Event(step=step,
+                  summary=summary.Summary(value=[
+                      summary.Summary.Value(
+                          tag=tag,
+                          tensor=tensor_proto,
+                          metadata=summary.metadata.create_summary_metadata(
+                              description=None, metadata={}))
+                  ])))
+        geometry_metadata = plugin_data_pb2.Open3DPluginData()
+        geometry_metadata.ParseFromString(geometry_metadata_string)
+        return [(plugin_data_pb2.Open3DPluginData.GeometryProperty.Name(
+            ref.geometry_property), ref.step_ref)
+                for ref in geometry_metadata.property_references]
+
+    positions = np.linspace(0, 1, num=2 * 8 * 3).reshape((2, 8, 3))
+    for step in range(3):
+        colors = np.full((2, 8, 3), step / 2)
+        assert write("cube", step, {
+            "vertex_positions": positions,
+            "vertex_colors": colors
+        }) == ([("vertex_positions", 0)] if step > 0 else [])
+    # All batch elements must be unchanged.
+    positions[1] += 1
+    assert write("cube", 3, {
+        "vertex_positions": positions,
+        "vertex_colors": colors
+    }) == [("vertex_colors", 2)]
+    # The history is per data file, so a new run does not reference it.
+    other_dir = PluginDirectory(str(tmp_path / "other_run"),
+                                summary.metadata.PLUGIN_NAME)
+    other_metadata = plugin_data_pb2.Open3DPluginData()
+    other_metadata.ParseFromString(
+        summary._write_geometry_data(other_dir,
+                                     "cube",
+                                     4, {"vertex_positions": positions},
+                                     max_outputs=0))
+    assert len(other_metadata.property_references) == 0
+
+    # Textured mesh: property names with more than one "_"
+    mesh = o3d.geometry.TriangleMesh.create_box(1, 2, 4, create_uv_map=True)
+    mesh.compute_vertex_normals()
+    mesh_refs = [("triangle_indices", 0), ("triangle_texture_uvs", 0),
+                 ("vertex_normals", 0), ("vertex_positions", 0)]
+    for step in range(2):
+        mesh.paint_uniform_color((step, 0, 1))
+        mesh_summary = to_dict_batch([mesh])
+        assert sorted(write("mesh", step,
+                            mesh_summary)) == (mesh_refs if step > 0 else [])
+    event_writer.close()
+    summary._async_data_writer.flush()
+
+    reader = Open3DPluginDataReader(str(tmp_path))
+    step_to_idx = {0: 0, 1: 1}
+    mesh_ref = reader.read_geometry("run", "mesh", 0, 0, step_to_idx)[0]
+    mesh_out = reader.read_geometry("run", "mesh", 1, 0, step_to_idx)[0]
+    assert mesh_out.triangle.texture_uvs.allclose(mesh_ref.triangle.texture_uvs)
+    assert (mesh_out.triangle.indices == mesh_ref.triangle.indices).all()
+    np.testing.assert_equal(mesh_out.vertex.colors.numpy()[0], (255, 0, 255))
+
+
+def test_read_from_file(tmp_path):
+    """Test memory mapped reads, including reads after the file has grown."""
+    from tensorboard.compat.tensorflow_stub.pywrap_tensorflow import masked_crc32c
+    reader = Open3DPluginDataReader(str(tmp_path))
+    filename = str(tmp_path / "data.msgpack")
+    data = bytes(range(200))
+    with open(filename, "wb") as outfile:
+        outfile.write(data[:100])
+    buf = reader.read_from_file(filename, 10, 20, masked_crc32c(data[10:30]))
+    assert isinstance(buf, memoryview) and bytes(buf) == data[10:30]
+    assert reader.read_from_file(filename, 10, 20, 0) is None  # CRC mismatch
+    with open(filename, "ab") as outfile:
+        outfile.write(data[100:])
+    buf = reader.read_from_file(filename, 90, 100, masked_crc32c(data[90:190]))
+    assert bytes(buf) == data[90:190]
+
+
 @pytest.mark.skip(reason="This will only run on a machine with GPU and GUI.")
 def test_tensorboard_app(logdir):
     with sp.Popen(['tensorboard', '--logdir', logdir]) as tb_proc: